@@ -0,0 +1,161 @@
+"""
+environment - Builds a seeded SQLite database and the fake guild around it, for the benchmarks to run commands against.
+"""
+import argparse
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+import discord
+import sqlalchemy
+
+# sqlite_compat has to be imported before anything importing database_obj
+from sqlite_compat import FIRST_SNOWFLAKE, create_engine, seed_database
+
+from fakes import (
+    FakeBot,
+    FakeForumChannel,
+    FakeGuild,
+    FakeMember,
+    FakePrimaryBot,
+    FakeThread,
+    FakeTransport,
+)
+
+ADMIN_DISCORD_ID = 1
+
+
+@dataclass
+class Environment:
+    bot: FakeBot | FakePrimaryBot
+    admin: FakeMember
+    # task_id: project_id
+    task_projects: dict[int, int]
+    directory: tempfile.TemporaryDirectory
+    main_threads: dict[int, FakeThread] = field(default_factory=dict)
+
+    def main_thread(self, project_id: int) -> FakeThread:
+        # The project's "General Discussion" thread, where project commands are used
+        if project_id not in self.main_threads:
+            self.main_threads[project_id] = FakeThread(
+                self.bot.transport,
+                3 * FIRST_SNOWFLAKE + project_id,
+                "General Discussion",
+                self.bot.forums[2 * FIRST_SNOWFLAKE + project_id],
+            )
+        return self.main_threads[project_id]
+
+    def task_thread(self, task_id: int) -> FakeThread:
+        return FakeThread(
+            self.bot.transport,
+            4 * FIRST_SNOWFLAKE + task_id,
+            f"Task {task_id}",
+            self.bot.forums[2 * FIRST_SNOWFLAKE + self.task_projects[task_id]],
+        )
+
+    async def close(self):
+        if isinstance(self.bot, FakePrimaryBot):
+            await self.bot.close()
+        self.bot.db.executor.shutdown(wait=True)
+        self.bot.db.engine.dispose()
+        self.directory.cleanup()
+
+
+async def create_environment(
+    *,
+    employees: int,
+    projects: int,
+    tasks: int,
+    dependencies: int,
+    rest_latency: float = 0.0,
+    seed: int = 0,
+    bot_class: type[FakeBot] | type[FakePrimaryBot] = FakeBot,
+) -> Environment:
+    """
+    create_environment - Seeds a new SQLite database, and builds a fake guild and bot around it with the bot prepared as it would be at startup.
+
+    Args:
+        employees (int): The number of employees (and guild members)
+        projects (int): The number of projects (and forum channels)
+        tasks (int): The number of tasks
+        dependencies (int): The number of task dependencies
+        rest_latency (float, optional): The simulated latency of each REST call, in seconds. Defaults to 0.
+        seed (int, optional): The random seed. Defaults to 0.
+        bot_class (type[FakeBot] | type[FakePrimaryBot], optional): ``FakePrimaryBot`` to run commands through the real bot and command tree. Defaults to ``FakeBot``.
+
+    Returns:
+        Environment: The environment, which should be closed once done with
+    """
+    directory = tempfile.TemporaryDirectory()
+    engine = create_engine(os.path.join(directory.name, "benchmark.db"))
+    seed_database(
+        engine,
+        employees=employees,
+        projects=projects,
+        tasks=tasks,
+        dependencies=dependencies,
+        admin_discord_id=ADMIN_DISCORD_ID,
+        seed=seed,
+    )
+
+    with engine.connect() as connection:
+        statuses = connection.execute(sqlalchemy.text("SELECT name FROM Status")).all()
+        task_projects = dict(
+            connection.execute(sqlalchemy.text("SELECT id, project_id FROM Task")).all()
+        )
+
+    transport = FakeTransport(rest_latency)
+    admin = FakeMember(
+        id=ADMIN_DISCORD_ID, name="admin", nick=None, transport=transport
+    )
+    members = {
+        FIRST_SNOWFLAKE + i: FakeMember(
+            id=FIRST_SNOWFLAKE + i,
+            name=f"employee{i}",
+            nick=None,
+            transport=transport,
+        )
+        for i in range(1, employees + 1)
+    }
+    members[admin.id] = admin
+
+    tags = [discord.ForumTag(name=name, moderated=True) for (name,) in statuses]
+    forums = {
+        2 * FIRST_SNOWFLAKE + i: FakeForumChannel(
+            transport, 2 * FIRST_SNOWFLAKE + i, f"project-{i}", tags
+        )
+        for i in range(1, projects + 1)
+    }
+
+    bot = bot_class(engine, transport, FakeGuild(members), forums)
+    await bot.prepare()
+    return Environment(bot, admin, task_projects, directory)
+
+
+def add_environment_arguments(parser: argparse.ArgumentParser):
+    # Shared by every benchmark script, so their environments can be sized the same way
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1000,
+        help="The number of employees, tasks and dependencies, unless set individually (default: 1000)",
+    )
+    parser.add_argument("--employees", type=int)
+    parser.add_argument("--tasks", type=int)
+    parser.add_argument("--dependencies", type=int)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+async def create_environment_from_arguments(
+    args: argparse.Namespace, **kwargs
+) -> Environment:
+    return await create_environment(
+        employees=args.employees or args.scale,
+        projects=args.projects,
+        tasks=args.tasks or args.scale,
+        dependencies=args.dependencies or args.scale,
+        rest_latency=args.rest_latency,
+        seed=args.seed,
+        **kwargs,
+    )
@@ -0,0 +1,279 @@
+"""
+fakes - Stand-ins for the Discord objects the cogs use, so commands can run without a gateway connection or REST API. Every would-be REST call goes through ``FakeTransport``, which can add a simulated latency.
+"""
+import asyncio
+import itertools
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any
+
+import discord
+import sqlalchemy
+
+# sqlite_compat has to be imported before anything importing database_obj
+from sqlite_compat import FIRST_SNOWFLAKE
+
+from const import GUILD_ID
+from database_connection import DatabaseConnection
+from instrumentation import metrics
+from main import PrimaryBot
+
+
+class FakeTransport:
+    def __init__(self, latency: float = 0.0):
+        """
+        FakeTransport - Counts the REST calls the cogs would make, and waits ``latency`` seconds for each one.
+
+        Args:
+            latency (float, optional): The simulated round trip of each call, in seconds. Defaults to 0.
+        """
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+
+    async def call(self, endpoint: str):
+        self.calls[endpoint] += 1
+        start_time = time.perf_counter()
+        # Even without latency, yield to the loop like a real request would
+        await asyncio.sleep(self.latency)
+        # Counted like the bot's instrumented REST client would count it
+        metrics.observe_rest(endpoint, time.perf_counter() - start_time)
+
+
+class FakeMessage:
+    def __init__(self, transport: FakeTransport, id: int, content: str = None, **kwargs):
+        self.transport = transport
+        self.id = id
+        self.content = content
+        self.kwargs = kwargs
+        self.jump_url = f"https://discord.com/channels/{GUILD_ID}/{id}"
+
+    async def pin(self, **kwargs):
+        await self.transport.call("pin_message")
+
+    async def edit(self, **kwargs):
+        await self.transport.call("edit_message")
+        self.content = kwargs.get("content", self.content)
+
+
+class FakeThread(discord.Thread):
+    # discord.Thread is only built from gateway payloads, so this skips its __init__ and sets what the cogs use
+    def __init__(self, transport: FakeTransport, id: int, name: str, parent: "FakeForumChannel"):
+        self.transport = transport
+        self.id = id
+        self.name = name
+        self.parent_id = parent.id
+        self._fake_parent = parent
+        self._applied_tags = []
+
+    @property
+    def parent(self) -> "FakeForumChannel":
+        return self._fake_parent
+
+    async def send(self, content: str = None, **kwargs) -> FakeMessage:
+        await self.transport.call("send_message")
+        return FakeMessage(self.transport, next(self._fake_parent.ids), content, **kwargs)
+
+    async def edit(self, **kwargs) -> "FakeThread":
+        await self.transport.call("edit_thread")
+        return self
+
+    async def delete(self, **kwargs):
+        await self.transport.call("delete_thread")
+
+
+class FakeForumChannel(discord.ForumChannel):
+    def __init__(
+        self, transport: FakeTransport, id: int, name: str, tags: list[discord.ForumTag]
+    ):
+        self.transport = transport
+        self.id = id
+        self.name = name
+        self._fake_tags = tags
+        # New threads get IDs well clear of the seeded ones
+        self.ids = itertools.count(5 * FIRST_SNOWFLAKE + id % FIRST_SNOWFLAKE * 10**6)
+
+    @property
+    def available_tags(self) -> list[discord.ForumTag]:
+        return self._fake_tags
+
+    async def create_thread(self, *, name: str, **kwargs) -> SimpleNamespace:
+        await self.transport.call("create_thread")
+        thread = FakeThread(self.transport, next(self.ids), name, self)
+        return SimpleNamespace(thread=thread, message=FakeMessage(self.transport, thread.id))
+
+    async def edit(self, **kwargs) -> "FakeForumChannel":
+        await self.transport.call("edit_channel")
+        return self
+
+
+class FakeMember(SimpleNamespace):
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    async def send(self, content: str = None, **kwargs):
+        await self.transport.call("send_dm")
+
+
+class FakeGuild:
+    def __init__(self, members: dict[int, FakeMember]):
+        self.id = GUILD_ID
+        self.members_by_id = members
+        # Makes PrimaryBot.fetch_members use the member cache, like it would after chunking
+        self.chunked = True
+
+    @property
+    def members(self) -> list[FakeMember]:
+        return list(self.members_by_id.values())
+
+    def get_member(self, id: int) -> FakeMember | None:
+        return self.members_by_id.get(id)
+
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, endpoint: str, content: str = None):
+        if self._done:
+            raise discord.InteractionResponded(self.interaction)
+        await self.interaction.transport.call(endpoint)
+        self._done = True
+        self.interaction.responded_at = asyncio.get_running_loop().time()
+        if content:
+            self.interaction.messages.append(content)
+
+    async def send_message(self, content: str = None, **kwargs):
+        await self._respond("interaction_callback", content)
+
+    async def defer(self, **kwargs):
+        await self._respond("interaction_callback")
+
+    async def edit_message(self, content: str = None, **kwargs):
+        await self._respond("interaction_callback", content)
+
+    async def send_modal(self, modal: discord.ui.Modal):
+        await self._respond("interaction_callback")
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, content: str = None, **kwargs):
+        await self.interaction.transport.call("followup")
+        if content:
+            self.interaction.messages.append(content)
+
+
+class FakeInteraction:
+    def __init__(self, bot: "FakeBot | FakePrimaryBot", user: FakeMember, channel: Any = None):
+        """
+        FakeInteraction - An interaction from ``user`` in ``channel``. Everything sent in reply is kept in ``messages``.
+        """
+        self.client = bot
+        self.transport = bot.transport
+        self.user = user
+        self.channel = channel
+        self.guild = bot.guild
+        self.extras: dict[Any, Any] = {}
+        self.type = discord.InteractionType.application_command
+        # Filled in by the load test, which dispatches interactions through the command tree
+        self.data: dict[str, Any] = {}
+        self.command: discord.app_commands.Command | None = None
+        self.command_failed = False
+        # Options are never resolved to Discord objects, so the tree only needs an empty connection state
+        self.guild_id = None
+        self._state = getattr(bot, "_connection", None)
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.messages: list[str] = []
+        self.created_at = asyncio.get_running_loop().time()
+        self.responded_at: float | None = None
+
+    async def edit_original_response(self, content: str = None, **kwargs):
+        await self.transport.call("edit_original_response")
+        if content:
+            self.messages.append(content)
+
+
+class FakeEmbedEdits:
+    # The real scheduler only adds delayed REST calls, which would be counted after the command finished anyway
+    def __init__(self):
+        self.scheduled_count = 0
+
+    def schedule(self, channel_id: int, message_id: int, embed: Any):
+        self.scheduled_count += 1
+
+    async def close(self):
+        pass
+
+
+class FakeBot:
+    def __init__(
+        self,
+        engine: sqlalchemy.engine.Engine,
+        transport: FakeTransport,
+        guild: FakeGuild,
+        forums: dict[int, FakeForumChannel],
+    ):
+        """
+        FakeBot - Provides what the cogs use from ``PrimaryBot``, backed by a real ``DatabaseConnection``.
+        """
+        self.transport = transport
+        self.guild = guild
+        self.forums = forums
+        self.db = DatabaseConnection(self, engine)
+        self.embed_edits = FakeEmbedEdits()
+
+    async def prepare(self):
+        await self.db.warm_caches()
+
+    # The real implementation, which only needs get_guild
+    fetch_members = PrimaryBot.fetch_members
+
+    def get_guild(self, id: int) -> FakeGuild:
+        return self.guild
+
+    def get_channel(self, id: int) -> FakeForumChannel | None:
+        return self.forums.get(id)
+
+    async def get_or_fetch_channel(self, id: int) -> FakeForumChannel | None:
+        return self.forums.get(id)
+
+
+class FakePrimaryBot(PrimaryBot):
+    def __init__(
+        self,
+        engine: sqlalchemy.engine.Engine,
+        transport: FakeTransport,
+        guild: FakeGuild,
+        forums: dict[int, FakeForumChannel],
+    ):
+        """
+        FakePrimaryBot - The real bot and command tree, which never logs in. Channels and members come from the fake guild, and interactions are dispatched to the tree directly.
+        """
+        super().__init__(engine)
+        self.transport = transport
+        self.guild = guild
+        self.forums = forums
+        self.embed_edits = FakeEmbedEdits()
+
+    async def prepare(self):
+        # What logging in would do, minus connecting to Discord
+        await self._async_setup_hook()
+        await self.setup_hook()
+
+    def get_guild(self, id: int) -> FakeGuild:
+        return self.guild
+
+    def get_channel(self, id: int) -> FakeForumChannel | None:
+        return self.forums.get(id)
+
+    async def get_or_fetch_channel(self, id: int) -> FakeForumChannel | None:
+        return self.forums.get(id)
@@ -0,0 +1,409 @@
+"""
+load_test - Fires interactions at the real bot's command tree at a steady rate, many at once, and reports how the event loop holds up: loop lag, how long interactions queue before being handled, and how many miss Discord's response deadline.
+
+Usage (from the repository root):
+    python benchmarks/load_test.py --rate 500 --duration 20 --output before.json
+    python benchmarks/load_test.py --rate 500 --duration 20 --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable
+
+# environment has to be imported before anything from the bot
+from environment import (
+    Environment,
+    add_environment_arguments,
+    create_environment_from_arguments,
+)
+from fakes import FakeInteraction, FakePrimaryBot
+from run_benchmarks import percentile
+
+from const import WHITE_X_MARK
+from discord import AppCommandOptionType
+from instrumentation import metrics
+from tabulate import tabulate
+
+# Interactions which aren't responded to (or deferred) within this many seconds fail on the user's end
+INTERACTION_DEADLINE = 3
+LOOP_LAG_INTERVAL = 0.01
+
+DEFAULT_MIX = "set_task_status=4,task_tree=3,task_dependencies=3,create_task=1,exec_query=0.1"
+
+# Returns the options of one interaction with the command, as Discord would send them
+OptionsFactory = Callable[[], dict[str, str]]
+
+
+@dataclass
+class InteractionResult:
+    command: str
+    # Seconds from when the interaction arrived until the tree started handling it
+    queue_delay: float
+    # Seconds from arrival until the response (or deferral), if there was one
+    response_time: float | None
+    # Seconds from arrival until the command returned
+    completion_time: float
+    failed: bool
+
+
+@dataclass
+class LoopMonitor:
+    # How late each wake up of the sampler was, in seconds
+    lag: list[float] = field(default_factory=list)
+    max_executor_queue: int = 0
+
+    async def run(self, env: Environment):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected_time = loop.time() + LOOP_LAG_INTERVAL
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            self.lag.append(max(loop.time() - expected_time, 0))
+            # Database calls waiting for a worker thread
+            self.max_executor_queue = max(
+                self.max_executor_queue, env.bot.db.executor._work_queue.qsize()
+            )
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for entry in mix.split(","):
+        name, _, weight = entry.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def build_options_factories(
+    env: Environment, rng: random.Random
+) -> dict[str, tuple[OptionsFactory, Callable[[], Any]]]:
+    """
+    build_options_factories - Creates, for each command the load test can send, a function making the options of an interaction and a function picking the channel it's used in.
+    """
+    task_ids = list(env.task_projects)
+    project_ids = sorted(set(env.task_projects.values())) or [1]
+    statuses = [status.name for status in env.bot.db.reference_data.statuses]
+    names = (f"Load test task {i}" for i in range(10**9))
+
+    def task_thread():
+        return env.task_thread(rng.choice(task_ids))
+
+    def main_thread():
+        return env.main_thread(rng.choice(project_ids))
+
+    return {
+        "create_task": (lambda: {"task_name": next(names)}, main_thread),
+        "set_task_status": (lambda: {"status": rng.choice(statuses)}, task_thread),
+        "task_tree": (dict, task_thread),
+        "task_dependencies": (dict, task_thread),
+        "exec_query": (
+            lambda: {"query": "SELECT * FROM Task LIMIT 1000", "format": "csv"},
+            lambda: None,
+        ),
+    }
+
+
+def create_interaction(
+    env: Environment, command_name: str, options: dict[str, str], channel: Any
+) -> FakeInteraction:
+    command = env.bot.tree.get_command(command_name)
+    interaction = FakeInteraction(env.bot, env.admin, channel)
+    interaction.command = command
+    # Only string options are sent, since anything else would have to be resolved to a Discord object
+    interaction.data = {
+        "name": command_name,
+        "type": 1,
+        "options": [
+            {"name": name, "type": AppCommandOptionType.string.value, "value": value}
+            for name, value in options.items()
+        ],
+    }
+    return interaction
+
+
+async def dispatch(
+    env: Environment, interaction: FakeInteraction, arrival_time: float
+) -> InteractionResult:
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    failed = False
+    try:
+        # What discord.py does with an application command interaction it receives
+        await env.bot.tree._call(interaction)
+    except Exception:
+        failed = True
+    finish_time = loop.time()
+
+    failed = (
+        failed
+        or interaction.command_failed
+        or any(
+            message.startswith((WHITE_X_MARK, ":lock:"))
+            for message in interaction.messages
+        )
+    )
+    return InteractionResult(
+        command=interaction.data["name"],
+        queue_delay=start_time - arrival_time,
+        response_time=interaction.responded_at - arrival_time
+        if interaction.responded_at is not None
+        else None,
+        completion_time=finish_time - arrival_time,
+        failed=failed,
+    )
+
+
+async def generate_load(
+    env: Environment, args: argparse.Namespace
+) -> tuple[list[InteractionResult], LoopMonitor, float]:
+    """
+    generate_load - Sends interactions with Poisson arrivals at ``args.rate`` per second for ``args.duration`` seconds. Arrivals are scheduled ahead of time, so when the loop falls behind the delay shows up as queueing rather than as a lower rate.
+
+    Returns:
+        tuple[list[InteractionResult], LoopMonitor, float]: The result of every interaction, the loop samples, and the seconds it took for every interaction to finish
+    """
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    factories = build_options_factories(env, rng)
+    unknown_commands = set(weights) - set(factories)
+    if unknown_commands:
+        raise SystemExit(f"Unknown commands in --mix: {', '.join(unknown_commands)}")
+    command_names = list(weights)
+    command_weights = [weights[name] for name in command_names]
+
+    loop = asyncio.get_running_loop()
+    monitor = LoopMonitor()
+    monitor_task = asyncio.create_task(monitor.run(env))
+    dispatched = []
+
+    start_time = loop.time()
+    arrival_time = start_time
+    while True:
+        arrival_time += rng.expovariate(args.rate)
+        if arrival_time - start_time > args.duration:
+            break
+        await asyncio.sleep(max(arrival_time - loop.time(), 0))
+
+        command_name = rng.choices(command_names, command_weights)[0]
+        make_options, pick_channel = factories[command_name]
+        interaction = create_interaction(
+            env, command_name, make_options(), pick_channel()
+        )
+        dispatched.append(
+            asyncio.create_task(dispatch(env, interaction, arrival_time))
+        )
+
+    results = await asyncio.gather(*dispatched)
+    elapsed_time = loop.time() - start_time
+    monitor_task.cancel()
+    return results, monitor, elapsed_time
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    values = sorted(values)
+    return {
+        "p50_ms": percentile(values, 0.5) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def build_report(
+    args: argparse.Namespace,
+    results: list[InteractionResult],
+    monitor: LoopMonitor,
+    elapsed_time: float,
+) -> dict[str, Any]:
+    def missed_deadline(result: InteractionResult) -> bool:
+        return (
+            result.response_time is None
+            or result.response_time > INTERACTION_DEADLINE
+        )
+
+    commands = {}
+    for name, count in sorted(Counter(result.command for result in results).items()):
+        command_results = [result for result in results if result.command == name]
+        command_metrics = metrics.commands.get(name)
+        commands[name] = {
+            "count": count,
+            "failures": sum(result.failed for result in command_results),
+            "missed_deadlines": sum(map(missed_deadline, command_results)),
+            "response": summarize(
+                [
+                    result.response_time
+                    for result in command_results
+                    if result.response_time is not None
+                ]
+            ),
+            "completion": summarize(
+                [result.completion_time for result in command_results]
+            ),
+            # From the bot's own instrumentation
+            "db_mean_ms": command_metrics.db.mean * 1000 if command_metrics else 0.0,
+            "rest_mean_ms": command_metrics.rest.mean * 1000 if command_metrics else 0.0,
+        }
+
+    try:
+        version = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        version = "unknown"
+
+    interactions = len(results)
+    return {
+        "version": version,
+        "arguments": vars(args),
+        "interactions": interactions,
+        "throughput": interactions / elapsed_time,
+        "failures": sum(result.failed for result in results),
+        "missed_deadline_rate": sum(map(missed_deadline, results)) / interactions
+        if interactions
+        else 0.0,
+        "loop_lag": summarize(monitor.lag),
+        "queue_delay": summarize([result.queue_delay for result in results]),
+        "max_executor_queue": monitor.max_executor_queue,
+        "commands": commands,
+    }
+
+
+def flatten(report: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    # Nested numbers become "loop_lag.p99_ms" and the like, so two reports can be compared line by line
+    flat = {}
+    for key, value in report.items():
+        if key == "arguments":
+            continue
+        if isinstance(value, dict):
+            flat |= flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def print_report(report: dict[str, Any], baseline: dict[str, Any] | None):
+    print(
+        f"{report['interactions']} interactions at {report['throughput']:.1f}/s"
+        f" ({report['version']}), {report['failures']} failed,"
+        f" {report['missed_deadline_rate']:.2%} missed the {INTERACTION_DEADLINE}s deadline"
+    )
+    print(
+        tabulate(
+            [
+                [name, *(report[name][key] for key in ("p50_ms", "p99_ms", "max_ms"))]
+                for name in ("loop_lag", "queue_delay")
+            ],
+            headers=["", "p50_ms", "p99_ms", "max_ms"],
+            floatfmt=".2f",
+            tablefmt="psql",
+        )
+    )
+    print(
+        tabulate(
+            [
+                [
+                    name,
+                    command["count"],
+                    command["failures"],
+                    command["missed_deadlines"],
+                    command["response"]["p50_ms"],
+                    command["response"]["p99_ms"],
+                    command["completion"]["p99_ms"],
+                    command["db_mean_ms"],
+                    command["rest_mean_ms"],
+                ]
+                for name, command in report["commands"].items()
+            ],
+            headers=[
+                "command",
+                "count",
+                "failures",
+                "missed",
+                "response_p50_ms",
+                "response_p99_ms",
+                "completion_p99_ms",
+                "db_mean_ms",
+                "rest_mean_ms",
+            ],
+            floatfmt=".2f",
+            tablefmt="psql",
+        )
+    )
+
+    if baseline:
+        current, previous = flatten(report), flatten(baseline)
+        print(f"Compared with {baseline['version']}:")
+        print(
+            tabulate(
+                [
+                    [
+                        key,
+                        previous[key],
+                        current[key],
+                        f"{(current[key] - previous[key]) / previous[key]:+.1%}"
+                        if previous[key]
+                        else "",
+                    ]
+                    for key in current
+                    if key in previous
+                ],
+                headers=["metric", "baseline", "current", "change"],
+                floatfmt=".2f",
+                tablefmt="psql",
+            )
+        )
+
+
+async def main(args: argparse.Namespace):
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    env = await create_environment_from_arguments(args, bot_class=FakePrimaryBot)
+    try:
+        results, monitor, elapsed_time = await generate_load(env, args)
+    finally:
+        await env.close()
+
+    report = build_report(args, results, monitor, elapsed_time)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    add_environment_arguments(parser)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=200,
+        help="Interactions per second, on average (default: 200)",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=10,
+        help="Seconds to send interactions for (default: 10)",
+    )
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help=f"Relative weights of the commands sent (default: {DEFAULT_MIX})",
+    )
+    parser.add_argument(
+        "--rest-latency",
+        type=float,
+        default=0.05,
+        help="Simulated latency of each Discord REST call, in seconds (default: 0.05)",
+    )
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    parser.add_argument("--compare", help="A report from an earlier run to compare with")
+    asyncio.run(main(parser.parse_args()))
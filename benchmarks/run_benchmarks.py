@@ -0,0 +1,275 @@
+"""
+run_benchmarks - Runs the real cogs against a seeded SQLite database and fake Discord objects, and reports the throughput and latency of each command.
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py --scale 10000
+    python benchmarks/run_benchmarks.py --employees 100000 --tasks 1000 --commands update_usernames
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable
+
+# environment has to be imported before the cogs, since it sets up the SQLite compatibility
+from environment import (
+    Environment,
+    add_environment_arguments,
+    create_environment_from_arguments,
+)
+from fakes import FakeInteraction, FakeMember
+from sqlite_compat import FIRST_SNOWFLAKE
+
+from autocomplete import employee_autocomplete, task_autocomplete
+from cogs.create_task import CreateTaskCog
+from cogs.exec_query import ExecQueryCog
+from cogs.register_employee import RegisterEmployeeCog
+from cogs.set_task_status import SetTaskStatusCog
+from cogs.task_dependencies import TaskDependenciesCog
+from cogs.task_tree import TaskTreeCog
+from cogs.update_usernames import UpdateUsernamesCog
+from const import WHITE_X_MARK
+from discord.app_commands import Choice
+from tabulate import tabulate
+
+# Builds the interaction for one run of a command (untimed), and returns the command's coroutine
+Scenario = Callable[[int], tuple[FakeInteraction, Awaitable]]
+
+
+@dataclass
+class BenchmarkResult:
+    command: str
+    runs: int
+    # Runs which raised, or replied with an error
+    failures: int
+    throughput: float
+    p50_ms: float
+    p99_ms: float
+    rest_calls_per_run: float
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def build_scenarios(
+    env: Environment, rng: random.Random
+) -> dict[str, tuple[Scenario, float]]:
+    """
+    build_scenarios - Creates a scenario for each benchmarked command, along with the fraction of ``--iterations`` it runs (commands which touch every row run less).
+    """
+    bot = env.bot
+    task_ids = list(env.task_projects)
+    project_ids = sorted(set(env.task_projects.values())) or [1]
+    statuses = [status.name for status in bot.db.reference_data.statuses]
+    members = list(bot.guild.members_by_id.values())
+    new_member_ids = iter(range(9 * FIRST_SNOWFLAKE, 10 * FIRST_SNOWFLAKE))
+
+    create_task = CreateTaskCog(bot, 2)
+    set_task_status = SetTaskStatusCog(bot, 2)
+    register_employee = RegisterEmployeeCog(bot, 4)
+    update_usernames = UpdateUsernamesCog(bot, 5)
+    exec_query = ExecQueryCog(bot, 5)
+    task_tree = TaskTreeCog(bot, 1)
+    task_dependencies = TaskDependenciesCog(bot, 2)
+
+    def run_create_task(i: int):
+        interaction = FakeInteraction(
+            bot, env.admin, env.main_thread(rng.choice(project_ids))
+        )
+        return interaction, create_task.create_task.callback(
+            create_task, interaction, task_name=f"Benchmark task {i}"
+        )
+
+    def run_set_task_status(i: int):
+        interaction = FakeInteraction(
+            bot, env.admin, env.task_thread(rng.choice(task_ids))
+        )
+        return interaction, set_task_status.set_task_status.callback(
+            set_task_status, interaction, rng.choice(statuses)
+        )
+
+    def run_register_employee(i: int):
+        member_id = next(new_member_ids)
+        user = FakeMember(
+            id=member_id, name=f"new{member_id}", nick=None, transport=bot.transport
+        )
+        interaction = FakeInteraction(bot, env.admin)
+        return interaction, register_employee.register_employee.callback(
+            register_employee, interaction, user
+        )
+
+    def run_update_usernames(i: int):
+        # Rename 1% of the guild, so each run has something to write
+        for member in rng.sample(members, max(len(members) // 100, 1)):
+            member.nick = f"renamed{i}-{member.id}"
+        interaction = FakeInteraction(bot, env.admin)
+        return interaction, update_usernames.update_usernames.callback(
+            update_usernames, interaction
+        )
+
+    def run_exec_query(i: int):
+        interaction = FakeInteraction(bot, env.admin)
+        return interaction, exec_query.exec_query.callback(
+            exec_query,
+            interaction,
+            "SELECT * FROM Task LIMIT 1000",
+            format=Choice(name="CSV", value="csv"),
+        )
+
+    def run_task_tree(i: int):
+        interaction = FakeInteraction(
+            bot, env.admin, env.task_thread(rng.choice(task_ids))
+        )
+        return interaction, task_tree.task_tree.callback(task_tree, interaction)
+
+    def autocomplete_prefix(names: list[str]) -> str:
+        # What's been typed so far: the start of a random word of a random name
+        word = rng.choice(rng.choice(names).split() or [""])
+        return word[: rng.randint(1, 4)]
+
+    task_names = list(bot.db.task_names.names.values())
+    employee_names = list(bot.db.employee_names.names.values())
+
+    def run_task_autocomplete(i: int):
+        interaction = FakeInteraction(bot, env.admin)
+        return interaction, task_autocomplete(
+            interaction, autocomplete_prefix(task_names)
+        )
+
+    def run_employee_autocomplete(i: int):
+        interaction = FakeInteraction(bot, env.admin)
+        return interaction, employee_autocomplete(
+            interaction, autocomplete_prefix(employee_names)
+        )
+
+    def run_task_dependencies(i: int):
+        interaction = FakeInteraction(
+            bot, env.admin, env.task_thread(rng.choice(task_ids))
+        )
+        return interaction, task_dependencies.task_dependencies.callback(
+            task_dependencies, interaction
+        )
+
+    scenarios = {
+        "create_task": (run_create_task, 1),
+        "register_employee": (run_register_employee, 1),
+        "update_usernames": (run_update_usernames, 0.05),
+        "exec_query": (run_exec_query, 0.2),
+    }
+    if employee_names:
+        scenarios["employee_autocomplete"] = (run_employee_autocomplete, 1)
+    # Task commands need tasks to run in
+    if task_ids:
+        scenarios |= {
+            "set_task_status": (run_set_task_status, 1),
+            "task_tree": (run_task_tree, 1),
+            "task_dependencies": (run_task_dependencies, 1),
+            "task_autocomplete": (run_task_autocomplete, 1),
+        }
+    return scenarios
+
+
+async def run_scenario(
+    env: Environment, name: str, scenario: Scenario, runs: int, concurrency: int
+) -> BenchmarkResult:
+    latencies = []
+    failures = 0
+    rest_calls_before = sum(env.bot.transport.calls.values())
+
+    async def run_once(i: int):
+        nonlocal failures
+        interaction, command = scenario(i)
+        start_time = time.perf_counter()
+        try:
+            await command
+        except Exception:
+            failures += 1
+            return
+        latencies.append(time.perf_counter() - start_time)
+        if any(
+            message.startswith((WHITE_X_MARK, ":lock:"))
+            for message in interaction.messages
+        ):
+            failures += 1
+
+    start_time = time.perf_counter()
+    # Runs are started in waves of ``concurrency``, so the waves measure throughput under that much load
+    for wave_start in range(0, runs, concurrency):
+        wave = range(wave_start, min(wave_start + concurrency, runs))
+        await asyncio.gather(*(run_once(i) for i in wave))
+    elapsed_time = time.perf_counter() - start_time
+
+    latencies.sort()
+    return BenchmarkResult(
+        command=name,
+        runs=runs,
+        failures=failures,
+        throughput=runs / elapsed_time,
+        p50_ms=percentile(latencies, 0.5) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        rest_calls_per_run=(sum(env.bot.transport.calls.values()) - rest_calls_before)
+        / runs,
+    )
+
+
+async def main(args: argparse.Namespace):
+    env = await create_environment_from_arguments(args)
+    try:
+        scenarios = build_scenarios(env, random.Random(args.seed))
+        results = []
+        for name, (scenario, fraction) in scenarios.items():
+            if args.commands and name not in args.commands:
+                continue
+            runs = max(int(args.iterations * fraction), 1)
+            results.append(
+                await run_scenario(env, name, scenario, runs, args.concurrency)
+            )
+    finally:
+        await env.close()
+
+    print(
+        tabulate(
+            [asdict(result) for result in results],
+            headers="keys",
+            floatfmt=".2f",
+            tablefmt="psql",
+        )
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"arguments": vars(args), "results": [asdict(r) for r in results]},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    add_environment_arguments(parser)
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=200,
+        help="Runs of each command (default: 200)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Runs of a command in flight at once (default: 1, which measures latency alone)",
+    )
+    parser.add_argument(
+        "--rest-latency",
+        type=float,
+        default=0.0,
+        help="Simulated latency of each Discord REST call, in seconds (default: 0)",
+    )
+    parser.add_argument("--commands", nargs="+", help="Only run these commands")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    asyncio.run(main(parser.parse_args()))
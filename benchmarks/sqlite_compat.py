@@ -0,0 +1,178 @@
+"""
+sqlite_compat - Lets the bot's MariaDB models run on SQLite, so the benchmarks don't need a database server.
+
+This must be imported before ``database_obj``, since the models call ``func.utc_timestamp()`` when they're defined.
+"""
+import os
+import random
+import sys
+
+import sqlalchemy
+from sqlalchemy.dialects.mysql import BIGINT, INTEGER, SMALLINT, TINYINT
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.functions import GenericFunction
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "bot"))
+
+
+class utc_timestamp(GenericFunction):
+    # Registers func.utc_timestamp() so it can be compiled differently per dialect
+    type = sqlalchemy.DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_timestamp, "sqlite")
+def compile_utc_timestamp(element, compiler, **kwargs) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(TINYINT, "sqlite")
+@compiles(SMALLINT, "sqlite")
+@compiles(INTEGER, "sqlite")
+@compiles(BIGINT, "sqlite")
+def compile_integer(type_, compiler, **kwargs) -> str:
+    # SQLite only auto increments primary keys declared exactly as INTEGER, and its INTEGER is 64 bits anyway
+    return "INTEGER"
+
+
+from database_obj import *  # noqa: E402 (needs utc_timestamp registered first)
+
+# Snowflakes of the fake guild's channels start here, so they don't collide with row IDs
+FIRST_SNOWFLAKE = 10**17
+
+
+def create_engine(path: str) -> sqlalchemy.engine.Engine:
+    """
+    create_engine - Creates an engine for a SQLite database file, which can be shared by the database executor's threads.
+
+    Args:
+        path (str): The path of the database file
+
+    Returns:
+        sqlalchemy.engine.Engine: The engine
+    """
+    engine = sqlalchemy.create_engine(
+        f"sqlite:///{path}",
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+
+    @sqlalchemy.event.listens_for(engine, "connect")
+    def set_pragmas(connection, _):
+        cursor = connection.cursor()
+        # WAL lets reads carry on during writes, which is closer to how InnoDB behaves
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return engine
+
+
+def seed_database(
+    engine: sqlalchemy.engine.Engine,
+    *,
+    employees: int,
+    projects: int,
+    tasks: int,
+    dependencies: int,
+    admin_discord_id: int,
+    seed: int = 0,
+):
+    """
+    seed_database - Creates the tables and fills them with synthetic data.
+
+    Employee discord IDs are ``FIRST_SNOWFLAKE + n``, project forum channels ``2 * FIRST_SNOWFLAKE + n`` (with their main threads at ``3 * FIRST_SNOWFLAKE + n``), and task threads ``4 * FIRST_SNOWFLAKE + n``, where ``n`` is the row ID.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine of the database
+        employees (int): The number of employees to add
+        projects (int): The number of projects to add
+        tasks (int): The number of tasks to add, spread over the projects
+        dependencies (int): The number of task dependencies to add, capped at the number of pairs of tasks
+        admin_discord_id (int): The discord ID of an extra employee with access level 5, who runs the benchmarked commands
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    session = sqlalchemy.orm.Session(bind=engine)
+    create_db(engine, session)
+    statuses = [status_id for (status_id,) in session.query(Status.id)]
+    departments = [department_id for (department_id,) in session.query(Department.id)]
+
+    session.execute(
+        Employee.__table__.insert(),
+        [
+            {
+                "id": i,
+                "username": f"employee{i}",
+                "discord_id": FIRST_SNOWFLAKE + i,
+                "access_level": rng.randint(1, 4),
+            }
+            for i in range(1, employees + 1)
+        ]
+        + [
+            {
+                "id": employees + 1,
+                "username": "admin",
+                "discord_id": admin_discord_id,
+                "access_level": 5,
+            }
+        ],
+    )
+    session.execute(
+        Project.__table__.insert(),
+        [
+            {
+                "id": i,
+                "name": f"Project {i}",
+                "discord_forum_channel_id": 2 * FIRST_SNOWFLAKE + i,
+                "discord_main_thread_id": 3 * FIRST_SNOWFLAKE + i,
+            }
+            for i in range(1, projects + 1)
+        ],
+    )
+
+    task_rows = []
+    for i in range(1, tasks + 1):
+        project_id = rng.randint(1, projects)
+        # Roughly a third of the tasks are subtasks of an earlier task (not necessarily in the same project, which doesn't matter here)
+        parent_task_id = rng.randint(1, i - 1) if i > 1 and rng.random() < 0.3 else None
+        task_rows.append(
+            {
+                "id": i,
+                "project_id": project_id,
+                "name": f"Task {i}",
+                "department": rng.choice(departments),
+                "status": rng.choice(statuses),
+                "parent_task_id": 4 * FIRST_SNOWFLAKE + parent_task_id
+                if parent_task_id
+                else None,
+                "discord_thread_channel_id": 4 * FIRST_SNOWFLAKE + i,
+            }
+        )
+    if task_rows:
+        session.execute(Task.__table__.insert(), task_rows)
+
+    # Dependencies always point from a lower ID to a higher one, so they can't form a cycle
+    edges = set()
+    # Each pair of tasks can only be one dependency, so asking for more would never finish
+    dependencies = min(dependencies, tasks * (tasks - 1) // 2)
+    while len(edges) < dependencies:
+        first, second = rng.sample(range(1, tasks + 1), 2)
+        edges.add((min(first, second), max(first, second)))
+    if edges:
+        session.execute(
+            TaskDependency.__table__.insert(),
+            [
+                {"parent_task_id": parent, "child_task_id": child}
+                for parent, child in edges
+            ],
+        )
+
+    session.flush()
+    # Counts the tasks of every project
+    create_missing_project_stats(session)
+    session.commit()
+    session.close()
@@ -0,0 +1,141 @@
+import asyncio
+import glob
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import aiohttp
+from const import ASSET_CHUNK_SIZE
+
+# Where downloads are written until their hash is known, inside the storage directory so they can be moved into place atomically
+INCOMING_DIRECTORY = ".incoming"
+
+
+@dataclass
+class StoredAsset:
+    """
+    StoredAsset - A file in asset storage, named after the SHA-256 hash of its contents.
+    """
+
+    digest: str
+    size: int
+    # The path relative to the storage directory, and its URL
+    path: str
+    link: str
+    # Whether an identical file was already stored, and this upload was discarded in favour of it
+    deduplicated: bool
+
+
+def file_extension(filename: str) -> str:
+    # Only kept so files open with the right program from FileBrowser, so anything unusual is dropped
+    extension = os.path.splitext(filename)[1].lower()
+    return extension if re.fullmatch(r"\.[a-z0-9]{1,10}", extension) else ""
+
+
+def write_chunk(file: BinaryIO, digest: "hashlib._Hash", chunk: bytes):
+    digest.update(chunk)
+    file.write(chunk)
+
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class AssetStorage:
+    def __init__(self, directory: str, base_url: str):
+        """
+        AssetStorage - Stores files in a content-addressed directory (served by FileBrowser), so identical files are only stored once. Files are streamed to disk in chunks while they're hashed, so they're never held in memory in full.
+
+        Args:
+            directory (str): The directory files are stored in
+            base_url (str): The URL the directory is served at
+        """
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        self.session: aiohttp.ClientSession | None = None
+        # Checking whether a file is already stored and moving the download into place have to happen together, or two uploads of the same file could both be kept
+        self.finish_lock = threading.Lock()
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+
+    async def store(self, url: str, filename: str) -> StoredAsset:
+        """
+        store - Downloads a file into storage, unless an identical file is already stored.
+
+        Args:
+            url (str): The URL to download the file from, like an attachment's URL
+            filename (str): The file's original name, which its extension is taken from
+
+        Raises:
+            aiohttp.ClientError: If the file couldn't be downloaded
+
+        Returns:
+            StoredAsset: The stored file
+        """
+        if not self.session:
+            self.session = aiohttp.ClientSession()
+
+        incoming_directory = os.path.join(self.directory, INCOMING_DIRECTORY)
+        await asyncio.to_thread(os.makedirs, incoming_directory, exist_ok=True)
+        file = await asyncio.to_thread(
+            tempfile.NamedTemporaryFile, dir=incoming_directory, delete=False
+        )
+
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                async with self.session.get(url, raise_for_status=True) as response:
+                    async for chunk in response.content.iter_chunked(ASSET_CHUNK_SIZE):
+                        # Hashing and writing block, so they're done off the event loop
+                        await asyncio.to_thread(write_chunk, file, digest, chunk)
+                        size += len(chunk)
+            finally:
+                await asyncio.to_thread(file.close)
+
+            path, deduplicated = await asyncio.to_thread(
+                self.finish, file.name, digest.hexdigest(), file_extension(filename)
+            )
+        except BaseException:
+            await asyncio.to_thread(remove_file, file.name)
+            raise
+
+        return StoredAsset(
+            digest=digest.hexdigest(),
+            size=size,
+            path=path,
+            link=f"{self.base_url}/{path}",
+            deduplicated=deduplicated,
+        )
+
+    def finish(
+        self, temporary_path: str, digest: str, extension: str
+    ) -> tuple[str, bool]:
+        # Files are spread across subdirectories by the start of their hash, so no directory gets too large to browse
+        relative_directory = digest[:2]
+        directory = os.path.join(self.directory, relative_directory)
+        os.makedirs(directory, exist_ok=True)
+
+        with self.finish_lock:
+            # The same contents uploaded with a different extension are still the same file
+            if existing_paths := glob.glob(os.path.join(directory, f"{digest}*")):
+                remove_file(temporary_path)
+                return (
+                    f"{relative_directory}/{os.path.basename(existing_paths[0])}",
+                    True,
+                )
+
+            name = f"{digest}{extension}"
+            # Temporary files are only readable by their owner, which FileBrowser may not be running as
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, os.path.join(directory, name))
+            return f"{relative_directory}/{name}", False
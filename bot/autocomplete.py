@@ -0,0 +1,81 @@
+from typing import TYPE_CHECKING, Iterable
+
+from discord import Interaction
+from discord.app_commands import Choice
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+
+# Discord shows at most 25 autocomplete choices
+MAX_CHOICES = 25
+# Choice names and values can be at most 100 characters long
+MAX_CHOICE_LENGTH = 100
+
+
+def matching_choices(names: Iterable[str], current: str) -> list[Choice[str]]:
+    current = current.casefold()
+    return [
+        Choice(name=name, value=name) for name in names if current in name.casefold()
+    ][:MAX_CHOICES]
+
+
+async def status_autocomplete(
+    interaction: Interaction, current: str
+) -> list[Choice[str]]:
+    # Choices come from the reference data rather than being hard-coded, so they can't drift from the database
+    bot: PrimaryBot = interaction.client
+    return matching_choices(
+        (status.name for status in bot.db.reference_data.statuses), current
+    )
+
+
+async def department_autocomplete(
+    interaction: Interaction, current: str
+) -> list[Choice[str]]:
+    bot: PrimaryBot = interaction.client
+    return matching_choices(
+        (department.name for department in bot.db.reference_data.departments),
+        current,
+    )
+
+
+async def project_autocomplete(
+    interaction: Interaction, current: str
+) -> list[Choice[str]]:
+    # Searched in memory rather than queried, since this runs on every keystroke
+    bot: PrimaryBot = interaction.client
+    return [
+        Choice(name=name, value=name)
+        for _, name in bot.db.project_names.search(current, MAX_CHOICES)
+        # Longer names can't be a choice value, but can still be typed out
+        if len(name) <= MAX_CHOICE_LENGTH
+    ]
+
+
+async def task_autocomplete(
+    interaction: Interaction, current: str
+) -> list[Choice[str]]:
+    # The value is the task's thread ID, since task names aren't unique
+    bot: PrimaryBot = interaction.client
+    threads = bot.db.snowflakes.thread_channels_by_task
+    return [
+        Choice(name=name[:MAX_CHOICE_LENGTH], value=str(threads[task_id]))
+        # Imported tasks don't have a thread until the import finishes, and mustn't take up any of the choices
+        for task_id, name in bot.db.task_names.search(
+            current, MAX_CHOICES, include=threads.__contains__
+        )
+    ]
+
+
+async def employee_autocomplete(
+    interaction: Interaction, current: str
+) -> list[Choice[str]]:
+    # The value is the employee's discord ID, since usernames aren't unique
+    bot: PrimaryBot = interaction.client
+    return [
+        Choice(name=username, value=str(discord_id))
+        for discord_id, username in bot.db.employee_names.search(
+            current, MAX_CHOICES
+        )
+    ]
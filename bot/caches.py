@@ -0,0 +1,251 @@
+import bisect
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+
+class AccessLevelCache:
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        """
+        AccessLevelCache - A bounded, process-local cache of employee access levels keyed by discord ID. Entries expire after ``ttl`` seconds, and the least recently used entry is evicted once the cache is full.
+
+        Args:
+            max_size (int, optional): The maximum number of cached employees. Defaults to 1024.
+            ttl (float, optional): How long an entry stays valid for, in seconds. Defaults to 300.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # discord_id: (access_level, expiry time)
+        self._entries: OrderedDict[int, tuple[int, float]] = OrderedDict()
+        # Counts every change made with set, invalidate or clear, so a read from the database can tell whether it was overtaken by one
+        self._generation = 0
+        # discord_id: the generation they were last changed in
+        self._changed: dict[int, int] = {}
+        # The generation the cache was last cleared in
+        self._cleared = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, discord_id: int) -> int | None:
+        """
+        get - Gets the cached access level of an employee.
+
+        Args:
+            discord_id (int): The discord ID of the employee
+
+        Returns:
+            int | None: The cached access level, or None if it isn't cached (or has expired)
+        """
+        entry = self._entries.get(discord_id)
+        if entry is None or entry[1] < time.monotonic():
+            self._entries.pop(discord_id, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(discord_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, discord_id: int, access_level: int):
+        """
+        set - Caches the access level of an employee, replacing any existing entry.
+
+        Args:
+            discord_id (int): The discord ID of the employee
+            access_level (int): The employee's access level (0 for unregistered or purged users)
+        """
+        self._generation += 1
+        self._changed[discord_id] = self._generation
+        self._store(discord_id, access_level)
+
+    def fill(self, discord_id: int, access_level: int, generation: int):
+        """
+        fill - Caches an access level read from the database, unless the employee was changed since the read started. Otherwise a slow read could replace a newer access level with the one it read.
+
+        Args:
+            discord_id (int): The discord ID of the employee
+            access_level (int): The access level which was read
+            generation (int): ``generation`` from before the read started
+        """
+        if max(self._changed.get(discord_id, 0), self._cleared) > generation:
+            return
+        self._store(discord_id, access_level)
+
+    def _store(self, discord_id: int, access_level: int):
+        self._entries[discord_id] = (access_level, time.monotonic() + self.ttl)
+        self._entries.move_to_end(discord_id)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, discord_id: int):
+        """
+        invalidate - Removes an employee from the cache, so their access level is fetched again next time.
+
+        Args:
+            discord_id (int): The discord ID of the employee
+        """
+        self._generation += 1
+        self._changed[discord_id] = self._generation
+        self._entries.pop(discord_id, None)
+
+    def clear(self):
+        self._generation += 1
+        self._cleared = self._generation
+        # Every earlier change is older than the clear, so they don't need remembering
+        self._changed.clear()
+        self._entries.clear()
+
+    @property
+    def generation(self) -> int:
+        # Taken before reading an access level from the database, and passed to fill
+        return self._generation
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SnowflakeIndex:
+    def __init__(self):
+        """
+        SnowflakeIndex - Maps the discord channel IDs of projects and tasks to their row IDs, so a channel can be resolved to a project or task without querying the database. It's warmed at startup, and cogs which create projects or tasks must add them to it.
+        """
+        self.projects_by_forum_channel: dict[int, int] = {}
+        self.projects_by_main_thread: dict[int, int] = {}
+        self.main_threads_by_project: dict[int, int] = {}
+        self.tasks_by_thread_channel: dict[int, int] = {}
+        self.thread_channels_by_task: dict[int, int] = {}
+
+    def add_project(
+        self, project_id: int, forum_channel_id: int, main_thread_id: int = None
+    ):
+        if forum_channel_id:
+            self.projects_by_forum_channel[forum_channel_id] = project_id
+        if main_thread_id:
+            self.projects_by_main_thread[main_thread_id] = project_id
+            self.main_threads_by_project[project_id] = main_thread_id
+
+    def add_task(self, task_id: int, thread_channel_id: int):
+        if thread_channel_id:
+            self.tasks_by_thread_channel[thread_channel_id] = task_id
+            self.thread_channels_by_task[task_id] = thread_channel_id
+
+    def remove_task(self, thread_channel_id: int):
+        task_id = self.tasks_by_thread_channel.pop(thread_channel_id, None)
+        self.thread_channels_by_task.pop(task_id, None)
+
+    def clear(self):
+        self.projects_by_forum_channel.clear()
+        self.projects_by_main_thread.clear()
+        self.main_threads_by_project.clear()
+        self.tasks_by_thread_channel.clear()
+        self.thread_channels_by_task.clear()
+
+
+class PrefixIndex:
+    def __init__(self):
+        """
+        PrefixIndex - Finds names by prefix for autocomplete without querying the database. Names are kept casefolded in sorted lists, one of whole names and one of the rest of each name from its second word onwards, so the names starting with a prefix (or with a later word starting with it) are found with a binary search. It's warmed at startup, and cogs which create, rename or delete the named rows must keep it up to date.
+        """
+        # row ID: name
+        self.names: dict[int, str] = {}
+        # Sorted (casefolded name, row ID) pairs
+        self._starts: list[tuple[str, int]] = []
+        # Sorted (casefolded name from its second word onwards, row ID) pairs, with one for each later word
+        self._later_words: list[tuple[str, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _keys(
+        row_id: int, name: str
+    ) -> tuple[tuple[str, int], list[tuple[str, int]]]:
+        words = name.casefold().split()
+        return (" ".join(words), row_id), [
+            (" ".join(words[i:]), row_id) for i in range(1, len(words))
+        ]
+
+    def load(self, rows: Iterable[tuple[int, str]]):
+        """
+        load - Replaces every name in the index, sorting them once rather than inserting them one by one.
+
+        Args:
+            rows (Iterable[tuple[int, str]]): (row ID, name) pairs. Rows without a name are skipped.
+        """
+        self.clear()
+        for row_id, name in rows:
+            if name:
+                self.names[row_id] = name
+                start, later_words = self._keys(row_id, name)
+                self._starts.append(start)
+                self._later_words.extend(later_words)
+        self._starts.sort()
+        self._later_words.sort()
+
+    def add(self, row_id: int, name: str):
+        self.remove(row_id)
+        if not name:
+            return
+        self.names[row_id] = name
+        start, later_words = self._keys(row_id, name)
+        bisect.insort(self._starts, start)
+        for key in later_words:
+            bisect.insort(self._later_words, key)
+
+    def rename(self, row_id: int, name: str):
+        # Only rows which are already indexed are renamed, so updates to rows which aren't indexed can be passed straight through
+        if row_id in self.names:
+            self.add(row_id, name)
+
+    def remove(self, row_id: int):
+        if (name := self.names.pop(row_id, None)) is None:
+            return
+        start, later_words = self._keys(row_id, name)
+        for keys, key in [(self._starts, start)] + [
+            (self._later_words, key) for key in later_words
+        ]:
+            index = bisect.bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                del keys[index]
+
+    def search(
+        self, prefix: str, limit: int, include: Callable[[int], bool] = None
+    ) -> list[tuple[int, str]]:
+        """
+        search - Finds the names with a word starting with a prefix. Names starting with the prefix come first, followed by those with a later word starting with it, each in alphabetical order.
+
+        Args:
+            prefix (str): The prefix, matched case-insensitively. An empty prefix matches every name.
+            limit (int): The maximum number of names to return
+            include (Callable[[int], bool], optional): Only names whose row ID this returns True for are returned (and counted towards the limit). Defaults to None (every name).
+
+        Returns:
+            list[tuple[int, str]]: (row ID, name) pairs
+        """
+        prefix = " ".join(prefix.casefold().split())
+        matches: dict[int, str] = {}
+        for keys in (self._starts, self._later_words):
+            index = bisect.bisect_left(keys, (prefix,))
+            while (
+                len(matches) < limit
+                and index < len(keys)
+                and keys[index][0].startswith(prefix)
+            ):
+                row_id = keys[index][1]
+                index += 1
+                if include and not include(row_id):
+                    continue
+                # A name can have several later words starting with the prefix
+                matches.setdefault(row_id, self.names[row_id])
+        return list(matches.items())
+
+    def clear(self):
+        self.names.clear()
+        self._starts.clear()
+        self._later_words.clear()
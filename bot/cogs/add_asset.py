@@ -0,0 +1,89 @@
+import logging
+import os
+from typing import TYPE_CHECKING
+
+import aiohttp
+import discord
+from asset_storage import AssetStorage
+from const import WHITE_X_MARK
+from discord import Interaction, app_commands
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+log = logging.getLogger(__name__)
+
+
+class AddAssetCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+        # The directory FileBrowser serves (or a subdirectory of it), and the URL it's served at
+        directory = os.getenv("ASSET_STORAGE_DIR")
+        base_url = os.getenv("ASSET_BASE_URL")
+        self.storage = (
+            AssetStorage(directory, base_url) if directory and base_url else None
+        )
+
+    async def cog_unload(self):
+        if self.storage:
+            await self.storage.close()
+
+    @app_commands.command(name="add_asset")
+    async def add_asset(self, interaction: Interaction, file: discord.Attachment):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not self.storage:
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} Asset storage isn't set up. Please contact an administrator.",
+                ephemeral=True,
+            )
+            return
+
+        if not isinstance(interaction.channel, discord.Thread) or not (
+            task_id := await self.bot.db.resolve_task_id(interaction.channel.id)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} This command must be used in a task thread.",
+                ephemeral=True,
+            )
+            return
+
+        # Large files can take a while to download
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        try:
+            stored_asset = await self.storage.store(file.url, file.filename)
+        except (aiohttp.ClientError, OSError):
+            log.exception("Failed to store %s", file.url)
+            await interaction.followup.send(
+                f"{WHITE_X_MARK} Failed to store `{file.filename}`. Please try again.",
+                ephemeral=True,
+            )
+            return
+
+        _, added = await self.bot.db.add_asset(task_id, stored_asset.link)
+        if not added:
+            await interaction.followup.send(
+                f":white_check_mark: This task already has `{file.filename}`: {stored_asset.link}",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.followup.send(
+            f":white_check_mark: Added `{file.filename}` to this task: {stored_asset.link}"
+            + (
+                " (an identical file was already stored, so it's shared)"
+                if stored_asset.deduplicated
+                else ""
+            ),
+            ephemeral=True,
+        )
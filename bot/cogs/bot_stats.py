@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import math
+import os
+from typing import TYPE_CHECKING
+
+from const import METRICS_FILE_INTERVAL, WHITE_X_MARK
+from discord import Interaction, app_commands
+from discord.ext import commands, tasks
+from instrumentation import DEADLINE_WARNING, LATENCY_BUCKETS, Histogram, metrics
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+log = logging.getLogger(__name__)
+
+# Discord messages are capped at 2000 characters
+MAX_STATS_LENGTH = 1900
+# Leaves most of a stall's message for its stack, however many database calls were in progress
+MAX_STALL_HEADER_LENGTH = 600
+
+
+def format_seconds(seconds: float) -> str:
+    # Quantiles past the last bucket can't be estimated
+    if seconds == math.inf:
+        return f">{LATENCY_BUCKETS[-1]}s"
+    return f"{seconds * 1000:.0f}ms"
+
+
+def write_file(path: str, text: str):
+    # Written to a temporary file first, so the scraper never reads a half written file
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as f:
+        f.write(text)
+    os.replace(temporary_path, path)
+
+
+class BotStatsCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+        # For node_exporter's textfile collector, or anything else which reads Prometheus text files
+        self.metrics_file = os.getenv("METRICS_FILE")
+
+    async def cog_load(self):
+        if self.metrics_file:
+            self.write_metrics_file.start()
+
+    async def cog_unload(self):
+        self.write_metrics_file.cancel()
+
+    @tasks.loop(seconds=METRICS_FILE_INTERVAL)
+    async def write_metrics_file(self):
+        try:
+            await asyncio.to_thread(
+                write_file,
+                self.metrics_file,
+                metrics.render_prometheus(self.bot.db.access_levels),
+            )
+        except OSError:
+            log.exception("Failed to write metrics to %s", self.metrics_file)
+
+    # discord.py doesn't allow cog methods named bot_*, so the command is named explicitly
+    @app_commands.command(name="bot_stats")
+    async def show_stats(self, interaction: Interaction):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        lines = [
+            f"{'command':<20} {'count':>6} {'p50':>7} {'p99':>7} {'db':>7} {'rest':>7} {'local':>7} {'slow':>5}"
+        ]
+        # Slowest commands first, since those are the ones worth looking at
+        for name, command_metrics in sorted(
+            metrics.commands.items(), key=lambda item: -item[1].total.quantile(0.99)
+        ):
+            lines.append(
+                f"{name[:20]:<20} {command_metrics.total.count:>6}"
+                f" {format_seconds(command_metrics.total.quantile(0.5)):>7}"
+                f" {format_seconds(command_metrics.total.quantile(0.99)):>7}"
+                f" {format_seconds(command_metrics.db.mean):>7}"
+                f" {format_seconds(command_metrics.rest.mean):>7}"
+                f" {format_seconds(command_metrics.local.mean):>7}"
+                f" {command_metrics.near_deadline:>5}"
+            )
+
+        slowest_db_calls: list[tuple[str, Histogram]] = sorted(
+            metrics.db_calls.items(), key=lambda item: -item[1].quantile(0.99)
+        )[:5]
+        lines += ["", f"{'db call':<35} {'count':>6} {'p99':>7}"]
+        lines += [
+            f"{name[-35:]:<35} {histogram.count:>6} {format_seconds(histogram.quantile(0.99)):>7}"
+            for name, histogram in slowest_db_calls
+        ]
+
+        access_levels = self.bot.db.access_levels
+        # Shown above the tables, so it's never cut off with them
+        header = (
+            f"Access level cache: {access_levels.hit_rate:.1%} hit rate ({access_levels.hits} hits, {access_levels.misses} misses, {len(access_levels)} cached)\n"
+            f"Latency since startup (db, rest and local are averages, slow counts responses over {DEADLINE_WARNING}s):"
+        )
+
+        stats = "\n".join(lines)
+        if len(stats) > MAX_STATS_LENGTH - len(header):
+            stats = stats[: MAX_STATS_LENGTH - len(header)].rsplit("\n", 1)[0]
+
+        await interaction.response.send_message(
+            f"{header}\n```\n{stats}\n```",
+            ephemeral=True,
+        )
+
+    @app_commands.command(name="loop_stalls")
+    async def loop_stalls(self, interaction: Interaction, stall: int = None):
+        # stall is the number of a stall to show the stack of, where 1 is the most recent
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        # Most recent first, skipping one which is still being measured
+        stalls = [
+            loop_stall
+            for loop_stall in reversed(self.bot.watchdog.stalls)
+            if loop_stall.duration is not None
+        ]
+        if not stalls:
+            await interaction.response.send_message(
+                f"The event loop hasn't been blocked for over {self.bot.watchdog.threshold}s since startup.",
+                ephemeral=True,
+            )
+            return
+
+        if stall is None:
+            lines = [f"{'#':>3} {'started (UTC)':<19} {'blocked':>7} {'by':<40} db"]
+            lines += [
+                f"{i:>3} {loop_stall.started_at:%Y-%m-%d %H:%M:%S} {format_seconds(loop_stall.duration):>7}"
+                f" {loop_stall.culprit[:40]:<40} {loop_stall.db_call or ', '.join(loop_stall.db_calls_in_progress) or '-'}"
+                for i, loop_stall in enumerate(stalls, start=1)
+            ]
+            text = "\n".join(lines)
+            if len(text) > MAX_STATS_LENGTH:
+                text = text[:MAX_STATS_LENGTH].rsplit("\n", 1)[0]
+            await interaction.response.send_message(
+                f"Recent event loop stalls (use the stall option to see one's stack):\n```\n{text}\n```",
+                ephemeral=True,
+            )
+            return
+
+        if not 1 <= stall <= len(stalls):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} There is no stall {stall}, only {len(stalls)} have been recorded.",
+                ephemeral=True,
+            )
+            return
+
+        loop_stall = stalls[stall - 1]
+        header = (
+            f"Blocked for {format_seconds(loop_stall.duration)} at {loop_stall.started_at:%Y-%m-%d %H:%M:%S} UTC by {loop_stall.culprit}"
+            f" (database call: {loop_stall.db_call or 'none'}, in progress on the executor: {', '.join(loop_stall.db_calls_in_progress) or 'none'})"
+        )
+        if len(header) > MAX_STALL_HEADER_LENGTH:
+            header = header[: MAX_STALL_HEADER_LENGTH - 4] + "...)"
+        # The innermost frames are the interesting ones, so the stack is cut from the outside in
+        stack = ""
+        for frame in reversed(loop_stall.stack):
+            if len(header) + len(stack) + len(frame) > MAX_STATS_LENGTH:
+                break
+            stack = frame + stack
+        await interaction.response.send_message(
+            f"{header}:\n```\n{stack}```", ephemeral=True
+        )
+
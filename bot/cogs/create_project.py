@@ -1,3 +1,6 @@
+import asyncio
+import logging
+import time
 from typing import TYPE_CHECKING
 
 import discord
@@ -5,10 +8,14 @@ from const import *
 from database_obj import *
 from discord import Interaction, app_commands, ui
 from discord.ext import commands
+from embeds import build_project_embed
+from instrumentation import timed_submit
 
 if TYPE_CHECKING:
     from main import PrimaryBot
 
+log = logging.getLogger(__name__)
+
 
 class CreateProjectUI(ui.Modal):
     # Initialize the UI with fields
@@ -37,55 +44,57 @@ class CreateProjectUI(ui.Modal):
         super().__init__(title="Create Project")
         self.bot: PrimaryBot = bot
 
+    @timed_submit("create_project submit")
     async def on_submit(self, interaction: Interaction):
-        # Create the forum channel
-        project_forum_channel: discord.ForumChannel = await self.bot.get_guild(
-            GUILD_ID
-        ).create_forum(
-            name=self.name.value.replace(" ", "-").lower(),
-            category=self.bot.get_channel(PROJECTS_CATEGORY_ID),
-            overwrites={
-                self.bot.get_guild(GUILD_ID).default_role: discord.PermissionOverwrite(send_messages=False)
-            }
+        # Setting up the forum takes several API calls, so acknowledge the interaction before the deadline and report progress as we go
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        timings: dict[str, float] = {}
+        start_time = time.perf_counter()
+        try:
+            project_forum_channel = await self.create_project(interaction, timings)
+        except Exception:
+            await interaction.edit_original_response(
+                content=f"{WHITE_X_MARK} Failed to create the project. Please contact an administrator."
+            )
+            raise
+        finally:
+            log.info(
+                "Project setup for %r took %.3fs (%s)",
+                self.name.value,
+                time.perf_counter() - start_time,
+                ", ".join(f"{step}: {duration:.3f}s" for step, duration in timings.items()),
+            )
+
+        await interaction.edit_original_response(
+            content=f":white_check_mark: Successfully created project in {project_forum_channel.mention}"
         )
 
+    async def create_project(
+        self, interaction: Interaction, timings: dict[str, float]
+    ) -> discord.ForumChannel:
         # I don't care that it's not a word
-        stati: list[Status] = self.bot.query(Status).all()
-        for status in stati:
-            await project_forum_channel.create_tag(name=status.name, emoji=status.emoji, moderated=True)
-
-        # Create the embed the "General Discussion Thread" will be initialized with
-        main_thread_embed = discord.Embed(
-            color=discord.Color(4705791),
-            title=self.name.value,
-            description=self.description.value,
+        stati = self.bot.db.reference_data.statuses
+
+        # Create the forum channel with every status tag in a single request, rather than one request per tag
+        project_forum_channel: discord.ForumChannel = await self.bot.timed(
+            "create_forum",
+            self.bot.get_guild(GUILD_ID).create_forum(
+                name=self.name.value.replace(" ", "-").lower(),
+                category=self.bot.get_channel(PROJECTS_CATEGORY_ID),
+                overwrites={
+                    self.bot.get_guild(GUILD_ID).default_role: discord.PermissionOverwrite(send_messages=False)
+                },
+                available_tags=[
+                    discord.ForumTag(name=status.name, emoji=status.emoji, moderated=True)
+                    for status in stati
+                ],
+            ),
+            timings,
         )
-        # Don't add embed parameters if they weren't defined (since they're not required)
-        if self.docs_link.value:
-            main_thread_embed.add_field(
-                name="Documentation", value=self.docs_link.value, inline=False
-            )
-        if self.repo_link.value:
-            main_thread_embed.add_field(
-                name="Repository", value=self.repo_link.value, inline=False
-            )
-        if self.storage_link.value:
-            main_thread_embed.add_field(
-                name="Storage", value=self.storage_link.value, inline=False
-            )
-        main_thread_embed.add_field(name="Total Tasks", value="0", inline=True)
-        main_thread_embed.add_field(name="Completed Tasks", value="0", inline=True)
-        main_thread_embed.add_field(name="Incomplete Tasks", value="0", inline=True)
-
-        # Create the "General Discussion Thread" and initialize it with the embed
-        main_thread: discord.channel.ThreadWithMessage = (
-            await project_forum_channel.create_thread(
-                name="General Discussion", embed=main_thread_embed
-            )
+        await interaction.edit_original_response(
+            content=f":hourglass: Created {project_forum_channel.mention}, setting up the General Discussion thread..."
         )
-        # Pin the embed in the thread, and pin the thread itself in the forum
-        await main_thread.thread.edit(pinned=True)
-        await main_thread.message.pin()
 
         new_project = Project(
             name=self.name.value,
@@ -94,15 +103,32 @@ class CreateProjectUI(ui.Modal):
             repo_link=self.repo_link.value or None,
             storage_link=self.storage_link.value or None,
             discord_forum_channel_id=project_forum_channel.id,
-            discord_main_thread_id = main_thread.thread.id,
-            discord_main_thread_first_message_id=main_thread.message.id,
         )
-        self.bot.add_obj(new_project)
-        self.bot.commit()
 
-        await interaction.response.send_message(
-            f":white_check_mark: Successfully created project in {project_forum_channel.mention}", ephemeral=True
+        # Create the "General Discussion Thread" and initialize it with the project embed
+        main_thread: discord.channel.ThreadWithMessage = await self.bot.timed(
+            "create_thread",
+            project_forum_channel.create_thread(
+                name="General Discussion", embed=build_project_embed(new_project)
+            ),
+            timings,
         )
+        new_project.discord_main_thread_id = main_thread.thread.id
+
+        # Pinning the thread in the forum, pinning the embed in the thread, and saving the project don't depend on each other
+        await asyncio.gather(
+            self.bot.timed("pin_thread", main_thread.thread.edit(pinned=True), timings),
+            self.bot.timed("pin_message", main_thread.message.pin(), timings),
+            self.bot.timed("save_project", self.bot.db.create_project(new_project), timings),
+        )
+        self.bot.db.snowflakes.add_project(
+            new_project.id,
+            new_project.discord_forum_channel_id,
+            new_project.discord_main_thread_id,
+        )
+        self.bot.db.project_names.add(new_project.id, new_project.name)
+
+        return project_forum_channel
 
 
 class CreateProjectCog(commands.Cog):
@@ -112,7 +138,9 @@ class CreateProjectCog(commands.Cog):
 
     @app_commands.command(name="create_project")
     async def create_project(self, interaction: Interaction):
-        if not self.bot.db.check_access_level(interaction.user.id, self.access_level):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
             await interaction.response.send_message(
                 ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
                 ephemeral=True,
@@ -1,12 +1,15 @@
-from datetime import datetime
+import re
+from datetime import date, datetime
 from typing import TYPE_CHECKING, Literal
 
 import discord
+from autocomplete import department_autocomplete, task_autocomplete
 from const import GUILD_ID, WHITE_X_MARK
 from database_obj import *
 from discord import Interaction, app_commands, ui
-from discord.app_commands import Choice
 from discord.ext import commands
+from embeds import build_task_embed, refresh_project_embed
+from reference_data import DepartmentInfo
 
 if TYPE_CHECKING:
     from main import PrimaryBot
@@ -19,56 +22,50 @@ async def create_task_handler(
     project_id: int,
     task_name: str,
     description: str = None,
-    department: Choice = None,
-    parent_task_thread: discord.Thread = None,
+    department: DepartmentInfo = None,
+    parent_task_thread: discord.abc.Snowflake = None,
+    due_date: date = None,
 ):
     bot: PrimaryBot = bot  # PrimaryBot is not defined when trying to type hint this in the function header, so we have to redefine it here to get the proper type hint
 
-    # Create the embed the "General Discussion Thread" will be initialize with
-    task_thread_embed = discord.Embed(
-        color=discord.Color(4705791),
-        title=task_name,
+    new_task = Task(
+        project_id=project_id,
+        name=task_name,
         description=description,
+        department=department.id if department else None,
+        parent_task_id=parent_task_thread.id if parent_task_thread else None,
+        due_date=due_date,
     )
-    task_thread_embed.add_field(
-        name="Parent Task",
-        value=(parent_task_thread.mention if parent_task_thread else None)
-        or "None Set",
-        inline=True,
-    )
-    task_thread_embed.add_field(name="Assignee", value="None Set", inline=True)
-    task_thread_embed.add_field(name="Due Date", value="None Set", inline=True)
-    task_thread_embed.add_field(
-        name="Department",
-        value=(department.name if department else None) or "None Set",
-        inline=True,
-    )
-    task_thread_embed.add_field(name="Status", value="Unassigned", inline=True)
 
+    # Create the task's thread, initialized with the task embed
     task_thread: discord.channel.ThreadWithMessage = (
         await project_forum_channel.create_thread(
-            name=task_name, embed=task_thread_embed
+            name=task_name,
+            embed=build_task_embed(
+                new_task, department_name=department.name if department else None
+            ),
         )
     )
     await task_thread.message.pin()
 
-    # Update the database with the new project
-    new_project = Task(
-        project_id=project_id,
-        name=task_name,
-        description=description,
-        department=department.value if department else None,
-        parent_task_id=parent_task_thread.id if parent_task_thread else None,
-        discord_thread_channel_id=task_thread.thread.id,
-    )
-    bot.add_obj(new_project)
-    bot.commit()
+    # Update the database with the new task
+    new_task.discord_thread_channel_id = task_thread.thread.id
+    await bot.db.create_task(new_task)
+    bot.db.snowflakes.add_task(new_task.id, new_task.discord_thread_channel_id)
+    bot.db.task_names.add(new_task.id, new_task.name)
+    bot.db.task_graph.set_due_date(new_task.id, due_date)
 
     await interaction.response.send_message(
         f":white_check_mark: Successfully created task in {task_thread.thread.mention}",
         ephemeral=True,
     )
 
+    # Update the task counts in the project's "General Discussion" thread
+    refresh_project_embed(bot, project_id)
+
+    if due_date:
+        await bot.reminders.reschedule_tasks([new_task.id])
+
 
 class CreateTaskCog(commands.Cog):
     def __init__(self, bot: commands.Bot, access_level: int):
@@ -76,26 +73,21 @@ class CreateTaskCog(commands.Cog):
         self.access_level = access_level
 
     @app_commands.command(name="create_task")
-    @app_commands.choices(
-        department=[
-            Choice(name="Mechanic", value=1),
-            Choice(name="Developer", value=2),
-            Choice(name="Artist", value=3),
-            Choice(name="Builder", value=4),
-            Choice(name="Marketing", value=5),
-            Choice(name="Finance", value=6),
-            Choice(name="HR", value=7),
-        ]
+    @app_commands.autocomplete(
+        department=department_autocomplete, parent_task=task_autocomplete
     )
     async def create_task(
         self,
         interaction: Interaction,
         task_name: str,
         description: str = None,
-        department: Choice[int] = None,
-        parent_task: discord.Thread = None,
+        department: str = None,
+        parent_task: str = None,
+        due_date: str = None,
     ):
-        if not self.bot.db.check_access_level(interaction.user.id, self.access_level):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
             await interaction.response.send_message(
                 ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
                 ephemeral=True,
@@ -113,34 +105,54 @@ class CreateTaskCog(commands.Cog):
 
         project_forum_channel: discord.ForumChannel = interaction.channel.parent
         # Check if the parent forum channel is a valid project
-        project_obj: Project
+        project_id: int
         if not (
-            project_obj := self.bot.query(Project)
-            .filter_by(discord_forum_channel_id=project_forum_channel.id)
-            .first()
+            project_id := await self.bot.db.resolve_project_id(project_forum_channel.id)
         ):
             await interaction.response.send_message(
                 f"{WHITE_X_MARK} {project_forum_channel.mention} is not a valid project.",
                 ephemeral=True,
             )
             return
-        else:
-            project_id: int = project_obj.id
 
         # TODO modal stuff, subgroup
 
-        # Make sure the parent task is valid (not set to itself and is a valid task channel)
-        if parent_task and (
-            not self.bot.query(Task)
-            .filter_by(discord_thread_channel_id=parent_task.id)
-            .first()
+        department_info = None
+        if department and not (
+            department_info := self.bot.db.reference_data.get_department(department)
         ):
             await interaction.response.send_message(
-                f"{WHITE_X_MARK} {parent_task.mention} is not a valid task.",
+                f"{WHITE_X_MARK} {department} is not a valid department.",
                 ephemeral=True,
             )
             return
 
+        due_date_value = None
+        if due_date:
+            try:
+                due_date_value = date.fromisoformat(due_date)
+            except ValueError:
+                await interaction.response.send_message(
+                    f"{WHITE_X_MARK} {due_date} is not a YYYY-MM-DD date.",
+                    ephemeral=True,
+                )
+                return
+
+        # Make sure the parent task is valid (not set to itself and is a valid task channel). Autocomplete gives its thread ID, but a thread mention works too.
+        parent_task_thread = None
+        if parent_task:
+            parent_task_thread_id = int(re.sub(r"\D", "", parent_task) or 0)
+            if not parent_task_thread_id or not await self.bot.db.resolve_task_id(
+                parent_task_thread_id
+            ):
+                await interaction.response.send_message(
+                    f"{WHITE_X_MARK} {parent_task} is not a valid task.",
+                    ephemeral=True,
+                )
+                return
+            # Only its ID is needed, so the thread isn't fetched
+            parent_task_thread = discord.Object(parent_task_thread_id)
+
         await create_task_handler(
             self.bot,
             interaction,
@@ -148,7 +160,7 @@ class CreateTaskCog(commands.Cog):
             project_id,
             task_name,
             description,
-            due_date=None,
-            department=department,
-            parent_task_thread=parent_task,
+            department=department_info,
+            parent_task_thread=parent_task_thread,
+            due_date=due_date_value,
         )
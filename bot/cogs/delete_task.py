@@ -0,0 +1,55 @@
+from typing import TYPE_CHECKING
+
+import discord
+from const import WHITE_X_MARK
+from database_obj import *
+from discord import Interaction, app_commands
+from discord.ext import commands
+from embeds import refresh_project_embed, refresh_task_embed
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+
+class DeleteTaskCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+
+    @app_commands.command(name="delete_task")
+    async def delete_task(self, interaction: Interaction):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not isinstance(interaction.channel, discord.Thread) or not (
+            task_id := await self.bot.db.resolve_task_id(interaction.channel.id)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} This command must be used in a task thread.",
+                ephemeral=True,
+            )
+            return
+
+        # This also removes the task from the project's task counts and its dependencies
+        stats, subtask_ids = await self.bot.db.delete_task(task_id)
+        self.bot.db.snowflakes.remove_task(interaction.channel.id)
+        self.bot.db.task_names.remove(task_id)
+        self.bot.db.task_graph.remove_task(task_id)
+        self.bot.reminders.unschedule_task(task_id)
+
+        await interaction.response.send_message(
+            f":white_check_mark: Successfully deleted task {interaction.channel.name}.",
+            ephemeral=True,
+        )
+
+        refresh_project_embed(self.bot, stats.project_id)
+        # The subtasks' embeds still mention this task as their parent
+        for subtask_id in subtask_ids:
+            refresh_task_embed(self.bot, subtask_id)
+        await interaction.channel.delete()
@@ -5,6 +5,8 @@ from const import *
 from database_obj import *
 from discord import Interaction, app_commands, ui
 from discord.ext import commands
+from embeds import refresh_project_embed
+from instrumentation import timed_submit
 
 if TYPE_CHECKING:
     from main import PrimaryBot
@@ -33,59 +35,38 @@ class EditProjectUI(ui.Modal):
         label="Storage Link", required=False, placeholder="https://drive.google.com/..."
     )
 
-    def __init__(self, bot: commands.Bot, project_id: int, project_main_thread_id: int):
+    def __init__(self, bot: commands.Bot, project: Project):
         super().__init__(title="Edit Project")
         self.bot: PrimaryBot = bot
-        self.project_id = project_id
-        self.project_main_thread_id = project_main_thread_id
+        self.project_id = project.id
+        self.project_main_thread_id = project.discord_main_thread_id
 
-        self.name.default = self.bot.query(Project).filter_by(id=project_id).first().name
+        # Fill in the current values, so fields which aren't being changed aren't cleared
+        self.name.default = project.name
+        self.description.default = project.description
+        self.docs_link.default = project.docs_link
+        self.repo_link.default = project.repo_link
+        self.storage_link.default = project.storage_link
 
+    @timed_submit("edit_project submit")
     async def on_submit(self, interaction: Interaction):
-        # Create the embed the "General Discussion Thread" will be initialized with
-        main_thread_embed = discord.Embed(
-            color=discord.Color(4705791),
-            title=self.name.value,
-            description=self.description.value,
+        # Update the project in the database
+        await self.bot.db.update_project(
+            self.project_id,
+            name=self.name.value,
+            description=self.description.value or None,
+            docs_link=self.docs_link.value or None,
+            repo_link=self.repo_link.value or None,
+            storage_link=self.storage_link.value or None,
         )
-        # Don't add embed parameters if they weren't defined (since they're not required)
-        if self.docs_link.value:
-            main_thread_embed.add_field(
-                name="Documentation", value=self.docs_link.value, inline=False
-            )
-        if self.repo_link.value:
-            main_thread_embed.add_field(
-                name="Repository", value=self.repo_link.value, inline=False
-            )
-        if self.storage_link.value:
-            main_thread_embed.add_field(
-                name="Storage", value=self.storage_link.value, inline=False
-            )
-        main_thread_embed.add_field(name="Total Tasks", value="0", inline=True)
-        main_thread_embed.add_field(name="Completed Tasks", value="0", inline=True)
-        main_thread_embed.add_field(name="Incomplete Tasks", value="0", inline=True)
-
-        # TODO update total task, completed tasks, and incomplete tasks fields in both task creation and task completion and deletion
+        self.bot.db.project_names.add(self.project_id, self.name.value)
 
-        # Update the "General Discussion Thread" with the new embed\
+        # Update the forum name, and the "General Discussion Thread" embed (which keeps its task counts)
         main_thread_channel: discord.Thread = self.bot.get_channel(self.project_main_thread_id)
         await main_thread_channel.parent.edit(
             name=self.name.value
         )
-
-        await main_thread_channel.get_partial_message(self.project_main_thread_id).edit(embed=main_thread_embed)
-
-        # Update the project in the database
-        self.bot.query(Project).filter_by(id=self.project_id).update(
-            {
-                "name": self.name.value,
-                "description": self.description.value,
-                "docs_link": self.docs_link.value,
-                "repo_link": self.repo_link.value,
-                "storage_link": self.storage_link.value,
-            }
-        )
-        self.bot.commit()
+        refresh_project_embed(self.bot, self.project_id)
 
         await interaction.response.send_message(
             ":white_check_mark: Successfully modified project", ephemeral=True
@@ -99,7 +80,9 @@ class EditProjectCog(commands.Cog):
 
     @app_commands.command(name="edit_project")
     async def edit_project(self, interaction: Interaction):
-        if not self.bot.db.check_access_level(interaction.user.id, self.access_level):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
             await interaction.response.send_message(
                 ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
                 ephemeral=True,
@@ -119,9 +102,9 @@ class EditProjectCog(commands.Cog):
         # Check if the parent forum channel is a valid project
         project_obj: Project
         if not (
-            project_obj := self.bot.query(Project)
-            .filter_by(discord_forum_channel_id=project_forum_channel.id)
-            .first()
+            project_obj := await self.bot.db.get_project(
+                forum_channel_id=project_forum_channel.id
+            )
         ):
             await interaction.response.send_message(
                 f"{WHITE_X_MARK} {project_forum_channel.mention} is not a valid project.",
@@ -129,4 +112,4 @@ class EditProjectCog(commands.Cog):
             )
             return
 
-        await interaction.response.send_modal(EditProjectUI(self.bot, project_obj.id, project_obj.discord_main_thread_id))
+        await interaction.response.send_modal(EditProjectUI(self.bot, project_obj))
@@ -1,50 +1,121 @@
-import time
+import threading
 from io import StringIO
 from typing import TYPE_CHECKING
 
 import discord
-from discord import Interaction, app_commands
+from const import (
+    EXEC_QUERY_CHUNK_SIZE,
+    EXEC_QUERY_MAX_BYTES,
+    EXEC_QUERY_MAX_ROWS,
+    EXEC_QUERY_TIMEOUT,
+)
+from discord import Interaction, app_commands, ui
+from discord.app_commands import Choice
 from discord.ext import commands
+from query_export import QueryExport, export_query
 
 if TYPE_CHECKING:
     from main import PrimaryBot
 
 
+class CancelQueryView(ui.View):
+    def __init__(self, author_id: int):
+        super().__init__(timeout=None)
+        self.author_id = author_id
+        # Checked by the query export between chunks of rows
+        self.cancel_event = threading.Event()
+
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        return interaction.user.id == self.author_id
+
+    @ui.button(label="Cancel", style=discord.ButtonStyle.danger)
+    async def cancel(self, interaction: Interaction, button: ui.Button):
+        self.cancel_event.set()
+        button.disabled = True
+        await interaction.response.edit_message(
+            content=":hourglass: Cancelling query...", view=self
+        )
+
+
 class ExecQueryCog(commands.Cog):
     def __init__(self, bot: commands.Bot, access_level: int):
         self.bot: PrimaryBot = bot
         self.access_level = access_level
 
     @app_commands.command(name="exec_query")
+    @app_commands.choices(
+        format=[
+            Choice(name="Table", value="table"),
+            Choice(name="CSV", value="csv"),
+            Choice(name="JSON Lines", value="jsonl"),
+            Choice(name="CSV (gzip)", value="csv.gz"),
+            Choice(name="JSON Lines (gzip)", value="jsonl.gz"),
+        ]
+    )
     async def exec_query(
-        self, interaction: Interaction, query: str, visible_to_all: bool = False
+        self,
+        interaction: Interaction,
+        query: str,
+        visible_to_all: bool = False,
+        format: Choice[str] = None,
     ):
-        if not self.bot.db.check_access_level(interaction.user.id, self.access_level):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
             await interaction.response.send_message(
                 ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
                 ephemeral=True,
             )
             return
 
+        await interaction.response.defer(ephemeral=not visible_to_all, thinking=True)
+        cancel_view = CancelQueryView(interaction.user.id)
+        await interaction.edit_original_response(
+            content=":hourglass: Running query...", view=cancel_view
+        )
+
         try:
-            # Get query results and query execution time
-            prev_time = time.time()
-            query_result = self.bot.db.execute(query)
-            query_time = round(time.time() - prev_time, 3)
+            # The query runs (and its rows are formatted) on the database executor, so a large result doesn't stall the bot
+            export: QueryExport = await self.bot.db.run(
+                export_query,
+                query,
+                max_rows=EXEC_QUERY_MAX_ROWS,
+                max_bytes=EXEC_QUERY_MAX_BYTES,
+                chunk_size=EXEC_QUERY_CHUNK_SIZE,
+                timeout=EXEC_QUERY_TIMEOUT,
+                cancel_event=cancel_view.cancel_event,
+                output_format=format.value if format else "table",
+            )
+        except Exception as e:
+            # Send the error as a file, since it can easily be more than 2000 characters
+            file_obj = discord.File(
+                StringIO(f"Query failed with error:\n\n{str(e)}"),
+                filename="query_result.txt",
+            )
+            await interaction.edit_original_response(
+                content="Query failed", attachments=[file_obj], view=None
+            )
+            return
+        finally:
+            cancel_view.stop()
 
-            # Generate the initial status message
-            output = f"Query OK, {query_result.rowcount} row(s) found/affected ({query_time}s)"
-            # If there was any output from the query (like in a SELECT statement), add it to the output
-            if query_result.returns_rows:
-                output += f"\n\n{self.bot.db.style_query(query_result)}"
+        # Generate the status message
+        if export.output is None:
+            await interaction.edit_original_response(
+                content=f"Query OK, {export.row_count} row(s) affected ({export.elapsed_time}s)",
+                view=None,
+            )
+            return
 
-        except Exception as e:
-            # This will likely not execute in the event of of invalid SQL, so calculate it here
-            query_time = round(time.time() - prev_time, 3)
-            output = f"Query failed ({query_time}s) with error:\n\n{str(e)}"
+        output = f"Query OK, {export.row_count} row(s) found ({export.elapsed_time}s)"
+        if export.truncated:
+            output += f", output stopped early ({export.truncated})"
 
         # Send the output as a file so we can send more than 2000 characters
-        file_obj = discord.File(StringIO(output), filename="query_result.txt")
-        await interaction.response.send_message(
-            file=file_obj, ephemeral=not visible_to_all
+        export.output.seek(0)
+        file_obj = discord.File(
+            export.output, filename=f"query_result.{export.extension}"
+        )
+        await interaction.edit_original_response(
+            content=output, attachments=[file_obj], view=None
         )
@@ -0,0 +1,316 @@
+import asyncio
+import logging
+from collections import defaultdict, deque
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+import discord
+from const import (
+    IMPORT_TASKS_MAX_BYTES,
+    IMPORT_TASKS_MAX_ROWS,
+    IMPORT_TASKS_PROGRESS_INTERVAL,
+    IMPORT_TASKS_THREAD_INTERVAL,
+    WHITE_X_MARK,
+)
+from database_obj import *
+from discord import Interaction, app_commands
+from discord.ext import commands
+from embeds import build_task_embed, refresh_project_embed
+from task_import import TaskImportError, parse_tasks, read_rows
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+log = logging.getLogger(__name__)
+
+# (task, row ID of the parent task, thread ID of the parent task)
+PendingTask = tuple[Task, int | None, int | None]
+
+
+def order_parents_first(pending_tasks: list[PendingTask]) -> list[PendingTask]:
+    # A task's parent_task_id is the thread ID of its parent, so parents need their threads created first
+    pending_task_ids = {task.id for task, _, _ in pending_tasks}
+    subtasks: defaultdict[int, list[PendingTask]] = defaultdict(list)
+    ready: deque[PendingTask] = deque()
+    for pending_task in pending_tasks:
+        parent_task_id = pending_task[1]
+        if parent_task_id in pending_task_ids:
+            subtasks[parent_task_id].append(pending_task)
+        else:
+            ready.append(pending_task)
+
+    ordered = []
+    while ready:
+        pending_task = ready.popleft()
+        ordered.append(pending_task)
+        ready.extend(subtasks[pending_task[0].id])
+    return ordered
+
+
+class ImportTasksCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+        # Projects whose task threads are being created, so two imports can't create threads for the same tasks
+        self.importing_projects: set[int] = set()
+
+    @app_commands.command(name="import_tasks")
+    async def import_tasks(
+        self, interaction: Interaction, file: discord.Attachment = None
+    ):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not isinstance(interaction.channel, discord.Thread) or not isinstance(
+            interaction.channel.parent, discord.ForumChannel
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} This command must be used in a project forum channel.",
+                ephemeral=True,
+            )
+            return
+
+        project_forum_channel: discord.ForumChannel = interaction.channel.parent
+        project_id: int
+        if not (
+            project_id := await self.bot.db.resolve_project_id(project_forum_channel.id)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} {project_forum_channel.mention} is not a valid project.",
+                ephemeral=True,
+            )
+            return
+
+        if project_id in self.importing_projects:
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} Tasks are already being imported into this project.",
+                ephemeral=True,
+            )
+            return
+
+        if file and file.size > IMPORT_TASKS_MAX_BYTES:
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} The file can't be larger than {IMPORT_TASKS_MAX_BYTES // 1024} KiB.",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        self.importing_projects.add(project_id)
+        try:
+            await self.import_and_create_threads(
+                interaction, project_forum_channel, project_id, file
+            )
+        except Exception as e:
+            log.exception("Importing tasks into project %d failed", project_id)
+            await self.send_import_failure(interaction, e)
+        finally:
+            self.importing_projects.discard(project_id)
+
+    async def import_and_create_threads(
+        self,
+        interaction: Interaction,
+        project_forum_channel: discord.ForumChannel,
+        project_id: int,
+        file: discord.Attachment | None,
+    ):
+        pending_tasks: list[PendingTask] = await self.bot.db.get_pending_task_threads(
+            project_id
+        )
+
+        # Without a file, this resumes creating the threads of an interrupted import
+        if file:
+            if pending_tasks:
+                await interaction.edit_original_response(
+                    content=f"{WHITE_X_MARK} {len(pending_tasks)} tasks from a previous import still need threads. Run this command without a file to finish that import first."
+                )
+                return
+
+            try:
+                tasks = parse_tasks(
+                    read_rows(file.filename, await file.read()),
+                    self.bot.db.reference_data,
+                    IMPORT_TASKS_MAX_ROWS,
+                )
+                task_ids, _ = await self.bot.db.import_tasks(project_id, tasks)
+            except TaskImportError as e:
+                await self.send_import_errors(interaction, e.errors)
+                return
+
+            for task in tasks:
+                self.bot.db.task_names.add(task_ids[task.key], task.name)
+                self.bot.db.task_graph.set_due_date(task_ids[task.key], task.due_date)
+                for dependency_key in task.depends_on:
+                    self.bot.db.task_graph.add_dependency(
+                        task_ids[dependency_key], task_ids[task.key]
+                    )
+            await self.bot.reminders.reschedule_tasks(
+                task_ids[task.key] for task in tasks if task.due_date
+            )
+            refresh_project_embed(self.bot, project_id)
+
+            pending_tasks = await self.bot.db.get_pending_task_threads(project_id)
+        elif not pending_tasks:
+            await interaction.edit_original_response(
+                content=f"{WHITE_X_MARK} There's no import to resume. Attach a CSV or JSON file to import tasks."
+            )
+            return
+
+        # The interaction expires after 15 minutes, which a large import can outlast, so progress is shown in a regular message
+        progress_message = await interaction.channel.send(
+            f":hourglass: Creating task threads (0/{len(pending_tasks)})..."
+        )
+        await interaction.edit_original_response(
+            content=f":white_check_mark: Imported {len(pending_tasks)} tasks. Their threads are being created, see {progress_message.jump_url} for progress."
+        )
+
+        try:
+            async for created_count in self.create_task_threads(
+                project_forum_channel, pending_tasks
+            ):
+                await progress_message.edit(
+                    content=f":hourglass: Creating task threads ({created_count}/{len(pending_tasks)})..."
+                )
+        except Exception:
+            # The progress message is only a courtesy, so failing to update it mustn't hide why the import stopped (which is sent as a followup)
+            try:
+                remaining_tasks = await self.bot.db.get_pending_task_threads(
+                    project_id
+                )
+                await progress_message.edit(
+                    content=f"{WHITE_X_MARK} Stopped after creating {len(pending_tasks) - len(remaining_tasks)}/{len(pending_tasks)} task threads. Run `/import_tasks` without a file to resume."
+                )
+            except Exception:
+                log.exception("Failed to update the import progress message")
+            raise
+
+        await progress_message.edit(
+            content=f":white_check_mark: Created {len(pending_tasks)} task threads."
+        )
+
+    async def send_import_failure(self, interaction: Interaction, error: Exception):
+        # Cut short so the message stays under Discord's 2000 character limit
+        reason = f"{type(error).__name__}: {error}"[:1500]
+        message = f"{WHITE_X_MARK} Importing tasks failed ({reason}). Tasks which were already imported are kept, run `/import_tasks` without a file to create any of their threads which are missing."
+        try:
+            await interaction.followup.send(message, ephemeral=True)
+        except discord.HTTPException:
+            # The interaction expires after 15 minutes, which a large import can outlast
+            try:
+                await interaction.channel.send(message)
+            except discord.HTTPException:
+                log.exception("Failed to report the failed import")
+
+    async def send_import_errors(self, interaction: Interaction, errors: list[str]):
+        error_text = "\n".join(errors)
+        # Too many errors to fit in a message are sent as a file instead
+        if len(error_text) > 1800:
+            await interaction.edit_original_response(
+                content=f"{WHITE_X_MARK} Found {len(errors)} problems with the file, nothing was imported.",
+                attachments=[
+                    discord.File(BytesIO(error_text.encode()), filename="errors.txt")
+                ],
+            )
+            return
+
+        await interaction.edit_original_response(
+            content=f"{WHITE_X_MARK} Found {len(errors)} problems with the file, nothing was imported.\n```\n{error_text}\n```"
+        )
+
+    async def create_task_threads(
+        self,
+        project_forum_channel: discord.ForumChannel,
+        pending_tasks: list[PendingTask],
+    ):
+        """
+        create_task_threads - Creates the threads of imported tasks, spaced out to stay under Discord's thread creation rate limit. Each thread is saved as soon as it's created, so an interrupted import can pick up where it left off.
+
+        Args:
+            project_forum_channel (discord.ForumChannel): The project's forum channel
+            pending_tasks (list[PendingTask]): The tasks without threads
+
+        Yields:
+            int: The number of threads created so far, every ``IMPORT_TASKS_PROGRESS_INTERVAL`` seconds
+        """
+        loop = asyncio.get_running_loop()
+        reference_data = self.bot.db.reference_data
+        assignees = await self.bot.db.get_task_assignees(
+            task.id for task, _, _ in pending_tasks
+        )
+        # task_id: the ID of its thread, for tasks whose threads were created in this run
+        thread_ids: dict[int, int] = {}
+        saves: list[asyncio.Task] = []
+        next_thread_time = last_progress_time = loop.time()
+
+        try:
+            for task, parent_task_id, parent_thread_id in order_parents_first(
+                pending_tasks
+            ):
+                if (delay := next_thread_time - loop.time()) > 0:
+                    await asyncio.sleep(delay)
+                next_thread_time = loop.time() + IMPORT_TASKS_THREAD_INTERVAL
+
+                task.parent_task_id = thread_ids.get(parent_task_id, parent_thread_id)
+                status = reference_data.statuses_by_id.get(task.status)
+                department = reference_data.departments_by_id.get(task.department)
+                status_tag = (
+                    discord.utils.get(
+                        project_forum_channel.available_tags, name=status.name
+                    )
+                    if status
+                    else None
+                )
+                task_thread: discord.channel.ThreadWithMessage = (
+                    await project_forum_channel.create_thread(
+                        name=task.name,
+                        embed=build_task_embed(
+                            task,
+                            department_name=department.name if department else None,
+                            status_name=status.name if status else None,
+                            assignee_ids=assignees.get(task.id),
+                        ),
+                        applied_tags=[status_tag] if status_tag else [],
+                    )
+                )
+                thread_ids[task.id] = task_thread.thread.id
+
+                # Pinning and saving happen alongside creating the next thread
+                saves.append(
+                    asyncio.create_task(self.save_task_thread(task, task_thread))
+                )
+
+                if loop.time() - last_progress_time >= IMPORT_TASKS_PROGRESS_INTERVAL:
+                    last_progress_time = loop.time()
+                    yield len(thread_ids)
+        except BaseException:
+            # Threads which were created have to be saved even if creating a later one failed, otherwise they'd be created again on resume. Failed saves are only logged here, so they don't hide why creating the threads stopped.
+            await self.wait_for_saves(saves)
+            raise
+
+        if errors := await self.wait_for_saves(saves):
+            raise errors[0]
+
+    async def wait_for_saves(self, saves: list[asyncio.Task]) -> list[BaseException]:
+        errors = [
+            result
+            for result in await asyncio.gather(*saves, return_exceptions=True)
+            if isinstance(result, BaseException)
+        ]
+        for error in errors:
+            log.error("Failed to save an imported task thread", exc_info=error)
+        return errors
+
+    async def save_task_thread(
+        self, task: Task, task_thread: discord.channel.ThreadWithMessage
+    ):
+        await self.bot.db.save_task_thread(
+            task.id, task_thread.thread.id, task.parent_task_id
+        )
+        self.bot.db.snowflakes.add_task(task.id, task_thread.thread.id)
+        await task_thread.message.pin()
@@ -0,0 +1,135 @@
+from typing import TYPE_CHECKING
+
+import discord
+import sqlalchemy
+from const import MY_TASKS_PAGE_SIZE
+from discord import Interaction, app_commands, ui
+from discord.ext import commands
+from embeds import EMBED_COLOR, format_task_line
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+
+class MyTasksView(ui.View):
+    def __init__(
+        self,
+        bot: commands.Bot,
+        interaction: Interaction,
+        first_page: list[sqlalchemy.engine.Row],
+        include_complete: bool,
+    ):
+        """
+        MyTasksView - Pages through the tasks assigned to the user. Each page is only queried when it's first shown, and kept for going back to it.
+
+        Args:
+            bot (commands.Bot): The discord bot instance
+            interaction (Interaction): The /my_tasks interaction, whose response is edited once the view times out
+            first_page (list[sqlalchemy.engine.Row]): The first page, with one extra task if there's a next page
+            include_complete (bool): Whether completed tasks are shown
+        """
+        super().__init__(timeout=300)
+        self.bot: PrimaryBot = bot
+        self.interaction = interaction
+        self.include_complete = include_complete
+        # Each page is fetched with one extra task, which is only there to tell whether there's another page
+        self.pages: list[list[sqlalchemy.engine.Row]] = [first_page]
+        self.page_number = 0
+        self.update_buttons()
+
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        return interaction.user.id == self.interaction.user.id
+
+    async def on_timeout(self):
+        try:
+            await self.interaction.edit_original_response(view=None)
+        except discord.HTTPException:
+            # The response can't be edited after 15 minutes, or if it was dismissed
+            pass
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.page_number == 0
+        self.next_page.disabled = (
+            len(self.pages[self.page_number]) <= MY_TASKS_PAGE_SIZE
+        )
+
+    def build_embed(self) -> discord.Embed:
+        lines = [
+            format_task_line(row, self.bot.db.reference_data)
+            for row in self.pages[self.page_number][:MY_TASKS_PAGE_SIZE]
+        ]
+
+        return discord.Embed(
+            color=EMBED_COLOR,
+            title="Your Tasks (including completed)"
+            if self.include_complete
+            else "Your Tasks",
+            description="\n".join(lines),
+        ).set_footer(text=f"Page {self.page_number + 1}")
+
+    @ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: Interaction, button: ui.Button):
+        self.page_number -= 1
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @ui.button(label="Next", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: Interaction, button: ui.Button):
+        self.page_number += 1
+        if self.page_number == len(self.pages):
+            last_task = self.pages[-1][MY_TASKS_PAGE_SIZE - 1]
+            self.pages.append(
+                await self.bot.db.get_assigned_tasks(
+                    interaction.user.id,
+                    after=(last_task.sort_due_date, last_task.id),
+                    limit=MY_TASKS_PAGE_SIZE + 1,
+                    include_complete=self.include_complete,
+                )
+            )
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+
+class MyTasksCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+
+    @app_commands.command(name="my_tasks")
+    async def my_tasks(
+        self, interaction: Interaction, include_complete: bool = False
+    ):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        first_page = await self.bot.db.get_assigned_tasks(
+            interaction.user.id,
+            limit=MY_TASKS_PAGE_SIZE + 1,
+            include_complete=include_complete,
+        )
+        if not first_page:
+            await interaction.response.send_message(
+                "You don't have any tasks assigned to you."
+                if include_complete
+                else "You don't have any incomplete tasks assigned to you.",
+                ephemeral=True,
+            )
+            return
+
+        view = MyTasksView(self.bot, interaction, first_page, include_complete)
+        if len(first_page) > MY_TASKS_PAGE_SIZE:
+            await interaction.response.send_message(
+                embed=view.build_embed(), view=view, ephemeral=True
+            )
+        else:
+            # A single page doesn't need the buttons
+            view.stop()
+            await interaction.response.send_message(
+                embed=view.build_embed(), ephemeral=True
+            )
@@ -1,3 +1,5 @@
+import time
+from io import StringIO
 from typing import TYPE_CHECKING
 
 import discord
@@ -17,23 +19,59 @@ class PurgeEmployeesCog(commands.Cog):
 
     @app_commands.command(name="purge_employees")
     async def purge_employees(self, interaction: Interaction):
-        if not self.bot.db.check_access_level(interaction.user.id, self.access_level):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
             await interaction.response.send_message(
                 ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
                 ephemeral=True,
             )
             return
 
-        current_employees: list[Employee] = self.bot.db.get_filtered_employees()
-        purged_users = []
-        for employee in current_employees:
-            try:
-                await self.bot.db.get_employee_member(employee_id=employee.id)
-            except discord.NotFound:
-                purged_users.append(f'{employee.username} ({str(employee.discord_id)})')
-                employee.username = None
-                employee.access_level = 0
+        # Resolving members can take a few gateway requests with a large roster
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        prev_time = time.time()
 
-        self.bot.commit()
+        # Resolve every employee's member in one go, then purge whoever wasn't found
+        current_employees: list[Employee] = await self.bot.db.get_filtered_employees()
+        members = await self.bot.fetch_members(
+            employee.discord_id for employee in current_employees
+        )
 
-        await interaction.response.send_message(f":white_check_mark: The following employees were successfully purged:{chr(10)}{chr(10).join(purged_users)}" if purged_users else ":white_check_mark: No usernames were updated.", ephemeral=True)
+        purged_employees = [
+            employee
+            for employee in current_employees
+            if employee.discord_id not in members
+        ]
+        if purged_employees:
+            await self.bot.db.bulk_update_employees(
+                {
+                    employee.discord_id: {"username": None, "access_level": 0}
+                    for employee in purged_employees
+                }
+            )
+            # Only update the cache once the purge has been committed
+            for employee in purged_employees:
+                self.bot.db.access_levels.set(employee.discord_id, 0)
+                self.bot.db.employee_names.remove(employee.discord_id)
+        elapsed_time = round(time.time() - prev_time, 3)
+
+        summary = f"Checked {len(current_employees)} employee(s): {len(purged_employees)} purged ({elapsed_time}s)"
+        if not purged_employees:
+            await interaction.followup.send(
+                f":white_check_mark: No employees were purged.\n{summary}", ephemeral=True
+            )
+            return
+
+        # Send the details as a file, since they won't fit in a message with a large roster
+        purged_users = [
+            f"{employee.username} ({str(employee.discord_id)})"
+            for employee in purged_employees
+        ]
+        file_obj = discord.File(
+            StringIO(
+                f":white_check_mark: The following employees were successfully purged:{chr(10)}{chr(10).join(purged_users)}"
+            ),
+            filename="purged_employees.txt",
+        )
+        await interaction.followup.send(summary, file=file_obj, ephemeral=True)
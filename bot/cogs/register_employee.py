@@ -23,7 +23,9 @@ class RegisterEmployeeCog(commands.Cog):
         user: discord.Member,
         access_level: app_commands.Range[int, 1, 4] = 1,
     ):
-        if not self.bot.db.check_access_level(interaction.user.id, self.access_level):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
             await interaction.response.send_message(
                 ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
                 ephemeral=True,
@@ -31,8 +33,8 @@ class RegisterEmployeeCog(commands.Cog):
             return
 
         # Users of access level 4 can only set 1-3, users of access level 5 can only set 1-4
-        sender_access_level = self.bot.db.get_access_level(
-            interaction.user.id
+        sender_access_level = await self.bot.db.get_access_level(
+            discord_id=interaction.user.id
         )
         if sender_access_level <= access_level:
             await interaction.response.send_message(
@@ -46,16 +48,16 @@ class RegisterEmployeeCog(commands.Cog):
             discord_id=user.id,
             access_level=access_level,
         )
-        self.bot.add_obj(new_employee)
-
         try:
-            self.bot.commit()
+            await self.bot.db.add_obj(new_employee)
         except IntegrityError:
             await interaction.response.send_message(
                 f"{WHITE_X_MARK} Employee is already registered.",
                 ephemeral=True,
             )
             return
+        self.bot.db.access_levels.set(user.id, access_level)
+        self.bot.db.employee_names.add(user.id, new_employee.username)
 
         await interaction.response.send_message(
             f":white_check_mark: Successfully registered {user.mention} as an employee with access level {access_level}.",
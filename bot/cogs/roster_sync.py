@@ -0,0 +1,87 @@
+import logging
+from typing import TYPE_CHECKING, Any
+
+import discord
+from const import GUILD_ID
+from discord.ext import commands, tasks
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+log = logging.getLogger(__name__)
+
+
+class RosterSyncCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot: PrimaryBot = bot
+
+        # Changes are batched up here (keyed by discord ID) and written every few seconds, so bursts of member events only cost one write
+        self.pending_updates: dict[int, dict[str, Any]] = {}
+
+    async def cog_load(self):
+        self.flush_updates.start()
+
+    async def cog_unload(self):
+        self.flush_updates.cancel()
+        await self.flush()
+
+    def queue_update(self, discord_id: int, **values):
+        self.pending_updates.setdefault(discord_id, {}).update(values)
+
+    async def flush(self):
+        if not self.pending_updates:
+            return
+
+        updates, self.pending_updates = self.pending_updates, {}
+        try:
+            # Members who aren't employees don't match any rows, so they're simply skipped by the update
+            await self.bot.db.bulk_update_employees(updates)
+        except Exception:
+            log.exception("Failed to sync %d employee(s), retrying", len(updates))
+            # Put the updates back without overwriting anything newer that was queued in the meantime
+            for discord_id, values in updates.items():
+                self.pending_updates[discord_id] = values | self.pending_updates.get(
+                    discord_id, {}
+                )
+            return
+
+        # Only update the caches once the change has been committed
+        for discord_id, values in updates.items():
+            if "access_level" in values:
+                self.bot.db.access_levels.set(discord_id, values["access_level"])
+            if values.get("access_level") == 0:
+                self.bot.db.employee_names.remove(discord_id)
+            elif "username" in values:
+                # Members who aren't registered employees aren't in the index, so they're skipped
+                self.bot.db.employee_names.rename(discord_id, values["username"])
+
+    @tasks.loop(seconds=5)
+    async def flush_updates(self):
+        await self.flush()
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.guild.id == GUILD_ID and (before.nick or before.name) != (
+            after.nick or after.name
+        ):
+            self.queue_update(after.id, username=after.nick or after.name)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        # A new username only matters if the member doesn't have a nickname overriding it
+        if before.name != after.name and (
+            member := self.bot.get_guild(GUILD_ID).get_member(after.id)
+        ):
+            self.queue_update(after.id, username=member.nick or after.name)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        # Returning employees get their username back, but have to be registered again to regain access
+        if member.guild.id == GUILD_ID:
+            self.queue_update(member.id, username=member.nick or member.name)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        # Same as /purge_employees, just as it happens
+        if member.guild.id == GUILD_ID:
+            self.queue_update(member.id, username=None, access_level=0)
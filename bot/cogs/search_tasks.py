@@ -0,0 +1,109 @@
+import re
+from typing import TYPE_CHECKING
+
+import discord
+from autocomplete import (
+    department_autocomplete,
+    project_autocomplete,
+    status_autocomplete,
+)
+from const import (
+    SEARCH_TASKS_MAX_RESULTS,
+    SEARCH_TASKS_MIN_WORD_LENGTH,
+    WHITE_X_MARK,
+)
+from discord import Interaction, app_commands
+from discord.ext import commands
+from embeds import EMBED_COLOR, format_task_line
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+
+def search_words(query: str) -> list[str]:
+    # Only word characters are kept, so nothing in the query can be read as a full-text operator
+    return [
+        word
+        for word in re.findall(r"\w+", query)
+        if len(word) >= SEARCH_TASKS_MIN_WORD_LENGTH
+    ]
+
+
+class SearchTasksCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+
+    @app_commands.command(name="search_tasks")
+    @app_commands.autocomplete(
+        project=project_autocomplete,
+        status=status_autocomplete,
+        department=department_autocomplete,
+    )
+    async def search_tasks(
+        self,
+        interaction: Interaction,
+        query: str,
+        project: str = None,
+        status: str = None,
+        department: str = None,
+    ):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not (words := search_words(query)):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} Search for at least one word of {SEARCH_TASKS_MIN_WORD_LENGTH} or more letters.",
+                ephemeral=True,
+            )
+            return
+
+        status_info = None
+        if status and not (
+            status_info := self.bot.db.reference_data.get_status(status)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} {status} is not a valid status.", ephemeral=True
+            )
+            return
+
+        department_info = None
+        if department and not (
+            department_info := self.bot.db.reference_data.get_department(department)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} {department} is not a valid department.",
+                ephemeral=True,
+            )
+            return
+
+        tasks = await self.bot.db.search_tasks(
+            words,
+            project_name=project,
+            status_id=status_info.id if status_info else None,
+            department_id=department_info.id if department_info else None,
+            limit=SEARCH_TASKS_MAX_RESULTS,
+        )
+        if not tasks:
+            await interaction.response.send_message(
+                f"No tasks match `{' '.join(words)}`.", ephemeral=True
+            )
+            return
+
+        await interaction.response.send_message(
+            embed=discord.Embed(
+                color=EMBED_COLOR,
+                title=f"Tasks matching \"{' '.join(words)}\"",
+                description="\n".join(
+                    format_task_line(task, self.bot.db.reference_data)
+                    for task in tasks
+                ),
+            ),
+            ephemeral=True,
+        )
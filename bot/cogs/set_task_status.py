@@ -0,0 +1,66 @@
+from typing import TYPE_CHECKING
+
+import discord
+from autocomplete import status_autocomplete
+from const import WHITE_X_MARK
+from database_obj import *
+from discord import Interaction, app_commands
+from discord.ext import commands
+from embeds import refresh_project_embed, refresh_task_embed
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+
+class SetTaskStatusCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+
+    @app_commands.command(name="set_task_status")
+    @app_commands.autocomplete(status=status_autocomplete)
+    async def set_task_status(self, interaction: Interaction, status: str):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not isinstance(interaction.channel, discord.Thread) or not (
+            task_id := await self.bot.db.resolve_task_id(interaction.channel.id)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} This command must be used in a task thread.",
+                ephemeral=True,
+            )
+            return
+
+        reference_data = self.bot.db.reference_data
+        if not (status_info := reference_data.get_status(status)):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} {status} is not a valid status.",
+                ephemeral=True,
+            )
+            return
+
+        # This also updates the project's completed task count
+        task: Task
+        task, _ = await self.bot.db.set_task_status(task_id, status_info.id)
+
+        await interaction.response.send_message(
+            f":white_check_mark: Successfully set the status of {interaction.channel.mention} to {status_info.name}.",
+            ephemeral=True,
+        )
+
+        # Swap the thread's status tag, and update the task and project embeds
+        task_thread: discord.Thread = interaction.channel
+        status_tag = discord.utils.get(
+            task_thread.parent.available_tags, name=status_info.name
+        )
+        # The embed edits are coalesced, so quickly changing the status again only edits each embed once. The task embed is rebuilt from the database, so it keeps the task's assignees.
+        refresh_task_embed(self.bot, task.id)
+        refresh_project_embed(self.bot, task.project_id)
+        await task_thread.edit(applied_tags=[status_tag] if status_tag else [])
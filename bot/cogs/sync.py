@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING
 
+from discord import Interaction, app_commands
 from discord.ext import commands
 from discord.ext.commands import Context
 
@@ -18,3 +19,20 @@ class SyncCog(commands.Cog):
         await ctx.send("Syncing...")
         await self.bot.tree.sync()
         await ctx.send("Synced!")
+
+    # An app command, since prefix commands can't read messages without the message content intent
+    @app_commands.command(name="reload_reference_data")
+    async def reload_reference_data(self, interaction: Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        # Statuses and departments are only read at startup, so this has to be run after changing them in the database
+        reference_data = await self.bot.db.reload_reference_data()
+        await interaction.response.send_message(
+            f"Reloaded {len(reference_data.statuses)} statuses and {len(reference_data.departments)} departments!",
+            ephemeral=True,
+        )
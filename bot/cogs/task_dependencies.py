@@ -0,0 +1,213 @@
+from typing import TYPE_CHECKING
+
+import discord
+from const import WHITE_X_MARK
+from discord import Interaction, app_commands
+from discord.ext import commands
+from embeds import EMBED_COLOR
+from task_graph import CycleError
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+
+# Discord caps embed field values at 1024 characters
+MAX_FIELD_LENGTH = 1024
+# Only this many lines are built for a field, which is cut down further by length if they don't fit
+MAX_LISTED_TASKS = 30
+
+
+def join_within_field(lines: list[str], total: int) -> str:
+    """
+    join_within_field - Joins as many lines as fit in an embed field, followed by how many were left out.
+
+    Args:
+        lines (list[str]): The lines, in the order they're listed
+        total (int): The number of lines there would be in full, if ``lines`` is only the start of them
+
+    Returns:
+        str: The field value
+    """
+    # Room is kept for the "and N more" line, in case not every line fits
+    room = MAX_FIELD_LENGTH - len(f"\nand {total} more")
+    shown = []
+    length = -1
+    for line in lines:
+        if length + 1 + len(line) > room:
+            break
+        shown.append(line)
+        length += 1 + len(line)
+
+    if len(shown) < total:
+        shown.append(f"and {total - len(shown)} more")
+    return "\n".join(shown)
+
+
+class TaskDependenciesCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+
+    async def resolve_task_threads(
+        self, interaction: Interaction, prerequisite: discord.Thread = None
+    ) -> tuple[int, int | None] | None:
+        """
+        resolve_task_threads - Gets the ID of the task whose thread the command was used in, and the ID of the prerequisite task if one was given. Sends an error and returns None if either isn't a task.
+
+        Args:
+            interaction (Interaction): The interaction of the command
+            prerequisite (discord.Thread, optional): The thread of the prerequisite task. Defaults to None.
+
+        Returns:
+            tuple[int, int | None] | None: The task ID and prerequisite task ID
+        """
+        if not isinstance(interaction.channel, discord.Thread) or not (
+            task_id := await self.bot.db.resolve_task_id(interaction.channel.id)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} This command must be used in a task thread.",
+                ephemeral=True,
+            )
+            return None
+
+        prerequisite_id = None
+        if prerequisite and not (
+            prerequisite_id := await self.bot.db.resolve_task_id(prerequisite.id)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} {prerequisite.mention} is not a valid task.",
+                ephemeral=True,
+            )
+            return None
+
+        return task_id, prerequisite_id
+
+    def format_tasks(self, task_ids: list[int]) -> str:
+        if not task_ids:
+            return "None"
+
+        threads = self.bot.db.snowflakes.thread_channels_by_task
+        mentions = [
+            f"<#{threads[task_id]}>" if task_id in threads else f"Task {task_id}"
+            for task_id in task_ids[:MAX_LISTED_TASKS]
+        ]
+        return join_within_field(mentions, len(task_ids))
+
+    @app_commands.command(name="add_dependency")
+    async def add_dependency(
+        self, interaction: Interaction, prerequisite: discord.Thread
+    ):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not (resolved := await self.resolve_task_threads(interaction, prerequisite)):
+            return
+        task_id, prerequisite_id = resolved
+
+        try:
+            added = await self.bot.db.add_task_dependency(prerequisite_id, task_id)
+        except CycleError:
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} {prerequisite.mention} can't block this task, since it's already blocked by this task (or is this task).",
+                ephemeral=True,
+            )
+            return
+
+        if not added:
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} This task is already blocked by {prerequisite.mention}.",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.response.send_message(
+            f":white_check_mark: {interaction.channel.mention} is now blocked by {prerequisite.mention}.",
+            ephemeral=True,
+        )
+
+    @app_commands.command(name="remove_dependency")
+    async def remove_dependency(
+        self, interaction: Interaction, prerequisite: discord.Thread
+    ):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not (resolved := await self.resolve_task_threads(interaction, prerequisite)):
+            return
+        task_id, prerequisite_id = resolved
+
+        if not await self.bot.db.remove_task_dependency(prerequisite_id, task_id):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} This task isn't blocked by {prerequisite.mention}.",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.response.send_message(
+            f":white_check_mark: {interaction.channel.mention} is no longer blocked by {prerequisite.mention}.",
+            ephemeral=True,
+        )
+
+    @app_commands.command(name="task_dependencies")
+    async def task_dependencies(self, interaction: Interaction):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not (resolved := await self.resolve_task_threads(interaction)):
+            return
+        task_id, _ = resolved
+
+        graph = self.bot.db.task_graph
+        # Prerequisites are listed in the order they can be done in
+        blocked_by = graph.topological_order(graph.blocked_by(task_id))
+        blocking = graph.topological_order(graph.blocking(task_id))
+
+        # Listed from the first task to be done, since those are the ones which can be worked on now
+        critical_path = graph.critical_path(task_id)
+        critical_path_lines = [
+            f"{self.format_tasks([path_task_id])} (due {due_date:%Y-%m-%d})"
+            if (due_date := graph.due_dates.get(path_task_id))
+            else self.format_tasks([path_task_id])
+            for path_task_id in critical_path[:MAX_LISTED_TASKS]
+        ]
+
+        dependencies_embed = discord.Embed(
+            color=EMBED_COLOR, title=f"Dependencies of {interaction.channel.name}"
+        )
+        dependencies_embed.add_field(
+            name=f"Blocked By ({len(blocked_by)})",
+            value=self.format_tasks(blocked_by),
+            inline=False,
+        )
+        dependencies_embed.add_field(
+            name=f"Blocking ({len(blocking)})",
+            value=self.format_tasks(blocking),
+            inline=False,
+        )
+        dependencies_embed.add_field(
+            name="Critical Path",
+            value=join_within_field(critical_path_lines, len(critical_path)),
+            inline=False,
+        )
+
+        await interaction.response.send_message(
+            embed=dependencies_embed, ephemeral=True
+        )
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+import discord
+from const import WHITE_X_MARK
+from discord import Interaction, app_commands
+from discord.ext import commands
+from embeds import EMBED_COLOR
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+
+# Embed descriptions are capped at 4096 characters
+MAX_TREE_LENGTH = 4000
+
+
+class TaskTreeCog(commands.Cog):
+    def __init__(self, bot: commands.Bot, access_level: int):
+        self.bot: PrimaryBot = bot
+        self.access_level = access_level
+
+    @app_commands.command(name="task_tree")
+    async def task_tree(self, interaction: Interaction):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
+            await interaction.response.send_message(
+                ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
+                ephemeral=True,
+            )
+            return
+
+        if not isinstance(interaction.channel, discord.Thread) or not (
+            task_id := await self.bot.db.resolve_task_id(interaction.channel.id)
+        ):
+            await interaction.response.send_message(
+                f"{WHITE_X_MARK} This command must be used in a task thread.",
+                ephemeral=True,
+            )
+            return
+
+        rows = await self.bot.db.get_task_tree(task_id)
+
+        # A task is only reached more than once if the parents form a cycle, so keep the shallowest copy
+        tasks = {}
+        for row in sorted(rows, key=lambda row: row.depth):
+            tasks.setdefault(row.id, row)
+
+        # parent thread ID: [subtasks]
+        subtasks = defaultdict(list)
+        for row in tasks.values():
+            if row.depth:
+                subtasks[row.parent_task_id].append(row)
+
+        # Roll up completion from the deepest subtasks first, so each task's subtasks are counted before it is
+        # task_id: (completed tasks, total tasks), including the task itself
+        completion: dict[int, tuple[int, int]] = {}
+        for row in sorted(tasks.values(), key=lambda row: row.depth, reverse=True):
+            completed, total = int(bool(row.complete)), 1
+            for subtask in subtasks[row.discord_thread_channel_id]:
+                completed += completion[subtask.id][0]
+                total += completion[subtask.id][1]
+            completion[row.id] = (completed, total)
+
+        lines = []
+        length = 0
+        stack = [tasks[task_id]]
+        while stack:
+            row = stack.pop()
+            completed, total = completion[row.id]
+            # Discord strips leading spaces, so indent with ideographic spaces
+            indent = "\u3000" * row.depth
+            icon = ":white_check_mark:" if row.complete else ":white_large_square:"
+            line = f"{indent}{icon} <#{row.discord_thread_channel_id}>"
+            if total > 1:
+                line += f" {completed * 100 // total}% ({completed}/{total})"
+
+            length += len(line) + 1
+            if length > MAX_TREE_LENGTH:
+                lines.append(f"and {len(tasks) - len(lines)} more")
+                break
+            lines.append(line)
+
+            # Reversed so subtasks are shown in the order they were created
+            stack.extend(
+                sorted(
+                    subtasks[row.discord_thread_channel_id],
+                    key=lambda row: row.id,
+                    reverse=True,
+                )
+            )
+
+        await interaction.response.send_message(
+            embed=discord.Embed(
+                color=EMBED_COLOR,
+                title=f"Subtasks of {interaction.channel.name}",
+                description="\n".join(lines),
+            ),
+            ephemeral=True,
+        )
@@ -1,7 +1,9 @@
+import re
 from typing import TYPE_CHECKING
 
 import discord
-from const import WHITE_X_MARK
+from autocomplete import employee_autocomplete
+from const import MAX_UTC_OFFSET, MIN_UTC_OFFSET, WHITE_X_MARK
 from database_obj import *
 from discord import Interaction, app_commands
 from discord.ext import commands
@@ -16,75 +18,92 @@ class UpdateEmployeeCog(commands.Cog):
         self.access_level = access_level
 
     @app_commands.command(name="update_employee")
+    @app_commands.autocomplete(employee=employee_autocomplete)
     async def update_employee(
         self,
         interaction: Interaction,
-        user: discord.Member,
+        employee: str,
         access_level: app_commands.Range[int, 1, 4] = None,
-        utc_offset: int = None,
+        utc_offset: app_commands.Range[int, MIN_UTC_OFFSET, MAX_UTC_OFFSET] = None,
     ):
-        if not self.bot.db.check_access_level(interaction.user.id, self.access_level):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
             await interaction.response.send_message(
                 ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
                 ephemeral=True,
             )
             return
 
-        # Make sure user isn't trying to update themselves
-        if interaction.user.id == user.id:
+        # Autocomplete gives the employee's discord ID, but a mention works too
+        if not (discord_id := int(re.sub(r"\D", "", employee) or 0)):
             await interaction.response.send_message(
-                f"{WHITE_X_MARK} You cannot update yourself. Contact an admin to update your own access level, or use `/set_utc_offset` to set your UTC offset.",
+                f"{WHITE_X_MARK} {employee} is not a registered employee.",
                 ephemeral=True,
             )
             return
+        # They may have left the server, so they're mentioned by ID rather than resolved to a member
+        mention = f"<@{discord_id}>"
 
-        # Make sure one of the optional arguments were defined
-        if not access_level and not utc_offset:
+        # Make sure user isn't trying to update themselves
+        if interaction.user.id == discord_id:
             await interaction.response.send_message(
-                f"{WHITE_X_MARK} You must provide at least one of `access_level` or `utc_offset`.",
+                f"{WHITE_X_MARK} You cannot update yourself. Contact an admin to update your own access level, or use `/set_utc_offset` to set your UTC offset.",
                 ephemeral=True,
             )
             return
 
-        # Make sure they're accessing a valid employee
-        if not self.bot.db.get_employee(discord_id=user.id, filter_access_level=False):
+        # Make sure one of the optional arguments were defined
+        if not access_level and not utc_offset:
             await interaction.response.send_message(
-                f"{WHITE_X_MARK} {user.mention} is not a registered employee.",
+                f"{WHITE_X_MARK} You must provide at least one of `access_level` or `utc_offset`.",
                 ephemeral=True,
             )
             return
 
-        # Setting values
-        if access_level:
-            # Users of access level 3 can only set 1 or 2, users of access level 4 can only set 1, 2, or 3
-            sender_access_level = self.bot.db.get_access_level(
-                discord_id=interaction.user.id
-            )
-            user_access_level = self.bot.db.get_access_level(discord_id=user.id)
-            if sender_access_level <= access_level:
+        # Every lookup and update below shares one session and commits together
+        async with self.bot.db.unit_of_work():
+            # Make sure they're accessing a valid employee
+            if not await self.bot.db.get_employee(
+                discord_id=discord_id, filter_access_level=False
+            ):
                 await interaction.response.send_message(
-                    f"{WHITE_X_MARK} You cannot update a user to an equal or higher access level than your own.",
+                    f"{WHITE_X_MARK} {mention} is not a registered employee.",
                     ephemeral=True,
                 )
                 return
-            # Make sure a level 4 can't demote a level 4, or a level 3 demote a level 3
-            elif sender_access_level == user_access_level:
-                await interaction.response.send_message(
-                    f"{WHITE_X_MARK} You cannot change the access level of someone with the same access level as you.",
-                    ephemeral=True,
+
+            # Setting values
+            if access_level:
+                # Users of access level 3 can only set 1 or 2, users of access level 4 can only set 1, 2, or 3
+                sender_access_level = await self.bot.db.get_access_level(
+                    discord_id=interaction.user.id
                 )
-                return
+                user_access_level = await self.bot.db.get_access_level(
+                    discord_id=discord_id
+                )
+                if sender_access_level <= access_level:
+                    await interaction.response.send_message(
+                        f"{WHITE_X_MARK} You cannot update a user to an equal or higher access level than your own.",
+                        ephemeral=True,
+                    )
+                    return
+                # Make sure a level 4 can't demote a level 4, or a level 3 demote a level 3
+                elif sender_access_level == user_access_level:
+                    await interaction.response.send_message(
+                        f"{WHITE_X_MARK} You cannot change the access level of someone with the same access level as you.",
+                        ephemeral=True,
+                    )
+                    return
 
-            self.bot.db.get_employee(
-                discord_id=user.id, filter_access_level=False
-            ).access_level = access_level
+                await self.bot.db.update_employee(discord_id, access_level=access_level)
 
-        if utc_offset:
-            self.bot.db.get_employee(
-                discord_id=user.id, filter_access_level=False
-            ).utc_offset = utc_offset
+            if utc_offset:
+                await self.bot.db.update_employee(discord_id, utc_offset=utc_offset)
 
-        self.bot.commit()
+        # Only update the cache once the change has been committed
+        if access_level:
+            self.bot.db.access_levels.set(discord_id, access_level)
 
         success_msg = (
             "[UH-OH: You should not be seeing this. Please contact an administrator.]"
@@ -97,6 +116,10 @@ class UpdateEmployeeCog(commands.Cog):
             success_msg = "UTC offset"
 
         await interaction.response.send_message(
-            f":white_check_mark: Successfully modified {user.mention}'s {success_msg}.",
+            f":white_check_mark: Successfully modified {mention}'s {success_msg}.",
             ephemeral=True,
         )
+
+        # Their due date reminders are sent at a different time now
+        if utc_offset:
+            await self.bot.reminders.reload()
@@ -1,3 +1,5 @@
+import time
+from io import StringIO
 from typing import TYPE_CHECKING
 
 import discord
@@ -5,7 +7,6 @@ from const import GUILD_ID, WHITE_X_MARK
 from database_obj import *
 from discord import Interaction, app_commands
 from discord.ext import commands
-from sqlalchemy.engine.cursor import CursorResult
 
 if TYPE_CHECKING:
     from main import PrimaryBot
@@ -18,32 +19,53 @@ class UpdateUsernamesCog(commands.Cog):
 
     @app_commands.command(name="update_usernames")
     async def update_usernames(self, interaction: Interaction):
-        if not self.bot.db.check_access_level(interaction.user.id, self.access_level):
+        if not await self.bot.db.check_access_level(
+            interaction.user.id, self.access_level
+        ):
             await interaction.response.send_message(
                 ":lock: Insufficient permissions. Please contact an administrator if you believe this is an issue.",
                 ephemeral=True,
             )
             return
 
-        # Loop through all the employees
-        current_employees: list[Employee] = self.bot.db.get_filtered_employees()
+        # Resolving members can take a few gateway requests with a large roster
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        prev_time = time.time()
+
+        # Resolve every employee's member in one go, then diff them against the database in memory
+        current_employees: list[Employee] = await self.bot.db.get_filtered_employees()
+        members = await self.bot.fetch_members(
+            employee.discord_id for employee in current_employees
+        )
+
+        updates: dict[int, dict[str, str]] = {}
         updated_users = []
         missing_users = []
         for employee in current_employees:
-            try:
-                # Get the member object
-                member: discord.Member = await self.bot.db.get_employee_member(employee_id=employee.id)
-                # If their nickname is outdated, update it
-                if (member.nick or member.name) != employee.username:
-                    updated_users.append(f'`{employee.username}` => `{member.nick or member.name}` (ID: {str(member.id)})')
-                    employee.username = member.nick or member.name
             # If we couldn't find them, add them to the missing users list
-            except discord.NotFound:
+            if not (member := members.get(employee.discord_id)):
                 missing_users.append(f'{employee.username} ({str(employee.discord_id)})')
+            # If their nickname is outdated, update it
+            elif (member.nick or member.name) != employee.username:
+                updated_users.append(f'`{employee.username}` => `{member.nick or member.name}` (ID: {str(member.id)})')
+                updates[employee.discord_id] = {"username": member.nick or member.name}
 
-        self.bot.commit()
+        if updates:
+            await self.bot.db.bulk_update_employees(updates)
+            for discord_id, values in updates.items():
+                self.bot.db.employee_names.rename(discord_id, values["username"])
+        elapsed_time = round(time.time() - prev_time, 3)
 
         missing_users_fail_string = f"\n\nFailed to find the following users:{chr(10)}{chr(10).join(missing_users)}{chr(10) * 2}This may be because of a discord API error, or they have left the server and require manual purging via `/purge_employees`." if missing_users else ""
         success_message = f":white_check_mark: The following usernames were successfully updated:{chr(10)}{chr(10).join(updated_users)}" if updated_users else ":white_check_mark: No usernames were updated."
 
-        await interaction.response.send_message(f"{success_message} {missing_users_fail_string}", ephemeral=True)
+        # Send the details as a file, since they won't fit in a message with a large roster
+        summary = f"Checked {len(current_employees)} employee(s): {len(updated_users)} updated, {len(missing_users)} missing ({elapsed_time}s)"
+        if updated_users or missing_users:
+            file_obj = discord.File(
+                StringIO(f"{success_message} {missing_users_fail_string}"),
+                filename="updated_usernames.txt",
+            )
+            await interaction.followup.send(summary, file=file_obj, ephemeral=True)
+        else:
+            await interaction.followup.send(f"{success_message}\n{summary}", ephemeral=True)
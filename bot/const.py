@@ -1,4 +1,52 @@
 GUILD_ID = 742101933124354159
 PROJECTS_CATEGORY_ID = 1045880649438998548
 
-WHITE_X_MARK = "<:white_x_mark:1047218724098297946>"
\ No newline at end of file
+WHITE_X_MARK = "<:white_x_mark:1047218724098297946>"
+
+# /exec_query limits. Rows are streamed in chunks, and the output stops once either cap is reached (the byte cap keeps the file under Discord's upload limit)
+EXEC_QUERY_MAX_ROWS = 100_000
+EXEC_QUERY_MAX_BYTES = 8 * 1024 * 1024 - 1024
+EXEC_QUERY_CHUNK_SIZE = 1000
+# In seconds, enforced by MariaDB
+EXEC_QUERY_TIMEOUT = 30
+
+# /task_tree stops descending past this many levels of subtasks
+MAX_TASK_TREE_DEPTH = 32
+
+# /import_tasks limits
+IMPORT_TASKS_MAX_ROWS = 1000
+IMPORT_TASKS_MAX_BYTES = 1024 * 1024
+# Thread creation has a much lower rate limit than most endpoints, so imported task threads are created at most this often (in seconds)
+IMPORT_TASKS_THREAD_INTERVAL = 1.5
+# How often the progress message is edited, in seconds
+IMPORT_TASKS_PROGRESS_INTERVAL = 5
+
+# How often the Prometheus metrics file (set by the METRICS_FILE environment variable) is rewritten, in seconds
+METRICS_FILE_INTERVAL = 15
+
+# The event loop counts as blocked once it's been unresponsive for this long, in seconds (see LoopWatchdog)
+LOOP_STALL_THRESHOLD = 0.25
+# How many recent stalls are kept for /loop_stalls
+LOOP_STALL_HISTORY = 50
+
+# Assignees are reminded of a task's due date at this hour in their local time (by their UTC offset), on each of these days before it
+DUE_DATE_REMINDER_HOUR = 9
+DUE_DATE_REMINDER_DAYS_BEFORE = (1, 0)
+# How far ahead reminders are loaded into memory, in days
+DUE_DATE_REMINDER_WINDOW_DAYS = 2
+# How long to wait before trying to load the next window of reminders again, in seconds, if loading it failed
+DUE_DATE_REMINDER_RETRY_SECONDS = 60
+# The range of real UTC offsets, in hours
+MIN_UTC_OFFSET = -12
+MAX_UTC_OFFSET = 14
+
+# Tasks shown per page of /my_tasks
+MY_TASKS_PAGE_SIZE = 10
+
+# Results shown by /search_tasks
+SEARCH_TASKS_MAX_RESULTS = 15
+# Shorter words aren't indexed by InnoDB's full-text search (innodb_ft_min_token_size), so they're left out of searches
+SEARCH_TASKS_MIN_WORD_LENGTH = 3
+
+# Attachments added with /add_asset are streamed to storage in chunks of this many bytes, so they're never held in memory in full
+ASSET_CHUNK_SIZE = 64 * 1024
@@ -1,54 +1,237 @@
-from typing import TYPE_CHECKING
+import asyncio
+import functools
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import date
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterable, Iterator
 
 import discord
 import sqlalchemy
 import sqlalchemy.orm
-from const import GUILD_ID
+from caches import AccessLevelCache, PrefixIndex, SnowflakeIndex
+from const import GUILD_ID, MAX_TASK_TREE_DEPTH
 from database_obj import *
 from discord.ext import commands
+from instrumentation import callable_name, metrics
+from reference_data import DepartmentInfo, ReferenceData, StatusInfo
+from sqlalchemy.dialects.mysql import match
 from sqlalchemy.engine.cursor import CursorResult
-from tabulate import tabulate
+from task_graph import TaskGraph
+from task_import import ImportedTask, TaskImportError
 
 if TYPE_CHECKING:
     from main import PrimaryBot
 
 
+@dataclass
+class UnitOfWork:
+    """
+    UnitOfWork - A session shared by every ``DatabaseConnection`` call made inside ``DatabaseConnection.unit_of_work``
+    """
+
+    session: sqlalchemy.orm.Session
+    # Calls inside the same unit of work may be gathered, but the session can only be used by one thread at a time
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+# The unit of work of the current task (each interaction is handled in its own task, so this is per-interaction)
+current_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar(
+    "current_unit_of_work", default=None
+)
+
+
+def run_in_executor(func: Callable) -> Callable:
+    """
+    run_in_executor - Turns a blocking ``DatabaseConnection`` method taking a session as its first argument into a coroutine which runs the method on the database executor, so it doesn't block the event loop
+
+    Args:
+        func (Callable): The blocking method to wrap
+
+    Returns:
+        Callable: The awaitable method, which no longer takes a session
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self: "DatabaseConnection", *args, **kwargs):
+        return await self.run(functools.partial(func, self), *args, **kwargs)
+
+    return wrapper
+
+
 class DatabaseConnection:
-    def __init__(self, bot: commands.Bot, engine_string: str):
+    def __init__(
+        self,
+        bot: commands.Bot,
+        engine: str | sqlalchemy.engine.Engine,
+        *,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+    ):
         """
         DatabaseConnection - Represents a connection to a MariaDB database with several abstractions
 
         Args:
             bot (commands.Bot): The discord bot instance
-            engine_string (str): The connection string to the database
+            engine (str | sqlalchemy.engine.Engine): The connection string to the database, or an engine which has already been created (like the SQLite engine used by the benchmarks)
+            pool_size (int, optional): The number of connections kept open in the pool. Defaults to 5.
+            max_overflow (int, optional): The number of extra connections which can be opened when the pool is exhausted. Defaults to 10.
         """
         self.bot: PrimaryBot = bot
-        self.engine = sqlalchemy.create_engine(engine_string)
+        if isinstance(engine, sqlalchemy.engine.Engine):
+            self.engine = engine
+        else:
+            # Connections are pinged before being handed out, so connections dropped by MariaDB's wait_timeout don't fail commands
+            self.engine = sqlalchemy.create_engine(
+                engine,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=True,
+            )
+
+        # Objects are handed back to the event loop after committing, so don't expire them (otherwise reading an attribute would trigger a blocking refresh on the loop)
+        self.Session = sqlalchemy.orm.sessionmaker(
+            bind=self.engine, expire_on_commit=False
+        )
+
+        # One worker per connection the pool can hand out, so concurrent commands don't wait on each other
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size + max_overflow, thread_name_prefix="db"
+        )
+
+        # Permission checks run on every command, so access levels are kept in memory. Cogs which change an employee's access level must update this.
+        self.access_levels = AccessLevelCache()
+        # Resolving channels to projects and tasks also happens on most commands. Cogs which create projects or tasks must add them to this.
+        self.snowflakes = SnowflakeIndex()
+        # Autocomplete runs on every keystroke, so project names, task names and employee usernames are searched in memory. Cogs which create, rename or delete them must update these. Employees are keyed by discord ID, and only registered employees are included.
+        self.project_names = PrefixIndex()
+        self.task_names = PrefixIndex()
+        self.employee_names = PrefixIndex()
+        # Dependency checks walk the whole graph, so it's kept in memory rather than queried level by level
+        self.task_graph = TaskGraph()
+        # Statuses and departments are static, so they're read from here instead of being queried. Call reload_reference_data after changing them.
+        self.reference_data = ReferenceData()
+        # name: number of calls running (or waiting for a worker), for the loop watchdog to report
+        self.calls_in_progress: Counter[str] = Counter()
+
+        # with self.session_scope() as session:
+        #     create_db(self.engine, session)
 
-        Session = sqlalchemy.orm.sessionmaker()
-        Session.configure(bind=self.engine)
-        self.session = Session()
+    @contextmanager
+    def session_scope(self) -> Iterator[sqlalchemy.orm.Session]:
+        """
+        session_scope - Opens a new session which is committed when the block exits (or rolled back if it raises), and then closed. This blocks, so it should only be used on the database executor.
+
+        Yields:
+            sqlalchemy.orm.Session: The new session
+        """
+        session: sqlalchemy.orm.Session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[UnitOfWork]:
+        """
+        unit_of_work - Shares a single session (and transaction) between every ``DatabaseConnection`` call awaited inside the block. It's committed when the block exits, or rolled back if the block raises. Nested units of work join the outer one.
+
+        Calls made outside of a unit of work each get their own session which is committed straight away.
 
-        # create_db(self.engine, self.session)
+        Yields:
+            UnitOfWork: The unit of work
+        """
+        if unit := current_unit_of_work.get():
+            yield unit
+            return
+
+        unit = UnitOfWork(self.Session())
+        token = current_unit_of_work.set(unit)
+        loop = asyncio.get_running_loop()
+        try:
+            yield unit
+            await loop.run_in_executor(self.executor, unit.session.commit)
+        except BaseException:
+            await loop.run_in_executor(self.executor, unit.session.rollback)
+            raise
+        finally:
+            current_unit_of_work.reset(token)
+            await loop.run_in_executor(self.executor, unit.session.close)
+
+    def _run_in_session_scope(self, func: Callable, *args, **kwargs) -> Any:
+        with self.session_scope() as session:
+            return func(session, *args, **kwargs)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        run - Runs a blocking function on the database executor and waits for the result without blocking the event loop. Any ``session`` work that isn't covered by the methods below should be done through this.
+
+        The function is called with a session as its first argument. Inside ``unit_of_work`` that's the unit's session, otherwise a new session which is committed once the function returns.
+
+        Args:
+            func (Callable): The function to run
+            *args: Positional arguments passed to ``func``
+            **kwargs: Keyword arguments passed to ``func``
+
+        Returns:
+            Any: The return value of ``func``
+        """
+        loop = asyncio.get_running_loop()
+        name = callable_name(func)
+        self.calls_in_progress[name] += 1
+        # Includes time spent waiting for a worker (or the unit of work's lock), since the caller waits on that too
+        start_time = time.perf_counter()
+        try:
+            if unit := current_unit_of_work.get():
+                async with unit.lock:
+                    return await loop.run_in_executor(
+                        self.executor,
+                        functools.partial(func, unit.session, *args, **kwargs),
+                    )
+
+            return await loop.run_in_executor(
+                self.executor,
+                functools.partial(self._run_in_session_scope, func, *args, **kwargs),
+            )
+        finally:
+            metrics.observe_db(name, time.perf_counter() - start_time)
+            self.calls_in_progress[name] -= 1
+            if not self.calls_in_progress[name]:
+                del self.calls_in_progress[name]
 
     # Just a wrapper which automatically wraps the string into the sqlalchemy.text
-    def execute(self, query: str, **kwargs) -> CursorResult:
+    def execute(
+        self, session: sqlalchemy.orm.Session, query: str, **kwargs
+    ) -> CursorResult:
         """
         execute - Wraps the query in sqlalchemy.text and executes it. This should only be used in special circumstances (or by ``/exec_query``), for more common SQL operations, see below:
 
-        SQL operation alternatives:
-        ``SELECT`` - ``session.query(TableOBJ)`` (aliased to ``bot.query``)
-        ``INSERT`` - ``session.add(TableOBJ(param=arg))`` (aliased to ``bot.add_obj``). Needs committing via ``session.commit`` (aliased to ``bot.commit``).
-        ``UPDATE`` - ``session.query(TableOBJ).filter_by(param=arg).update({param: arg})`` or ``ExistingTableOBJ.param = arg`` (useful if editing existing object from a ``SELECT`` statement). Needs committing via ``session.commit`` (aliased to ``bot.commit``).
-        ``DELETE`` - ``session.query(TableOBJ).filter_by(param=arg).delete()``. Needs committing via ``session.commit`` (aliased to ``bot.commit``).
+        SQL operation alternatives (all inside a function passed to ``run``, which provides the ``session``):
+        ``SELECT`` - ``session.query(TableOBJ)``
+        ``INSERT`` - ``session.add(TableOBJ(param=arg))`` (or ``await add_obj(TableOBJ(param=arg))`` from the event loop)
+        ``UPDATE`` - ``session.query(TableOBJ).filter_by(param=arg).update({param: arg})`` or ``ExistingTableOBJ.param = arg`` (useful if editing existing object from a ``SELECT`` statement in the same ``unit_of_work``)
+        ``DELETE`` - ``session.query(TableOBJ).filter_by(param=arg).delete()``
+
+        Changes are committed when ``run`` returns, or when the surrounding ``unit_of_work`` exits.
+
+        This blocks, so it (and any ``style_query`` on its result) should be called through ``run``.
 
         Args:
+            session (sqlalchemy.orm.Session): The session to execute the query in
             query (str): The SQL query to execute
 
         Returns:
             CursorResult: The result of the cursor. This can be passed to ``style_query`` for a nice output when using SELECT statements. For further pretty printing and error handling, see the ``/exec_query`` command.
         """
-        return self.engine.execute(sqlalchemy.text(query), **kwargs)
+        return session.execute(sqlalchemy.text(query), kwargs)
 
     def style_query(self, query_results: CursorResult) -> str:
         """
@@ -60,9 +243,27 @@ class DatabaseConnection:
         Returns:
             str: The formatted table as a string
         """
+        # Imported here since it's slow to import and rarely needed
+        from tabulate import tabulate
+
         return tabulate(query_results.mappings().all(), headers="keys", tablefmt="psql")
 
-    def get_access_level(
+    @run_in_executor
+    def add_obj(self, session: sqlalchemy.orm.Session, obj: Base) -> Base:
+        """
+        add_obj - Adds a new row to the database. The session is flushed straight away, so constraint errors (like ``IntegrityError``) are raised here and the object's primary key is populated.
+
+        Args:
+            obj (Base): The table object to add
+
+        Returns:
+            Base: The added object
+        """
+        session.add(obj)
+        session.flush()
+        return obj
+
+    async def get_access_level(
         self, *, discord_id: int = None, employee_id: int = None
     ) -> int:
         """
@@ -78,22 +279,164 @@ class DatabaseConnection:
         Returns:
             int: The employee's access level, or 0 if the employee doesn't exist
         """
+        # Only lookups by discord ID are cached, since that's what permission checks use
+        if not discord_id:
+            return await self.run(self._get_access_level, employee_id=employee_id)
+
+        access_level = self.access_levels.get(discord_id)
+        if access_level is None:
+            # A change committed while this reads (and cached with set) mustn't be replaced with what this read
+            generation = self.access_levels.generation
+            access_level = await self.run(self._get_access_level, discord_id=discord_id)
+            self.access_levels.fill(discord_id, access_level, generation)
+        return access_level
+
+    def _get_access_level(
+        self,
+        session: sqlalchemy.orm.Session,
+        *,
+        discord_id: int = None,
+        employee_id: int = None,
+    ) -> int:
         employee: Employee
 
         if discord_id:
-            employee = (
-                self.session.query(Employee).filter_by(discord_id=discord_id).first()
-            )
+            employee = session.query(Employee).filter_by(discord_id=discord_id).first()
         elif employee_id:
-            employee = (
-                self.session.query(Employee).filter_by(employee_id=employee_id).first()
-            )
+            employee = session.query(Employee).filter_by(id=employee_id).first()
         else:
             raise ValueError("Must specify either discord_id or employee_id")
 
         return employee.access_level if employee else 0
 
-    def get_project(
+    async def warm_pool(self):
+        """
+        warm_pool - Opens every connection the pool keeps open, at the same time, so the first commands after startup don't each wait on a new connection.
+        """
+        # Each worker holds its connection until every worker has one, otherwise they'd all reuse the first connection returned to the pool
+        # Pools which don't keep connections open (like SQLite's) have no size
+        barrier = threading.Barrier(getattr(self.engine.pool, "size", lambda: 1)())
+
+        def open_connection():
+            with self.engine.connect() as connection:
+                connection.execute(sqlalchemy.text("SELECT 1"))
+                try:
+                    barrier.wait(timeout=5)
+                except threading.BrokenBarrierError:
+                    pass
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, open_connection)
+                for _ in range(barrier.parties)
+            )
+        )
+
+    async def warm_caches(self):
+        """
+        warm_caches - Loads the channel IDs of every project and task into ``snowflakes``, every task dependency into ``task_graph``, the statuses and departments into ``reference_data``, and the project, task and employee names into their prefix indexes. This should be called once at startup.
+        """
+        (
+            (projects, tasks),
+            (dependencies, due_dates),
+            _,
+            (project_names, task_names, employee_names),
+        ) = await asyncio.gather(
+            self.run(self._get_snowflakes),
+            self.run(self._get_task_graph),
+            self.reload_reference_data(),
+            self.run(self._get_names),
+        )
+
+        self.snowflakes.clear()
+        for project_id, forum_channel_id, main_thread_id in projects:
+            self.snowflakes.add_project(project_id, forum_channel_id, main_thread_id)
+        for task_id, thread_channel_id in tasks:
+            self.snowflakes.add_task(task_id, thread_channel_id)
+
+        self.task_graph.load(dependencies, due_dates)
+
+        self.project_names.load(project_names)
+        self.task_names.load(task_names)
+        self.employee_names.load(employee_names)
+
+    async def reload_reference_data(self) -> ReferenceData:
+        """
+        reload_reference_data - Reloads ``reference_data`` from the ``Status`` and ``Department`` tables.
+
+        Returns:
+            ReferenceData: The new reference data
+        """
+        self.reference_data = await self.run(self._get_reference_data)
+        return self.reference_data
+
+    def _get_reference_data(self, session: sqlalchemy.orm.Session) -> ReferenceData:
+        return ReferenceData(
+            statuses=[
+                StatusInfo(id=status_id, name=name, emoji=emoji)
+                for status_id, name, emoji in session.query(
+                    Status.id, Status.name, Status.emoji
+                )
+            ],
+            departments=[
+                DepartmentInfo(id=department_id, name=name)
+                for department_id, name in session.query(Department.id, Department.name)
+            ],
+        )
+
+    def _get_snowflakes(
+        self, session: sqlalchemy.orm.Session
+    ) -> tuple[list[tuple[int, int, int]], list[tuple[int, int]]]:
+        projects = session.query(
+            Project.id, Project.discord_forum_channel_id, Project.discord_main_thread_id
+        ).all()
+        tasks = session.query(Task.id, Task.discord_thread_channel_id).all()
+        return projects, tasks
+
+    def _get_names(
+        self, session: sqlalchemy.orm.Session
+    ) -> tuple[list[tuple[int, str]], list[tuple[int, str]], list[tuple[int, str]]]:
+        projects = session.query(Project.id, Project.name).all()
+        tasks = session.query(Task.id, Task.name).all()
+        # Purged employees keep their row, but lose their username and access
+        employees = (
+            session.query(Employee.discord_id, Employee.username)
+            .filter(Employee.access_level > 0)
+            .all()
+        )
+        return projects, tasks, employees
+
+    def _get_task_graph(
+        self, session: sqlalchemy.orm.Session
+    ) -> tuple[list[tuple[int, int]], list[tuple[int, date]]]:
+        dependencies = session.query(
+            TaskDependency.parent_task_id, TaskDependency.child_task_id
+        ).all()
+        due_dates = (
+            session.query(Task.id, Task.due_date).filter(Task.due_date != None).all()
+        )
+        return dependencies, due_dates
+
+    async def resolve_project_id(self, forum_channel_id: int) -> int | None:
+        """
+        resolve_project_id - Gets the ID of the project associated with a forum channel, without querying the database unless the channel isn't in ``snowflakes``.
+
+        Args:
+            forum_channel_id (int): The channel ID of the project's ``discord.ForumChannel``
+
+        Returns:
+            int | None: The ID of the project, or None if the channel isn't a project
+        """
+        if project_id := self.snowflakes.projects_by_forum_channel.get(
+            forum_channel_id
+        ):
+            return project_id
+
+        project = await self.get_project(forum_channel_id=forum_channel_id)
+        return project.id if project else None
+
+    async def get_project(
         self, *, forum_channel_id: int = None, project_id: int = None
     ) -> Project | None:
         """
@@ -109,18 +452,106 @@ class DatabaseConnection:
         Returns:
             Project | None: The project object, or None if the project doesn't exist
         """
+        if forum_channel_id:
+            if not (
+                project_id := self.snowflakes.projects_by_forum_channel.get(
+                    forum_channel_id
+                )
+            ):
+                # Fall back to the database in case the project was added outside of the bot (like through /exec_query)
+                project: Project = await self.run(
+                    self._get_project, forum_channel_id=forum_channel_id
+                )
+                if project:
+                    self.snowflakes.add_project(
+                        project.id,
+                        project.discord_forum_channel_id,
+                        project.discord_main_thread_id,
+                    )
+                return project
+        elif not project_id:
+            raise ValueError("Must specify either forum_channel_id or project_id")
+
+        return await self.run(self._get_project, project_id=project_id)
+
+    def _get_project(
+        self,
+        session: sqlalchemy.orm.Session,
+        *,
+        forum_channel_id: int = None,
+        project_id: int = None,
+    ) -> Project | None:
         if forum_channel_id:
             return (
-                self.session.query(Project)
+                session.query(Project)
                 .filter_by(discord_forum_channel_id=forum_channel_id)
                 .first()
             )
-        elif project_id:
-            return self.session.query(Project).filter_by(project_id=project_id).first()
-        else:
-            raise ValueError("Must specify either forum_channel_id or project_id")
+        return session.query(Project).filter_by(id=project_id).first()
 
-    def get_project_forum_channel(
+    @run_in_executor
+    def update_project(
+        self, session: sqlalchemy.orm.Session, project_id: int, **values
+    ):
+        """
+        update_project - Updates the columns of a project.
+
+        Args:
+            project_id (int): The ID of the project to update
+            **values: The columns to update, mapped to their new values
+        """
+        session.query(Project).filter_by(id=project_id).update(values)
+
+    @run_in_executor
+    def create_project(
+        self, session: sqlalchemy.orm.Session, project: Project
+    ) -> Project:
+        """
+        create_project - Adds a new project, along with its (empty) task counts.
+
+        Args:
+            project (Project): The project to add
+
+        Returns:
+            Project: The added project, with its ID populated
+        """
+        session.add(project)
+        session.flush()
+        session.add(
+            ProjectStats(project_id=project.id, total_tasks=0, completed_tasks=0)
+        )
+        session.flush()
+        return project
+
+    @run_in_executor
+    def get_project_with_stats(
+        self, session: sqlalchemy.orm.Session, project_id: int
+    ) -> tuple[Project | None, ProjectStats | None]:
+        return (
+            session.get(Project, project_id),
+            session.get(ProjectStats, project_id),
+        )
+
+    def _adjust_project_stats(
+        self,
+        session: sqlalchemy.orm.Session,
+        project_id: int,
+        *,
+        total_tasks: int = 0,
+        completed_tasks: int = 0,
+    ) -> ProjectStats:
+        # Counts are changed in place by the database, so concurrent changes to the same project can't overwrite each other
+        session.query(ProjectStats).filter_by(project_id=project_id).update(
+            {
+                ProjectStats.total_tasks: ProjectStats.total_tasks + total_tasks,
+                ProjectStats.completed_tasks: ProjectStats.completed_tasks
+                + completed_tasks,
+            },
+            synchronize_session=False,
+        )
+        return session.get(ProjectStats, project_id, populate_existing=True)
+
+    async def get_project_forum_channel(
         self, *, channel_id: int = None, project_id: int = None
     ) -> discord.ForumChannel:
         """
@@ -139,68 +570,53 @@ class DatabaseConnection:
             discord.ForumChannel: The forum channel object of the project
         """
         if channel_id:
-            channel: discord.abc.GuildChannel = self.bot.get_or_fetch_channel(channel_id)
+            channel: discord.abc.GuildChannel = await self.bot.get_or_fetch_channel(
+                channel_id
+            )
 
             if not isinstance(channel, discord.ForumChannel):
                 raise ValueError("Channel is not a forum channel")
-            if (
-                self.bot.query(Project)
-                .filter_by(discord_forum_channel_id=channel.id)
-                .first()
-            ):
+            if await self.get_project(forum_channel_id=channel.id):
                 return channel
             else:
                 raise ValueError("Channel is not a valid project forum channel")
 
         elif project_id:
-            project_obj: Project = (
-                self.session.query(Project).filter_by(project_id=project_id).first()
+            project_obj: Project = await self.get_project(project_id=project_id)
+            return await self.bot.get_or_fetch_channel(
+                project_obj.discord_forum_channel_id
             )
-            return self.bot.get_or_fetch_channel(project_obj.discord_forum_channel_id)
         else:
             raise ValueError("Must specify either channel_id or project_id")
 
-    def get_project_main_thread(
+    async def get_project_main_thread(
         self, *, channel_id: int = None, project_id: int = None
     ) -> discord.Thread:
         # TODO this should be fetched by getting the main thread (if channel_id, get parent, check DB for parent, then get main)
         project_obj: Project = None
         if channel_id:
-            project_obj = (
-                self.session.query(Project).filter_by(channel_id=channel_id).first()
-            )
+            project_obj = await self.get_project(forum_channel_id=channel_id)
         elif project_id:
-            project_obj = (
-                self.session.query(Project).filter_by(project_id=project_id).first()
-            )
+            project_obj = await self.get_project(project_id=project_id)
         else:
             raise ValueError("Must specify either channel_id or project_id")
-        return self.bot.get_guild(GUILD_ID).get_channel(
+        return self.bot.get_guild(GUILD_ID).get_channel_or_thread(
             project_obj.discord_main_thread_id
         )
 
-    def get_project_main_message(
+    async def get_project_main_message(
         self, *, channel_id: int = None, project_id: int = None
-    ) -> discord.Message:
-        if channel_id:
-            return (
-                self.session.query(Project)
-                .filter_by(channel_id=channel_id)
-                .first()
-                .first_message
-            )
-        elif project_id:
-            return (
-                self.session.query(Project)
-                .filter_by(project_id=project_id)
-                .first()
-                .first_message
-            )
-        else:
-            raise ValueError("Must specify either channel_id or project_id")
+    ) -> discord.PartialMessage:
+        main_thread = await self.get_project_main_thread(
+            channel_id=channel_id, project_id=project_id
+        )
+        # The first message of a thread has the same ID as the thread
+        return main_thread.get_partial_message(main_thread.id)
 
+    @run_in_executor
     def get_employee(
         self,
+        session: sqlalchemy.orm.Session,
         *,
         discord_id: int = None,
         employee_id: int = None,
@@ -209,40 +625,86 @@ class DatabaseConnection:
         if discord_id:
             if filter_access_level:
                 return (
-                    self.session.query(Employee)
+                    session.query(Employee)
                     .filter_by(discord_id=discord_id)
                     .filter(Employee.access_level > 0)
                     .first()
                 )
-            return self.session.query(Employee).filter_by(discord_id=discord_id).first()
+            return session.query(Employee).filter_by(discord_id=discord_id).first()
         elif employee_id:
             if filter_access_level:
                 return (
-                    self.session.query(Employee)
-                    .filter_by(employee_id=employee_id)
+                    session.query(Employee)
+                    .filter_by(id=employee_id)
                     .filter(Employee.access_level > 0)
                     .first()
                 )
-            return (
-                self.session.query(Employee).filter_by(employee_id=employee_id).first()
-            )
+            return session.query(Employee).filter_by(id=employee_id).first()
         else:
             raise ValueError("Must specify either discord_id or employee_id")
 
-    def get_filtered_employees(self) -> list[Employee]:
-        return self.session.query(Employee).filter(Employee.access_level > 0).all()
+    @run_in_executor
+    def update_employee(
+        self, session: sqlalchemy.orm.Session, discord_id: int, **values
+    ):
+        """
+        update_employee - Updates the columns of an employee.
 
-    def check_access_level(self, discord_id: int, access_level: int) -> bool:
-        return self.get_access_level(discord_id) >= access_level
+        Args:
+            discord_id (int): The discord ID of the employee to update
+            **values: The columns to update, mapped to their new values
+        """
+        session.query(Employee).filter_by(discord_id=discord_id).update(values)
+
+    @run_in_executor
+    def bulk_update_employees(
+        self, session: sqlalchemy.orm.Session, updates: dict[int, dict[str, Any]]
+    ):
+        """
+        bulk_update_employees - Updates the columns of many employees at once, using a single ``executemany`` UPDATE for each set of columns being updated.
+
+        Args:
+            updates (dict[int, dict[str, Any]]): The columns to update, mapped to their new values, keyed by the discord ID of the employee
+        """
+        table = Employee.__table__
+        rows_by_columns: dict[tuple[str, ...], list[dict[str, Any]]] = defaultdict(list)
+        for discord_id, values in updates.items():
+            # Bind parameters can't share a name with the columns being updated
+            rows_by_columns[tuple(sorted(values))].append(
+                {"b_discord_id": discord_id}
+                | {f"b_{column}": value for column, value in values.items()}
+            )
+
+        for columns, rows in rows_by_columns.items():
+            session.execute(
+                table.update()
+                .where(table.c.discord_id == sqlalchemy.bindparam("b_discord_id"))
+                .values(
+                    {
+                        column: sqlalchemy.bindparam(f"b_{column}")
+                        for column in columns
+                    }
+                ),
+                rows,
+            )
+
+    @run_in_executor
+    def get_filtered_employees(
+        self, session: sqlalchemy.orm.Session
+    ) -> list[Employee]:
+        return session.query(Employee).filter(Employee.access_level > 0).all()
 
-    def get_employee_member(
+    async def check_access_level(self, discord_id: int, access_level: int) -> bool:
+        return await self.get_access_level(discord_id=discord_id) >= access_level
+
+    async def get_employee_member(
         self,
         *,
         discord_id: int = None,
         employee_id: int = None,
         filter_access_level: bool = True,
     ) -> discord.Member | None:
-        if employee := self.get_employee(
+        if employee := await self.get_employee(
             discord_id=discord_id,
             employee_id=employee_id,
             filter_access_level=filter_access_level,
@@ -250,10 +712,605 @@ class DatabaseConnection:
             return self.bot.get_guild(GUILD_ID).get_member(employee.discord_id)
         return None
 
-    def get_task(self, *, task_id: int = None, channel_id: int = None) -> Task | None:
-        if task_id:
-            return self.session.query(Task).filter_by(task_id=task_id).first()
-        elif channel_id:
-            return self.session.query(Task).filter_by(channel_id=channel_id).first()
-        else:
+    async def resolve_task_id(self, thread_channel_id: int) -> int | None:
+        """
+        resolve_task_id - Gets the ID of the task associated with a thread, without querying the database unless the thread isn't in ``snowflakes``.
+
+        Args:
+            thread_channel_id (int): The channel ID of the task's ``discord.Thread``
+
+        Returns:
+            int | None: The ID of the task, or None if the thread isn't a task
+        """
+        if task_id := self.snowflakes.tasks_by_thread_channel.get(thread_channel_id):
+            return task_id
+
+        task = await self.get_task(channel_id=thread_channel_id)
+        return task.id if task else None
+
+    async def get_task(
+        self, *, task_id: int = None, channel_id: int = None
+    ) -> Task | None:
+        if channel_id:
+            if not (
+                task_id := self.snowflakes.tasks_by_thread_channel.get(channel_id)
+            ):
+                # Fall back to the database in case the task was added outside of the bot (like through /exec_query)
+                task: Task = await self.run(self._get_task, channel_id=channel_id)
+                if task:
+                    self.snowflakes.add_task(task.id, task.discord_thread_channel_id)
+                return task
+        elif not task_id:
             raise ValueError("Must specify either task_id or channel_id")
+
+        return await self.run(self._get_task, task_id=task_id)
+
+    def _get_task(
+        self,
+        session: sqlalchemy.orm.Session,
+        *,
+        task_id: int = None,
+        channel_id: int = None,
+    ) -> Task | None:
+        if channel_id:
+            return (
+                session.query(Task)
+                .filter_by(discord_thread_channel_id=channel_id)
+                .first()
+            )
+        return session.query(Task).filter_by(id=task_id).first()
+
+    @run_in_executor
+    def get_task_assignees(
+        self, session: sqlalchemy.orm.Session, task_ids: Iterable[int]
+    ) -> dict[int, list[int]]:
+        """
+        get_task_assignees - Gets the discord IDs of the assignees of tasks.
+
+        Args:
+            task_ids (Iterable[int]): The IDs of the tasks
+
+        Returns:
+            dict[int, list[int]]: The discord IDs of each task's assignees, keyed by task ID. Tasks without assignees are left out.
+        """
+        assignees: defaultdict[int, list[int]] = defaultdict(list)
+        for task_id, discord_id in (
+            session.query(TaskAssignee.task_id, Employee.discord_id)
+            .join(Employee, Employee.id == TaskAssignee.employee_id)
+            .filter(TaskAssignee.task_id.in_(set(task_ids)))
+            .order_by(TaskAssignee.task_id, Employee.id)
+        ):
+            assignees[task_id].append(discord_id)
+        return dict(assignees)
+
+    @run_in_executor
+    def create_task(self, session: sqlalchemy.orm.Session, task: Task) -> ProjectStats:
+        """
+        create_task - Adds a new task and counts it towards its project's task counts.
+
+        Args:
+            task (Task): The task to add. Its ID is populated once added.
+
+        Returns:
+            ProjectStats: The project's updated task counts
+        """
+        session.add(task)
+        session.flush()
+        complete_status_id = self.reference_data.complete_status_id
+        return self._adjust_project_stats(
+            session,
+            task.project_id,
+            total_tasks=1,
+            completed_tasks=int(
+                complete_status_id is not None and task.status == complete_status_id
+            ),
+        )
+
+    @run_in_executor
+    def set_task_status(
+        self, session: sqlalchemy.orm.Session, task_id: int, status_id: int
+    ) -> tuple[Task, ProjectStats]:
+        """
+        set_task_status - Changes the status of a task, updating its project's completed task count if it was completed (or uncompleted).
+
+        Args:
+            task_id (int): The ID of the task
+            status_id (int): The ID of the new status
+
+        Returns:
+            tuple[Task, ProjectStats]: The updated task, and its project's updated task counts
+        """
+        task: Task = session.query(Task).filter_by(id=task_id).with_for_update().one()
+        complete_status_id = self.reference_data.complete_status_id
+        # Without a "Complete" status nothing counts as completed, including tasks without a status
+        completed_change = (
+            0
+            if complete_status_id is None
+            else int(status_id == complete_status_id)
+            - int(task.status == complete_status_id)
+        )
+
+        task.status = status_id
+        session.flush()
+        return task, self._adjust_project_stats(
+            session, task.project_id, completed_tasks=completed_change
+        )
+
+    @run_in_executor
+    def add_asset(
+        self, session: sqlalchemy.orm.Session, task_id: int, asset_link: str
+    ) -> tuple[Asset, bool]:
+        """
+        add_asset - Attaches a stored file to a task, unless the task already has it. Identical files are stored once, so the same link can belong to many tasks.
+
+        Args:
+            task_id (int): The ID of the task
+            asset_link (str): The link to the stored file
+
+        Returns:
+            tuple[Asset, bool]: The task's asset, and whether it was just added (False if the task already had it)
+        """
+        if asset := (
+            session.query(Asset).filter_by(task_id=task_id, asset_link=asset_link).first()
+        ):
+            return asset, False
+
+        asset = Asset(task_id=task_id, asset_link=asset_link)
+        session.add(asset)
+        session.flush()
+        return asset, True
+
+    @run_in_executor
+    def delete_task(
+        self, session: sqlalchemy.orm.Session, task_id: int
+    ) -> tuple[ProjectStats, list[int]]:
+        """
+        delete_task - Deletes a task along with its assignees, dependencies and assets, and removes it from its project's task counts. Subtasks of the task are left without a parent.
+
+        Args:
+            task_id (int): The ID of the task
+
+        Returns:
+            tuple[ProjectStats, list[int]]: The project's updated task counts, and the IDs of the task's subtasks
+        """
+        task: Task = session.query(Task).filter_by(id=task_id).with_for_update().one()
+
+        session.query(TaskAssignee).filter_by(task_id=task_id).delete()
+        session.query(Asset).filter_by(task_id=task_id).delete()
+        session.query(TaskDependency).filter(
+            (TaskDependency.parent_task_id == task_id)
+            | (TaskDependency.child_task_id == task_id)
+        ).delete()
+        subtask_ids = [
+            subtask_id
+            for (subtask_id,) in session.query(Task.id).filter_by(
+                parent_task_id=task.discord_thread_channel_id
+            )
+        ]
+        if subtask_ids:
+            session.query(Task).filter(Task.id.in_(subtask_ids)).update(
+                {Task.parent_task_id: None}, synchronize_session=False
+            )
+        session.query(PendingTaskThread).filter_by(task_id=task_id).delete()
+        session.query(PendingTaskThread).filter_by(parent_task_id=task_id).update(
+            {PendingTaskThread.parent_task_id: None}
+        )
+        session.delete(task)
+        session.flush()
+
+        complete_status_id = self.reference_data.complete_status_id
+        stats = self._adjust_project_stats(
+            session,
+            task.project_id,
+            total_tasks=-1,
+            completed_tasks=-int(
+                complete_status_id is not None and task.status == complete_status_id
+            ),
+        )
+        return stats, subtask_ids
+
+    @run_in_executor
+    def get_task_tree(
+        self, session: sqlalchemy.orm.Session, task_id: int
+    ) -> list[sqlalchemy.engine.Row]:
+        """
+        get_task_tree - Gets a task and all of its subtasks, however deeply nested, in a single recursive query.
+
+        Args:
+            task_id (int): The ID of the task at the root of the tree
+
+        Returns:
+            list[sqlalchemy.engine.Row]: One row per task with ``id``, ``name``, ``status``, ``parent_task_id``, ``discord_thread_channel_id``, ``complete`` and ``depth``, in no particular order
+        """
+        complete_status_id = self.reference_data.complete_status_id
+
+        tree = (
+            session.query(
+                Task.id,
+                Task.name,
+                Task.status,
+                Task.parent_task_id,
+                Task.discord_thread_channel_id,
+                sqlalchemy.literal(0).label("depth"),
+            )
+            .filter(Task.id == task_id)
+            .cte("task_tree", recursive=True)
+        )
+        subtask = sqlalchemy.orm.aliased(Task)
+        tree = tree.union_all(
+            session.query(
+                subtask.id,
+                subtask.name,
+                subtask.status,
+                subtask.parent_task_id,
+                subtask.discord_thread_channel_id,
+                tree.c.depth + 1,
+            )
+            # parent_task_id holds the thread ID of the parent task, not its row ID
+            .join(tree, subtask.parent_task_id == tree.c.discord_thread_channel_id)
+            # Parents can be changed through /exec_query, so don't trust the tree to be acyclic
+            .filter(tree.c.depth < MAX_TASK_TREE_DEPTH)
+        )
+        # Comparing with None would count every task without a status as complete
+        complete = (
+            tree.c.status == complete_status_id
+            if complete_status_id is not None
+            else sqlalchemy.false()
+        )
+        return session.query(tree, complete.label("complete")).all()
+
+    @run_in_executor
+    def import_tasks(
+        self,
+        session: sqlalchemy.orm.Session,
+        project_id: int,
+        tasks: list[ImportedTask],
+    ) -> tuple[dict[str, int], ProjectStats]:
+        """
+        import_tasks - Adds many tasks at once, along with their assignees and dependencies, using a single ``executemany`` INSERT per table (other than the tasks themselves, whose IDs are needed). The tasks are added without threads, and are left in ``PendingTaskThread`` until ``save_task_thread`` is called for them.
+
+        Args:
+            project_id (int): The ID of the project to add the tasks to
+            tasks (list[ImportedTask]): The validated tasks
+
+        Raises:
+            TaskImportError: An assignee isn't a registered employee
+
+        Returns:
+            tuple[dict[str, int], ProjectStats]: The ID of each new task keyed by its key, and the project's updated task counts
+        """
+        # Assignees can be given by username or discord ID
+        assignee_names = {name for task in tasks for name in task.assignees}
+        discord_ids = {int(name) for name in assignee_names if name.isdigit()}
+        employees = session.query(
+            Employee.id, Employee.username, Employee.discord_id
+        ).filter(
+            Employee.username.in_(assignee_names)
+            | Employee.discord_id.in_(discord_ids)
+        )
+        employee_ids = {}
+        for employee_id, username, discord_id in employees:
+            employee_ids[str(discord_id)] = employee_id
+            if username:
+                employee_ids[username] = employee_id
+
+        if unknown_assignees := [
+            f"Row {task.row}: {name} is not a registered employee."
+            for task in tasks
+            for name in task.assignees
+            if name not in employee_ids
+        ]:
+            raise TaskImportError(unknown_assignees)
+
+        # MariaDB can't return the IDs of rows added by an executemany INSERT, so the tasks are added through the ORM, which inserts them one at a time and reads back each ID that AUTO_INCREMENT assigned. Allocating the IDs here instead would collide with tasks being created at the same time.
+        new_tasks = {
+            task.key: Task(
+                project_id=project_id,
+                name=task.name,
+                description=task.description,
+                due_date=task.due_date,
+                department=task.department.id if task.department else None,
+                status=task.status.id if task.status else None,
+            )
+            for task in tasks
+        }
+        session.add_all(new_tasks.values())
+        session.flush()
+        task_ids = {key: new_task.id for key, new_task in new_tasks.items()}
+
+        session.execute(
+            PendingTaskThread.__table__.insert(),
+            [
+                {
+                    "task_id": task_ids[task.key],
+                    "parent_task_id": task_ids.get(task.parent_key),
+                }
+                for task in tasks
+            ],
+        )
+        if assignees := [
+            {"task_id": task_ids[task.key], "employee_id": employee_ids[name]}
+            for task in tasks
+            # The same employee could be listed twice
+            for name in dict.fromkeys(task.assignees)
+        ]:
+            session.execute(
+                TaskAssignee.__table__.insert().prefix_with("IGNORE"), assignees
+            )
+        if dependencies := [
+            {
+                "parent_task_id": task_ids[dependency_key],
+                "child_task_id": task_ids[task.key],
+            }
+            for task in tasks
+            for dependency_key in dict.fromkeys(task.depends_on)
+        ]:
+            session.execute(TaskDependency.__table__.insert(), dependencies)
+
+        complete_status_id = self.reference_data.complete_status_id
+        return task_ids, self._adjust_project_stats(
+            session,
+            project_id,
+            total_tasks=len(tasks),
+            completed_tasks=sum(
+                task.status is not None and task.status.id == complete_status_id
+                for task in tasks
+            ),
+        )
+
+    @run_in_executor
+    def get_pending_task_threads(
+        self, session: sqlalchemy.orm.Session, project_id: int
+    ) -> list[tuple[Task, int | None, int | None]]:
+        """
+        get_pending_task_threads - Gets the tasks of a project which were imported but don't have a thread yet.
+
+        Args:
+            project_id (int): The ID of the project
+
+        Returns:
+            list[tuple[Task, int | None, int | None]]: Each task, with the row ID of its parent task and the parent's thread ID (if the parent has a thread already), ordered by ID
+        """
+        parent = sqlalchemy.orm.aliased(Task)
+        return (
+            session.query(
+                Task, PendingTaskThread.parent_task_id, parent.discord_thread_channel_id
+            )
+            .join(PendingTaskThread, PendingTaskThread.task_id == Task.id)
+            .outerjoin(parent, parent.id == PendingTaskThread.parent_task_id)
+            .filter(Task.project_id == project_id)
+            .order_by(Task.id)
+            .all()
+        )
+
+    @run_in_executor
+    def save_task_thread(
+        self,
+        session: sqlalchemy.orm.Session,
+        task_id: int,
+        thread_channel_id: int,
+        parent_thread_channel_id: int | None,
+    ):
+        """
+        save_task_thread - Sets the thread of an imported task, and removes it from ``PendingTaskThread``.
+
+        Args:
+            task_id (int): The ID of the task
+            thread_channel_id (int): The channel ID of the task's thread
+            parent_thread_channel_id (int | None): The channel ID of the parent task's thread
+        """
+        session.query(Task).filter_by(id=task_id).update(
+            {
+                Task.discord_thread_channel_id: thread_channel_id,
+                Task.parent_task_id: parent_thread_channel_id,
+            },
+            synchronize_session=False,
+        )
+        session.query(PendingTaskThread).filter_by(task_id=task_id).delete()
+
+    async def add_task_dependency(self, prerequisite_id: int, task_id: int) -> bool:
+        """
+        add_task_dependency - Makes a task blocked by another task.
+
+        Args:
+            prerequisite_id (int): The ID of the task which has to be done first
+            task_id (int): The ID of the task which is blocked
+
+        Raises:
+            CycleError: The dependency would create a cycle
+
+        Returns:
+            bool: Whether the dependency was added (False if it already existed)
+        """
+        if task_id in self.task_graph.dependents.get(prerequisite_id, ()):
+            return False
+
+        # The cycle check and the insert into the graph happen without awaiting in between, so two concurrent commands can't each pass the check and create a cycle together
+        self.task_graph.add_dependency(prerequisite_id, task_id)
+        try:
+            await self.add_obj(
+                TaskDependency(parent_task_id=prerequisite_id, child_task_id=task_id)
+            )
+        except Exception:
+            self.task_graph.remove_dependency(prerequisite_id, task_id)
+            raise
+        return True
+
+    async def remove_task_dependency(
+        self, prerequisite_id: int, task_id: int
+    ) -> bool:
+        """
+        remove_task_dependency - Makes a task no longer blocked by another task.
+
+        Args:
+            prerequisite_id (int): The ID of the task which had to be done first
+            task_id (int): The ID of the task which was blocked
+
+        Returns:
+            bool: Whether the dependency existed
+        """
+        removed = await self.run(self._remove_task_dependency, prerequisite_id, task_id)
+        self.task_graph.remove_dependency(prerequisite_id, task_id)
+        return bool(removed)
+
+    def _remove_task_dependency(
+        self, session: sqlalchemy.orm.Session, prerequisite_id: int, task_id: int
+    ) -> int:
+        return (
+            session.query(TaskDependency)
+            .filter_by(parent_task_id=prerequisite_id, child_task_id=task_id)
+            .delete()
+        )
+
+    @run_in_executor
+    def get_reminder_targets(
+        self,
+        session: sqlalchemy.orm.Session,
+        due_from: date = None,
+        due_until: date = None,
+        *,
+        task_ids: Iterable[int] = None,
+    ) -> list[sqlalchemy.engine.Row]:
+        """
+        get_reminder_targets - Gets who should be reminded of the due dates of incomplete tasks, either by due date (using the due date index) or by task.
+
+        Args:
+            due_from (date, optional): The earliest due date to include
+            due_until (date, optional): The latest due date to include
+            task_ids (Iterable[int], optional): The tasks to include, rather than a range of due dates
+
+        Returns:
+            list[sqlalchemy.engine.Row]: A row for each assignee of each task, with ``task_id``, ``task_name``, ``due_date``, ``thread_id``, ``employee_id``, ``discord_id`` and ``utc_offset``. Tasks without assignees get a single row with the employee columns set to None.
+        """
+        query = (
+            session.query(
+                Task.id.label("task_id"),
+                Task.name.label("task_name"),
+                Task.due_date,
+                Task.discord_thread_channel_id.label("thread_id"),
+                Employee.id.label("employee_id"),
+                Employee.discord_id,
+                Employee.utc_offset,
+            )
+            .outerjoin(TaskAssignee, TaskAssignee.task_id == Task.id)
+            # Employees who were purged aren't reminded
+            .outerjoin(
+                Employee,
+                sqlalchemy.and_(
+                    Employee.id == TaskAssignee.employee_id, Employee.access_level > 0
+                ),
+            )
+            .filter(Task.due_date != None)
+        )
+        if (complete_status_id := self.reference_data.complete_status_id) is not None:
+            query = query.filter(
+                sqlalchemy.or_(Task.status == None, Task.status != complete_status_id)
+            )
+        if task_ids is not None:
+            query = query.filter(Task.id.in_(list(task_ids)))
+        else:
+            query = query.filter(Task.due_date.between(due_from, due_until))
+        return query.all()
+
+    @run_in_executor
+    def get_assigned_tasks(
+        self,
+        session: sqlalchemy.orm.Session,
+        discord_id: int,
+        *,
+        after: tuple[date, int] = None,
+        limit: int,
+        include_complete: bool = False,
+    ) -> list[sqlalchemy.engine.Row]:
+        """
+        get_assigned_tasks - Gets a page of the tasks assigned to an employee in a single query, ordered by due date (tasks without one last) and then ID. Pages are found by the sort key of the last task on the previous page (keyset pagination), so later pages are as fast as the first.
+
+        Args:
+            discord_id (int): The discord ID of the employee
+            after (tuple[date, int], optional): The ``sort_due_date`` and ``id`` of the last task on the previous page. Defaults to None (the first page).
+            limit (int): The number of tasks to get
+            include_complete (bool, optional): Whether to include completed tasks. Defaults to False.
+
+        Returns:
+            list[sqlalchemy.engine.Row]: The tasks, with ``id``, ``name``, ``due_date``, ``status``, ``thread_id``, ``project_name`` and ``sort_due_date``
+        """
+        # Tasks without a due date sort last, and can't be compared with NULL
+        sort_due_date = sqlalchemy.func.coalesce(Task.due_date, date.max)
+        query = (
+            session.query(
+                Task.id,
+                Task.name,
+                Task.due_date,
+                Task.status,
+                Task.discord_thread_channel_id.label("thread_id"),
+                Project.name.label("project_name"),
+                sort_due_date.label("sort_due_date"),
+            )
+            .join(TaskAssignee, TaskAssignee.task_id == Task.id)
+            .join(Employee, Employee.id == TaskAssignee.employee_id)
+            .join(Project, Project.id == Task.project_id)
+            .filter(Employee.discord_id == discord_id)
+        )
+        if not include_complete and (
+            complete_status_id := self.reference_data.complete_status_id
+        ):
+            query = query.filter(
+                sqlalchemy.or_(Task.status == None, Task.status != complete_status_id)
+            )
+        if after:
+            query = query.filter(sqlalchemy.tuple_(sort_due_date, Task.id) > after)
+        return query.order_by(sort_due_date, Task.id).limit(limit).all()
+
+    @run_in_executor
+    def search_tasks(
+        self,
+        session: sqlalchemy.orm.Session,
+        words: list[str],
+        *,
+        project_name: str = None,
+        status_id: int = None,
+        department_id: int = None,
+        limit: int,
+    ) -> list[sqlalchemy.engine.Row]:
+        """
+        search_tasks - Searches the names and descriptions of tasks with their full-text indexes. Every word has to match (as a prefix, so partly typed words still match), and matches in a task's name rank higher than matches in its description.
+
+        Args:
+            words (list[str]): The words to search for, without any full-text operators
+            project_name (str, optional): Only search this project's tasks. Defaults to None.
+            status_id (int, optional): Only search tasks with this status. Defaults to None.
+            department_id (int, optional): Only search tasks in this department. Defaults to None.
+            limit (int): The number of tasks to get
+
+        Returns:
+            list[sqlalchemy.engine.Row]: The best matches first, with ``id``, ``name``, ``due_date``, ``status``, ``thread_id`` and ``project_name``
+        """
+        against = " ".join(f"+{word}*" for word in words)
+        name_relevance = match(Task.name, against=against).in_boolean_mode()
+        relevance = match(
+            Task.name, Task.description, against=against
+        ).in_boolean_mode()
+
+        query = (
+            session.query(
+                Task.id,
+                Task.name,
+                Task.due_date,
+                Task.status,
+                Task.discord_thread_channel_id.label("thread_id"),
+                Project.name.label("project_name"),
+            )
+            .join(Project, Project.id == Task.project_id)
+            .filter(relevance)
+        )
+        if project_name:
+            query = query.filter(Project.name == project_name)
+        if status_id:
+            query = query.filter(Task.status == status_id)
+        if department_id:
+            query = query.filter(Task.department == department_id)
+        return (
+            query.order_by((name_relevance * 2 + relevance).desc(), Task.id)
+            .limit(limit)
+            .all()
+        )
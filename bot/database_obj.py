@@ -1,6 +1,15 @@
 import sqlalchemy
-from sqlalchemy import CheckConstraint, Column, ForeignKey
-from sqlalchemy.dialects.mysql import *
+from sqlalchemy import CheckConstraint, Column, ForeignKey, Index
+from sqlalchemy.dialects.mysql import (
+    BIGINT,
+    DATE,
+    DATETIME,
+    INTEGER,
+    SMALLINT,
+    TINYINT,
+    VARCHAR,
+    insert,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import session
 from sqlalchemy.sql import func
@@ -8,6 +17,9 @@ from sqlalchemy.sql.elements import TextClause
 
 Base = declarative_base()
 
+# Tasks with this status count towards a project's completed tasks
+COMPLETE_STATUS_NAME = "Complete"
+
 
 class Employee(Base):
     __tablename__ = "Employee"
@@ -36,9 +48,24 @@ class Project(Base):
         DATETIME(), nullable=False, server_default=func.utc_timestamp()
     )
     # We need to store this (and not just fetch it from discord_main_thread_id.parent since we need to check the parent from any thread (like slash commands run from task threads))
-    discord_forum_channel_id = Column(BIGINT(unsigned=True))
+    discord_forum_channel_id = Column(BIGINT(unsigned=True), index=True)
     # We don't need to store the main message of the main thread since the first message of a thread and that thread have the same ID
-    discord_main_thread_id = Column(BIGINT(unsigned=True))
+    discord_main_thread_id = Column(BIGINT(unsigned=True), index=True)
+
+
+class ProjectStats(Base):
+    __tablename__ = "ProjectStats"
+
+    # Kept up to date whenever a task is created, deleted, or has its status changed, so the counts never have to be recalculated with COUNT(*)
+    project_id = Column(
+        SMALLINT(unsigned=True), ForeignKey("Project.id"), primary_key=True
+    )
+    total_tasks = Column(
+        INTEGER(unsigned=True), nullable=False, server_default=TextClause("0")
+    )
+    completed_tasks = Column(
+        INTEGER(unsigned=True), nullable=False, server_default=TextClause("0")
+    )
 
 
 class Department(Base):
@@ -69,6 +96,16 @@ class Status(Base):
 
 class Task(Base):
     __tablename__ = "Task"
+    __table_args__ = (
+        # For /search_tasks. Names get their own index so matches in them can be ranked higher.
+        Index("ix_Task_name_fulltext", "name", mysql_prefix="FULLTEXT"),
+        Index(
+            "ix_Task_name_description_fulltext",
+            "name",
+            "description",
+            mysql_prefix="FULLTEXT",
+        ),
+    )
 
     id = Column(INTEGER(unsigned=True), primary_key=True)
     project_id = Column(
@@ -76,14 +113,15 @@ class Task(Base):
     )
     name = Column(VARCHAR(150), nullable=False)
     description = Column(VARCHAR(2000))
-    parent_task_id = Column(BIGINT(unsigned=True))
-    due_date = Column(DATE())
+    parent_task_id = Column(BIGINT(unsigned=True), index=True)
+    # Indexed for the reminder scheduler, which loads upcoming due dates by range
+    due_date = Column(DATE(), index=True)
     department = Column(TINYINT(unsigned=True), ForeignKey("Department.id"))
     status = Column(TINYINT(unsigned=True), ForeignKey("Status.id"))
     date_created = Column(
         DATETIME(), nullable=False, server_default=func.utc_timestamp()
     )
-    discord_thread_channel_id = Column(BIGINT(unsigned=True))
+    discord_thread_channel_id = Column(BIGINT(unsigned=True), index=True)
     # We don't need to store the main message of the main thread since the first message of a thread and that thread have the same ID
 
 
@@ -91,8 +129,9 @@ class TaskAssignee(Base):
     __tablename__ = "TaskAssignee"
 
     task_id = Column(INTEGER(unsigned=True), ForeignKey("Task.id"), primary_key=True)
+    # Indexed separately, since the primary key only helps lookups by task
     employee_id = Column(
-        INTEGER(unsigned=True), ForeignKey("Employee.id"), primary_key=True
+        INTEGER(unsigned=True), ForeignKey("Employee.id"), primary_key=True, index=True
     )
 
 
@@ -108,6 +147,15 @@ class TaskDependency(Base):
     )
 
 
+class PendingTaskThread(Base):
+    __tablename__ = "PendingTaskThread"
+
+    # Tasks added by /import_tasks whose thread hasn't been created yet, so an interrupted import can be resumed
+    task_id = Column(INTEGER(unsigned=True), ForeignKey("Task.id"), primary_key=True)
+    # The row ID of the parent task, since its thread (which Task.parent_task_id holds) may not exist yet either
+    parent_task_id = Column(INTEGER(unsigned=True), ForeignKey("Task.id"))
+
+
 class Asset(Base):
     __tablename__ = "Asset"
 
@@ -119,9 +167,22 @@ class Asset(Base):
     )
 
 
+def create_missing_indexes(engine: sqlalchemy.engine.Engine):
+    # create_all only creates indexes alongside new tables, so indexes added to existing tables have to be created here
+    inspector = sqlalchemy.inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing_indexes = {
+            index["name"] for index in inspector.get_indexes(table.name)
+        }
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(engine)
+
+
 def create_db(engine: sqlalchemy.engine.Engine, session: session.Session):
     # This won't create tables that already exist
     Base.metadata.create_all(engine)
+    create_missing_indexes(engine)
 
     # But this will run, so we have to check to make sure the table is empty before populating it
     if not session.query(Department).first():
@@ -151,4 +212,47 @@ def create_db(engine: sqlalchemy.engine.Engine, session: session.Session):
             ],
         )
 
+    session.flush()
+    create_missing_project_stats(session)
+
     session.commit()
+
+
+def create_missing_project_stats(session: session.Session):
+    # Projects created before ProjectStats existed need their counts calculated once
+    missing_project_ids = [
+        project_id
+        for (project_id,) in session.query(Project.id)
+        .outerjoin(ProjectStats, ProjectStats.project_id == Project.id)
+        .filter(ProjectStats.project_id.is_(None))
+    ]
+    if not missing_project_ids:
+        return
+
+    complete_status_id = (
+        session.query(Status.id).filter_by(name=COMPLETE_STATUS_NAME).scalar()
+    )
+    total_tasks = dict(
+        session.query(Task.project_id, func.count())
+        .filter(Task.project_id.in_(missing_project_ids))
+        .group_by(Task.project_id)
+    )
+    # Without a "Complete" status nothing counts as completed, rather than every task without a status
+    completed_tasks = (
+        dict(
+            session.query(Task.project_id, func.count())
+            .filter(Task.project_id.in_(missing_project_ids))
+            .filter(Task.status == complete_status_id)
+            .group_by(Task.project_id)
+        )
+        if complete_status_id is not None
+        else {}
+    )
+    session.add_all(
+        ProjectStats(
+            project_id=project_id,
+            total_tasks=total_tasks.get(project_id, 0),
+            completed_tasks=completed_tasks.get(project_id, 0),
+        )
+        for project_id in missing_project_ids
+    )
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+import discord
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+log = logging.getLogger(__name__)
+
+# Either the new embed, or a coroutine function building it (called when the edit is sent, so it reflects the latest state)
+EmbedSource = discord.Embed | Callable[[], Awaitable[discord.Embed]]
+
+
+class EmbedEditScheduler:
+    def __init__(
+        self,
+        bot: "PrimaryBot",
+        *,
+        coalesce_delay: float = 2,
+        channel_interval: float = 1,
+        workers: int = 4,
+    ):
+        """
+        EmbedEditScheduler - Coalesces edits to the embed of a message, so a burst of changes results in a single edit with the latest embed. Edits are spaced out per channel and sent by a fixed number of workers, which keeps them clear of Discord's rate limits.
+
+        Args:
+            bot (PrimaryBot): The discord bot instance
+            coalesce_delay (float, optional): How long to wait for further changes before sending an edit, in seconds. Defaults to 2.
+            channel_interval (float, optional): The minimum time between edits in the same channel, in seconds. Defaults to 1.
+            workers (int, optional): The number of edits which can be sent at once. Defaults to 4.
+        """
+        self.bot = bot
+        self.coalesce_delay = coalesce_delay
+        self.channel_interval = channel_interval
+        self.worker_count = workers
+
+        # (channel_id, message_id): the latest embed for that message
+        self.pending: dict[tuple[int, int], EmbedSource] = {}
+        # channel_id: the earliest time the next edit in that channel can be sent
+        self._next_edit_times: dict[int, float] = {}
+        self._queue: asyncio.Queue[tuple[int, int]] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+
+        self.scheduled_count = 0
+        self.sent_count = 0
+
+    def schedule(self, channel_id: int, message_id: int, embed: EmbedSource):
+        """
+        schedule - Schedules an edit to the embed of a message. If an edit to the message is already pending, it's replaced instead.
+
+        Args:
+            channel_id (int): The ID of the channel (or thread) the message is in
+            message_id (int): The ID of the message
+            embed (EmbedSource): The new embed, or a coroutine function building it
+        """
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+            ]
+
+        key = (channel_id, message_id)
+        self.scheduled_count += 1
+        if key in self.pending:
+            self.pending[key] = embed
+            return
+        self.pending[key] = embed
+
+        # Space edits in the same channel out, reserving a slot for this one
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        send_time = max(
+            now + self.coalesce_delay, self._next_edit_times.get(channel_id, 0)
+        )
+        next_edit_time = send_time + self.channel_interval
+        self._next_edit_times[channel_id] = next_edit_time
+        loop.call_later(send_time - now, self._queue.put_nowait, key)
+        # Channels are forgotten once their slot has passed, so channels which aren't edited again don't build up
+        loop.call_later(
+            next_edit_time - now, self._forget_channel, channel_id, next_edit_time
+        )
+
+    def _forget_channel(self, channel_id: int, next_edit_time: float):
+        # Unless a later edit has reserved a slot since
+        if self._next_edit_times.get(channel_id) == next_edit_time:
+            del self._next_edit_times[channel_id]
+
+    async def _worker(self):
+        while True:
+            channel_id, message_id = await self._queue.get()
+            try:
+                await self._send((channel_id, message_id))
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, key: tuple[int, int]):
+        channel_id, message_id = key
+        # Already sent if the edit was queued more than once (like when it's flushed on close)
+        if (embed := self.pending.pop(key, None)) is None:
+            return
+
+        try:
+            if not isinstance(embed, discord.Embed):
+                embed = await embed()
+            channel = await self.bot.get_or_fetch_channel(channel_id)
+            await channel.get_partial_message(message_id).edit(embed=embed)
+            self.sent_count += 1
+        except Exception:
+            log.exception(
+                "Failed to edit the embed of message %d in channel %d",
+                message_id,
+                channel_id,
+            )
+
+    async def close(self, timeout: float = 10):
+        """
+        close - Sends every pending edit straight away, without waiting out their delays, and then stops the workers.
+
+        Args:
+            timeout (float, optional): How long to wait for the pending edits to be sent, in seconds. Edits which haven't been sent by then are dropped. Defaults to 10.
+        """
+        if self._workers:
+            for key in list(self.pending):
+                self._queue.put_nowait(key)
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                log.warning(
+                    "Dropped %d embed edits which weren't sent within %ss of closing",
+                    len(self.pending),
+                    timeout,
+                )
+
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
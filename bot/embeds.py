@@ -0,0 +1,178 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+import discord
+import sqlalchemy
+from database_obj import *
+from reference_data import ReferenceData
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+log = logging.getLogger(__name__)
+
+EMBED_COLOR = discord.Color(4705791)
+
+
+def build_project_embed(project: Project, stats: ProjectStats = None) -> discord.Embed:
+    """
+    build_project_embed - Builds the embed pinned in a project's "General Discussion" thread.
+
+    Args:
+        project (Project): The project to build the embed for. This doesn't need to have been added to the database yet.
+        stats (ProjectStats, optional): The project's task counts. Defaults to None (no tasks).
+
+    Returns:
+        discord.Embed: The embed
+    """
+    project_embed = discord.Embed(
+        color=EMBED_COLOR,
+        title=project.name,
+        description=project.description,
+    )
+    # Don't add embed parameters if they weren't defined (since they're not required)
+    if project.docs_link:
+        project_embed.add_field(
+            name="Documentation", value=project.docs_link, inline=False
+        )
+    if project.repo_link:
+        project_embed.add_field(name="Repository", value=project.repo_link, inline=False)
+    if project.storage_link:
+        project_embed.add_field(name="Storage", value=project.storage_link, inline=False)
+
+    total_tasks = stats.total_tasks if stats else 0
+    completed_tasks = stats.completed_tasks if stats else 0
+    project_embed.add_field(name="Total Tasks", value=str(total_tasks), inline=True)
+    project_embed.add_field(
+        name="Completed Tasks", value=str(completed_tasks), inline=True
+    )
+    project_embed.add_field(
+        name="Incomplete Tasks", value=str(total_tasks - completed_tasks), inline=True
+    )
+    return project_embed
+
+
+def build_task_embed(
+    task: Task,
+    department_name: str = None,
+    status_name: str = None,
+    assignee_ids: list[int] = None,
+) -> discord.Embed:
+    """
+    build_task_embed - Builds the embed pinned in a task's thread.
+
+    Args:
+        task (Task): The task to build the embed for. This doesn't need to have been added to the database yet.
+        department_name (str, optional): The name of the task's department. Defaults to None.
+        status_name (str, optional): The name of the task's status. Defaults to None (Unassigned).
+        assignee_ids (list[int], optional): The discord IDs of the task's assignees. Defaults to None (no assignees).
+
+    Returns:
+        discord.Embed: The embed
+    """
+    task_embed = discord.Embed(
+        color=EMBED_COLOR,
+        title=task.name,
+        description=task.description,
+    )
+    # parent_task_id is the thread ID of the parent task, so it can be mentioned directly
+    task_embed.add_field(
+        name="Parent Task",
+        value=f"<#{task.parent_task_id}>" if task.parent_task_id else "None Set",
+        inline=True,
+    )
+    task_embed.add_field(
+        name="Assignee",
+        value=", ".join(f"<@{discord_id}>" for discord_id in assignee_ids)
+        if assignee_ids
+        else "None Set",
+        inline=True,
+    )
+    task_embed.add_field(
+        name="Due Date",
+        value=task.due_date.isoformat() if task.due_date else "None Set",
+        inline=True,
+    )
+    task_embed.add_field(
+        name="Department", value=department_name or "None Set", inline=True
+    )
+    task_embed.add_field(name="Status", value=status_name or "Unassigned", inline=True)
+    return task_embed
+
+
+def format_task_line(
+    task: sqlalchemy.engine.Row, reference_data: ReferenceData
+) -> str:
+    """
+    format_task_line - Formats a task as a line of a task list, like the ones shown by /my_tasks and /search_tasks.
+
+    Args:
+        task (sqlalchemy.engine.Row): The task, with ``name``, ``status``, ``thread_id``, ``project_name`` and ``due_date``
+        reference_data (ReferenceData): The statuses to show the task's status from
+
+    Returns:
+        str: The line
+    """
+    status = reference_data.statuses_by_id.get(task.status)
+    emoji = status.emoji if status and status.emoji else ":grey_question:"
+    # Imported tasks don't have a thread until the import finishes
+    name = f"<#{task.thread_id}>" if task.thread_id else f"**{task.name}**"
+    line = f"{emoji} {name} ({task.project_name})"
+    if task.due_date:
+        line += f", due {task.due_date:%Y-%m-%d}"
+    return line
+
+
+def refresh_project_embed(bot: "PrimaryBot", project_id: int):
+    """
+    refresh_project_embed - Schedules the embed pinned in a project's "General Discussion" thread to be rebuilt from the database, so its task counts are current. Refreshes in quick succession are coalesced into a single edit.
+
+    Args:
+        bot (PrimaryBot): The discord bot instance
+        project_id (int): The ID of the project
+    """
+
+    async def build_embed() -> discord.Embed:
+        project, stats = await bot.db.get_project_with_stats(project_id)
+        return build_project_embed(project, stats)
+
+    if not (main_thread_id := bot.db.snowflakes.main_threads_by_project.get(project_id)):
+        # Only possible for projects added outside of the bot since startup
+        log.warning("Project %d has no known main thread, not refreshing", project_id)
+        return
+
+    # The first message of a thread has the same ID as the thread
+    bot.embed_edits.schedule(main_thread_id, main_thread_id, build_embed)
+
+
+def refresh_task_embed(bot: "PrimaryBot", task_id: int):
+    """
+    refresh_task_embed - Schedules the embed pinned in a task's thread to be rebuilt from the database, including its assignees. Refreshes in quick succession are coalesced into a single edit.
+
+    Args:
+        bot (PrimaryBot): The discord bot instance
+        task_id (int): The ID of the task
+    """
+
+    async def build_embed() -> discord.Embed:
+        task, assignees = await asyncio.gather(
+            bot.db.get_task(task_id=task_id), bot.db.get_task_assignees([task_id])
+        )
+        if not task:
+            raise LookupError(f"Task {task_id} was deleted before its embed was edited")
+        status = bot.db.reference_data.statuses_by_id.get(task.status)
+        department = bot.db.reference_data.departments_by_id.get(task.department)
+        return build_task_embed(
+            task,
+            department_name=department.name if department else None,
+            status_name=status.name if status else None,
+            assignee_ids=assignees.get(task_id),
+        )
+
+    if not (thread_id := bot.db.snowflakes.thread_channels_by_task.get(task_id)):
+        # Imported tasks don't have a thread until the import finishes, and their embed is built then
+        return
+
+    # The first message of a thread has the same ID as the thread
+    bot.embed_edits.schedule(thread_id, thread_id, build_embed)
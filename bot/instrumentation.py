@@ -0,0 +1,344 @@
+import bisect
+import functools
+import logging
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable
+
+import discord
+from discord import Interaction, app_commands
+from discord.webhook.async_ import async_context
+
+if TYPE_CHECKING:
+    from caches import AccessLevelCache
+    from discord.http import HTTPClient, Route
+
+log = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 2.5, 3, 5, 10)
+# Interactions have to be responded to (or deferred) within 3 seconds, so responses slower than this are flagged
+DEADLINE_WARNING = 2.5
+
+INTERACTION_CALLBACK_PATH = "/interactions/{webhook_id}/{webhook_token}/callback"
+
+
+class Histogram:
+    """
+    Histogram - Counts observations into fixed latency buckets, so quantiles can be estimated without keeping every observation.
+    """
+
+    def __init__(self):
+        # The last bucket counts everything above the largest bound
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        quantile - Estimates a quantile, assuming observations are spread evenly within each bucket.
+
+        Args:
+            q (float): The quantile, between 0 and 1
+
+        Returns:
+            float: The estimated value, or infinity if it falls in the last bucket
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if i == len(LATENCY_BUCKETS):
+                    return math.inf
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                return lower + (LATENCY_BUCKETS[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return math.inf
+
+    def prometheus_lines(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        bucket_labels = f"{labels}," if labels else ""
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.bucket_counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{bucket_labels}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{bucket_labels}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+@dataclass
+class CommandTiming:
+    """
+    CommandTiming - The time spent so far by a single command invocation. Database and REST calls made while handling the command add to it.
+    """
+
+    name: str
+    start_time: float = field(default_factory=time.perf_counter)
+    db_time: float = 0.0
+    rest_time: float = 0.0
+    # Seconds from the start of the command until the interaction was responded to (or deferred)
+    response_time: float | None = None
+
+
+@dataclass
+class CommandMetrics:
+    total: Histogram = field(default_factory=Histogram)
+    db: Histogram = field(default_factory=Histogram)
+    rest: Histogram = field(default_factory=Histogram)
+    local: Histogram = field(default_factory=Histogram)
+    response: Histogram = field(default_factory=Histogram)
+    errors: int = 0
+    # Responses slower than DEADLINE_WARNING
+    near_deadline: int = 0
+
+
+# The command being handled by the current task, if any
+current_command_timing: ContextVar[CommandTiming | None] = ContextVar(
+    "current_command_timing", default=None
+)
+
+
+class Metrics:
+    def __init__(self):
+        """
+        Metrics - Latency histograms for app commands and the modals they open (split into database, Discord REST and local time), database calls, REST routes and event loop lag.
+        """
+        self.commands: dict[str, CommandMetrics] = {}
+        self.db_calls: dict[str, Histogram] = {}
+        self.rest_calls: dict[str, Histogram] = {}
+        # How late the loop watchdog's heartbeat was
+        self.loop_lag = Histogram()
+
+    def observe_db(self, name: str, duration: float):
+        self.db_calls.setdefault(name, Histogram()).observe(duration)
+        if timing := current_command_timing.get():
+            timing.db_time += duration
+
+    def observe_rest(self, route: str, duration: float):
+        self.rest_calls.setdefault(route, Histogram()).observe(duration)
+        if timing := current_command_timing.get():
+            timing.rest_time += duration
+
+    def observe_loop_lag(self, lag: float):
+        self.loop_lag.observe(lag)
+
+    def finish_command(self, timing: CommandTiming, failed: bool = False):
+        total = time.perf_counter() - timing.start_time
+        command_metrics = self.commands.setdefault(timing.name, CommandMetrics())
+        command_metrics.total.observe(total)
+        command_metrics.db.observe(timing.db_time)
+        command_metrics.rest.observe(timing.rest_time)
+        # Database and REST calls can overlap when they're gathered, so this is only an estimate
+        command_metrics.local.observe(max(total - timing.db_time - timing.rest_time, 0))
+        command_metrics.errors += failed
+
+        if timing.response_time is not None:
+            command_metrics.response.observe(timing.response_time)
+            if timing.response_time >= DEADLINE_WARNING:
+                command_metrics.near_deadline += 1
+                log.warning(
+                    "/%s took %.3fs to respond (db: %.3fs, rest: %.3fs)",
+                    timing.name,
+                    timing.response_time,
+                    timing.db_time,
+                    timing.rest_time,
+                )
+
+    def render_prometheus(self, access_levels: "AccessLevelCache" = None) -> str:
+        """
+        render_prometheus - Renders every metric in the Prometheus text exposition format.
+
+        Args:
+            access_levels (AccessLevelCache, optional): The access level cache to include the hits and misses of. Defaults to None.
+
+        Returns:
+            str: The metrics
+        """
+        lines = [
+            "# HELP taskbot_command_seconds Time spent handling app commands, by part",
+            "# TYPE taskbot_command_seconds histogram",
+        ]
+        for name, command_metrics in sorted(self.commands.items()):
+            for part in ("total", "db", "rest", "local"):
+                lines += getattr(command_metrics, part).prometheus_lines(
+                    "taskbot_command_seconds", f'command="{name}",part="{part}"'
+                )
+
+        lines += [
+            "# HELP taskbot_command_response_seconds Time until app commands were responded to",
+            "# TYPE taskbot_command_response_seconds histogram",
+        ]
+        for name, command_metrics in sorted(self.commands.items()):
+            lines += command_metrics.response.prometheus_lines(
+                "taskbot_command_response_seconds", f'command="{name}"'
+            )
+
+        for metric, attribute, description in (
+            ("taskbot_command_errors_total", "errors", "App commands which raised"),
+            (
+                "taskbot_command_near_deadline_total",
+                "near_deadline",
+                f"App commands which took over {DEADLINE_WARNING}s to respond",
+            ),
+        ):
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+            lines += [
+                f'{metric}{{command="{name}"}} {getattr(command_metrics, attribute)}'
+                for name, command_metrics in sorted(self.commands.items())
+            ]
+
+        for metric, calls, label, description in (
+            ("taskbot_db_call_seconds", self.db_calls, "call", "Database calls"),
+            ("taskbot_rest_call_seconds", self.rest_calls, "route", "Discord REST calls"),
+        ):
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} histogram"]
+            for name, histogram in sorted(calls.items()):
+                lines += histogram.prometheus_lines(metric, f'{label}="{name}"')
+
+        lines += [
+            "# HELP taskbot_loop_lag_seconds How late the event loop ran a periodic heartbeat",
+            "# TYPE taskbot_loop_lag_seconds histogram",
+        ]
+        lines += self.loop_lag.prometheus_lines("taskbot_loop_lag_seconds", "")
+
+        # An empty cache is falsy, but its counters still matter
+        if access_levels is not None:
+            lines += [
+                "# HELP taskbot_access_level_cache_lookups_total Permission checks answered from the access level cache (hit) or the database (miss)",
+                "# TYPE taskbot_access_level_cache_lookups_total counter",
+                f'taskbot_access_level_cache_lookups_total{{result="hit"}} {access_levels.hits}',
+                f'taskbot_access_level_cache_lookups_total{{result="miss"}} {access_levels.misses}',
+                "# HELP taskbot_access_level_cache_entries Employees in the access level cache",
+                "# TYPE taskbot_access_level_cache_entries gauge",
+                f"taskbot_access_level_cache_entries {len(access_levels)}",
+            ]
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """
+    InstrumentedCommandTree - Times every app command. The timing starts when the command passes the tree's checks, and is recorded by ``on_app_command_completion`` or ``on_error``.
+    """
+
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        # Autocomplete goes through here too, but never completes
+        if (
+            interaction.type is discord.InteractionType.autocomplete
+            or not interaction.command
+        ):
+            return True
+
+        timing = CommandTiming(interaction.command.qualified_name)
+        # Kept on the interaction too, since completion is handled in a different task
+        interaction.extras["timing"] = timing
+        current_command_timing.set(timing)
+        return True
+
+    async def on_error(
+        self, interaction: Interaction, error: app_commands.AppCommandError
+    ):
+        if timing := interaction.extras.pop("timing", None):
+            metrics.finish_command(timing, failed=True)
+        await super().on_error(interaction, error)
+
+
+def timed_submit(name: str) -> Callable[[Callable], Callable]:
+    """
+    timed_submit - Times a modal's ``on_submit`` like an app command. Commands like ``/create_project`` only open a modal, and their work is done once it's submitted, after the command has already been recorded.
+
+    Args:
+        name (str): The name the submissions are recorded under, like ``create_project submit``
+
+    Returns:
+        Callable[[Callable], Callable]: The decorator
+    """
+
+    def decorator(on_submit: Callable) -> Callable:
+        @functools.wraps(on_submit)
+        async def timed_on_submit(self: discord.ui.Modal, interaction: Interaction):
+            timing = CommandTiming(name)
+            token = current_command_timing.set(timing)
+            failed = True
+            try:
+                await on_submit(self, interaction)
+                failed = False
+            finally:
+                current_command_timing.reset(token)
+                metrics.finish_command(timing, failed=failed)
+
+        return timed_on_submit
+
+    return decorator
+
+
+def finish_command(interaction: Interaction):
+    # Called by PrimaryBot.on_app_command_completion
+    if timing := interaction.extras.pop("timing", None):
+        metrics.finish_command(timing)
+
+
+def callable_name(func: Callable) -> str:
+    # DatabaseConnection methods reach run as partials
+    while isinstance(func, functools.partial):
+        func = func.func
+    return getattr(func, "__qualname__", repr(func))
+
+
+def instrument_rest(http: "HTTPClient"):
+    """
+    instrument_rest - Wraps the bot's REST client, and the webhook adapter interaction responses are sent through, so every request (including time spent waiting on rate limits) is timed by route.
+
+    Args:
+        http (HTTPClient): The bot's HTTP client
+    """
+    wrap_request(http)
+    # The adapter is shared by every interaction unless one is set for the current context
+    wrap_request(async_context.get())
+
+
+def wrap_request(client: Any):
+    # The webhook adapter outlives any one bot, so it's only wrapped the first time, or requests would be timed once per bot
+    if getattr(client, "_taskbot_timed", False):
+        return
+    client._taskbot_timed = True
+    request = client.request
+
+    @functools.wraps(request)
+    async def timed_request(route: "Route", *args, **kwargs) -> Any:
+        start_time = time.perf_counter()
+        try:
+            return await request(route, *args, **kwargs)
+        finally:
+            finish_time = time.perf_counter()
+            metrics.observe_rest(
+                f"{route.method} {route.path}", finish_time - start_time
+            )
+            timing = current_command_timing.get()
+            if (
+                timing
+                and timing.response_time is None
+                and route.path == INTERACTION_CALLBACK_PATH
+            ):
+                timing.response_time = finish_time - timing.start_time
+
+    client.request = timed_request
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import FrameType
+from typing import TYPE_CHECKING
+
+from const import LOOP_STALL_HISTORY, LOOP_STALL_THRESHOLD
+from discord.ext import commands
+from instrumentation import metrics
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+log = logging.getLogger(__name__)
+
+BOT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+COGS_DIRECTORY = os.path.join(BOT_DIRECTORY, "cogs")
+DATABASE_CONNECTION_FILE = os.path.join(BOT_DIRECTORY, "database_connection.py")
+
+
+@dataclass
+class LoopStall:
+    """
+    LoopStall - A time the event loop was blocked for longer than the watchdog's threshold, and what it was doing at the time.
+    """
+
+    started_at: datetime
+    # Seconds the loop was blocked for. Only known once the loop is running again.
+    duration: float | None
+    # The command and cog whose code was running on the loop, if any
+    command: str | None
+    cog: str | None
+    # The DatabaseConnection method running on the loop, if any, and the database calls running on the executor
+    db_call: str | None
+    db_calls_in_progress: list[str] = field(default_factory=list)
+    # The loop thread's stack when the stall was caught, innermost frame last
+    stack: list[str] = field(default_factory=list)
+
+    @property
+    def culprit(self) -> str:
+        if self.command:
+            return f"/{self.command} ({self.cog})"
+        return self.cog or "unknown"
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        bot: "PrimaryBot",
+        *,
+        threshold: float = LOOP_STALL_THRESHOLD,
+        interval: float = 0.05,
+        history: int = LOOP_STALL_HISTORY,
+    ):
+        """
+        LoopWatchdog - Detects when the event loop is blocked, and works out what's blocking it. A heartbeat on the loop records when it last ran, and a thread checks on it. If the heartbeat is late by more than ``threshold``, the thread captures the loop thread's stack, since by the time the loop runs again the code blocking it is gone.
+
+        Args:
+            bot (PrimaryBot): The discord bot instance
+            threshold (float, optional): How late the heartbeat has to be to count as a stall, in seconds. Defaults to LOOP_STALL_THRESHOLD.
+            interval (float, optional): How often the heartbeat runs, in seconds. Defaults to 0.05.
+            history (int, optional): The number of recent stalls kept. Defaults to LOOP_STALL_HISTORY.
+        """
+        self.bot = bot
+        self.threshold = threshold
+        self.interval = interval
+        # Most recent last
+        self.stalls: deque[LoopStall] = deque(maxlen=history)
+
+        self.last_heartbeat = time.monotonic()
+        # Caught by the thread, and finished (and added to stalls) by the heartbeat once the loop is running again
+        self.pending_stall: LoopStall | None = None
+        self.loop_thread_id: int | None = None
+        self.heartbeat_task: asyncio.Task | None = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        self.loop_thread_id = threading.get_ident()
+        self.last_heartbeat = time.monotonic()
+        self.stopped.clear()
+        self.heartbeat_task = asyncio.create_task(self.heartbeat())
+        threading.Thread(target=self.monitor, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+
+    async def heartbeat(self):
+        while True:
+            expected_time = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_heartbeat = now = time.monotonic()
+            lag = max(now - expected_time, 0)
+            metrics.observe_loop_lag(lag)
+
+            if stall := self.pending_stall:
+                self.pending_stall = None
+                stall.duration = lag
+                self.stalls.append(stall)
+                log.warning(
+                    "Event loop was blocked for %.3fs by %s (database call: %s, in progress on the executor: %s)\n%s",
+                    lag,
+                    stall.culprit,
+                    stall.db_call or "none",
+                    ", ".join(stall.db_calls_in_progress) or "none",
+                    "".join(stall.stack[-8:]),
+                )
+
+    def monitor(self):
+        # Runs on its own thread, so it keeps running while the loop is blocked
+        while not self.stopped.wait(self.interval / 2):
+            blocked_for = time.monotonic() - self.last_heartbeat - self.interval
+            if blocked_for > self.threshold and not self.pending_stall:
+                frame = sys._current_frames().get(self.loop_thread_id)
+                if frame:
+                    self.pending_stall = self.capture(frame, blocked_for)
+
+    def capture(self, frame: FrameType, blocked_for: float) -> LoopStall:
+        """
+        capture - Describes a stall from the loop thread's current frame. The innermost cog frame gives the cog (and the command, if it has the interaction), and the innermost ``DatabaseConnection`` frame gives the database call.
+
+        Args:
+            frame (FrameType): The loop thread's current frame
+            blocked_for (float): How long the loop had been blocked for, in seconds
+
+        Returns:
+            LoopStall: The stall, without its duration
+        """
+        stack = traceback.extract_stack(frame)
+        command = cog = cog_module = db_call = None
+
+        # Innermost first
+        while frame:
+            filename = os.path.abspath(frame.f_code.co_filename)
+            if not cog and filename.startswith(COGS_DIRECTORY):
+                # Locals are only read, never changed, from this thread
+                owner = frame.f_locals.get("self")
+                if isinstance(owner, commands.Cog):
+                    cog = type(owner).__name__
+                    interaction = frame.f_locals.get("interaction")
+                    if app_command := getattr(interaction, "command", None):
+                        command = app_command.qualified_name
+                # Helpers outside of a cog class are only used if no cog method is found further out
+                cog_module = cog_module or os.path.basename(filename)
+            elif not db_call and filename == DATABASE_CONNECTION_FILE:
+                db_call = frame.f_code.co_name
+            frame = frame.f_back
+
+        try:
+            db_calls_in_progress = sorted(self.bot.db.calls_in_progress)
+        except RuntimeError:
+            # Changed while being read, which means the loop isn't blocked anymore
+            db_calls_in_progress = []
+
+        return LoopStall(
+            started_at=datetime.fromtimestamp(
+                time.time() - blocked_for, tz=timezone.utc
+            ),
+            duration=None,
+            command=command,
+            cog=cog or cog_module,
+            db_call=db_call,
+            db_calls_in_progress=db_calls_in_progress,
+            stack=traceback.format_list(stack),
+        )
@@ -1,31 +1,95 @@
+import time
+
+# Taken before anything else is imported, so the startup timings include imports
+STARTUP_TIME = time.perf_counter()
+
+import asyncio
+import importlib
+import logging
 import os
+from typing import TYPE_CHECKING, Awaitable, Iterable, TypeVar
 
 import discord
-from cogs.create_project import CreateProjectCog
-from cogs.create_task import CreateTaskCog
-from cogs.edit_project import EditProjectCog
-from cogs.exec_query import ExecQueryCog
-from cogs.purge_employees import PurgeEmployeesCog
-from cogs.register_employee import RegisterEmployeeCog
-from cogs.sync import SyncCog
-from cogs.update_employee import UpdateEmployeeCog
-from cogs.update_usernames import UpdateUsernamesCog
+from const import GUILD_ID
 from database_connection import DatabaseConnection
-from discord import Intents
+from discord import Intents, app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
+from embed_scheduler import EmbedEditScheduler
+from instrumentation import InstrumentedCommandTree, finish_command, instrument_rest
+from loop_watchdog import LoopWatchdog
+from reminder_scheduler import ReminderScheduler
+
+if TYPE_CHECKING:
+    import sqlalchemy
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (module, cog class, access level). Cog modules are imported while the database is being warmed, rather than before the bot starts. Cogs without an access level restrict themselves.
+COGS: list[tuple[str, str, int | None]] = [
+    # DB Admins
+    ("cogs.exec_query", "ExecQueryCog", 5),
+    ("cogs.update_usernames", "UpdateUsernamesCog", 5),
+    ("cogs.purge_employees", "PurgeEmployeesCog", 5),
+    ("cogs.bot_stats", "BotStatsCog", 5),
+    ("cogs.sync", "SyncCog", None),  # Already restricted to is_owner() of bot
+    ("cogs.roster_sync", "RosterSyncCog", None),  # No commands, only listens to member events
+    # Directors
+    ("cogs.register_employee", "RegisterEmployeeCog", 4),
+    # Managers
+    ("cogs.create_project", "CreateProjectCog", 3),
+    ("cogs.update_employee", "UpdateEmployeeCog", 3),
+    ("cogs.edit_project", "EditProjectCog", 3),
+    ("cogs.delete_task", "DeleteTaskCog", 3),
+    ("cogs.import_tasks", "ImportTasksCog", 3),
+    # Tier 2 Employee
+    ("cogs.create_task", "CreateTaskCog", 2),
+    ("cogs.set_task_status", "SetTaskStatusCog", 2),
+    ("cogs.task_dependencies", "TaskDependenciesCog", 2),
+    ("cogs.add_asset", "AddAssetCog", 2),
+    # Tier 1 Employee
+    ("cogs.task_tree", "TaskTreeCog", 1),
+    ("cogs.my_tasks", "MyTasksCog", 1),
+    ("cogs.search_tasks", "SearchTasksCog", 1),
+]
 
 load_dotenv()
 
 
 class PrimaryBot(commands.Bot):
-    def __init__(self):
-        super().__init__(command_prefix="/", intents=Intents.default())
+    def __init__(self, engine: "str | sqlalchemy.engine.Engine | None" = None):
+        """
+        PrimaryBot - The bot, with its database connection and cogs.
 
-        self.db = DatabaseConnection(self, os.environ["DB_LOGIN"])
-        self.query = self.db.session.query
-        self.add_obj = self.db.session.add
-        self.commit = self.db.session.commit
+        Args:
+            engine (str | sqlalchemy.engine.Engine | None, optional): The database to connect to, passed on to ``DatabaseConnection``. Defaults to the ``DB_LOGIN`` environment variable.
+        """
+        # The members intent is needed to keep the employee roster in sync (see RosterSyncCog)
+        intents = Intents.default()
+        intents.members = True
+        super().__init__(
+            command_prefix="/", intents=intents, tree_cls=InstrumentedCommandTree
+        )
+        # Every REST request is timed, and counted towards the command that made it
+        instrument_rest(self.http)
+
+        self.db = DatabaseConnection(
+            self,
+            engine or os.environ["DB_LOGIN"],
+            pool_size=int(os.getenv("DB_POOL_SIZE", 5)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        )
+        # Pinned embeds should be edited through this rather than directly, so bursts of changes don't hit rate limits
+        self.embed_edits = EmbedEditScheduler(self)
+        # Catches whatever blocks the event loop, which would otherwise only show up as discord.py's "heartbeat blocked" warning
+        self.watchdog = LoopWatchdog(self)
+        # Cogs which change a task's due date or assignees must reschedule its reminders through this
+        self.reminders = ReminderScheduler(self)
+
+        # phase: how long it took, in seconds. Logged once the bot is ready.
+        self.startup_timings: dict[str, float] = {}
 
     async def get_or_fetch_channel(self, id: int) -> discord.abc.GuildChannel | discord.Thread | None:
         """
@@ -45,25 +109,95 @@ class PrimaryBot(commands.Bot):
         except discord.NotFound:
             return None
 
+    async def fetch_members(self, ids: Iterable[int]) -> dict[int, discord.Member]:
+        """
+        fetch_members - Resolves many members at once. Uses the member cache if the guild has been chunked, and otherwise asks the gateway for them in batches of 100 (the most Discord allows per request).
+
+        Args:
+            ids (Iterable[int]): The IDs of the members to fetch
+
+        Returns:
+            dict[int, discord.Member]: The members that were found, keyed by ID. Members who aren't in the guild are left out.
+        """
+        guild = self.get_guild(GUILD_ID)
+        ids = set(ids)
+
+        if guild.chunked:
+            return {member.id: member for member in guild.members if member.id in ids}
+
+        members: dict[int, discord.Member] = {}
+        batched_ids = list(ids)
+        for i in range(0, len(batched_ids), 100):
+            for member in await guild.query_members(
+                user_ids=batched_ids[i : i + 100], limit=100
+            ):
+                members[member.id] = member
+        return members
+
+    async def close(self):
+        self.watchdog.stop()
+        self.reminders.stop()
+        await self.embed_edits.close()
+        await super().close()
+
     async def setup_hook(self):
-        # DB Admins
-        await self.add_cog(ExecQueryCog(self, 5))
-        await self.add_cog(UpdateUsernamesCog(self, 5))
-        await self.add_cog(PurgeEmployeesCog(self, 5))
-        await self.add_cog(SyncCog(self))  # Already restricted to is_owner() of bot
+        self.startup_timings["imports"] = time.perf_counter() - STARTUP_TIME
+        self.watchdog.start()
+        setup_start_time = time.perf_counter()
+
+        # None of these depend on each other, so the database round trips overlap with importing the cogs
+        await asyncio.gather(
+            self.timed("warm_pool", self.db.warm_pool()),
+            self.timed("warm_caches", self.db.warm_caches()),
+            self.timed("load_cogs", self.load_cogs()),
+            self.timed("reminders", self.reminders.start()),
+        )
+        self.startup_timings["setup"] = time.perf_counter() - setup_start_time
+
+    async def timed(
+        self, phase: str, awaitable: Awaitable[T], timings: dict[str, float] = None
+    ) -> T:
+        # Records how long a phase took (of startup, unless other timings are given), so slow phases show up in the logs
+        if timings is None:
+            timings = self.startup_timings
+        start_time = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[phase] = time.perf_counter() - start_time
 
-        # Directors
-        await self.add_cog(RegisterEmployeeCog(self, 4))
+    async def load_cogs(self):
+        """
+        load_cogs - Imports and adds every cog in ``COGS``, in the order they're listed.
+        """
+        # Imports hold the GIL and the import lock, so importing on worker threads wouldn't overlap them with each other
+        for module_name, cog_name, access_level in COGS:
+            cog_class = getattr(importlib.import_module(module_name), cog_name)
+            await self.add_cog(
+                cog_class(self) if access_level is None else cog_class(self, access_level)
+            )
 
-        # Managers
-        await self.add_cog(CreateProjectCog(self, 3))
-        await self.add_cog(UpdateEmployeeCog(self, 3))
-        await self.add_cog(EditProjectCog(self, 3))
+    async def on_app_command_completion(
+        self, interaction: discord.Interaction, command: app_commands.Command
+    ):
+        finish_command(interaction)
 
-        # Tier 2 Employee
-        await self.add_cog(CreateTaskCog(self, 2))
+    async def on_ready(self):
+        # on_ready fires again after reconnecting, but startup only happens once
+        if "ready" in self.startup_timings:
+            return
 
-        # Tier 1 Employee
+        self.startup_timings["ready"] = time.perf_counter() - STARTUP_TIME
+        log.info(
+            "Ready %.3fs after starting (%s)",
+            self.startup_timings["ready"],
+            ", ".join(
+                f"{phase}: {duration:.3f}s"
+                for phase, duration in self.startup_timings.items()
+                if phase != "ready"
+            ),
+        )
 
 
-PrimaryBot().run(os.environ["DISCORD_TOKEN"])
+if __name__ == "__main__":
+    PrimaryBot().run(os.environ["DISCORD_TOKEN"])
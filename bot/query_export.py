@@ -0,0 +1,270 @@
+import csv
+import json
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from io import BytesIO, StringIO
+from typing import Any, Callable, Sequence
+
+import sqlalchemy
+import sqlalchemy.orm
+
+
+class TableWriter:
+    """
+    TableWriter - Renders rows as ``psql`` style tables using the ``tabulate`` library. Each chunk of rows is rendered as its own table, since column widths can't be known up front without holding every row in memory.
+    """
+
+    extension = "txt"
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        # Imported here since it's slow to import and only needed by /exec_query
+        from tabulate import tabulate
+
+        return (tabulate(rows, headers=self.columns, tablefmt="psql") + "\n").encode()
+
+    def finish(self) -> bytes:
+        return b""
+
+    def snapshot(self) -> Any:
+        return None
+
+    def restore(self, state: Any):
+        pass
+
+
+class CsvWriter:
+    """
+    CsvWriter - Renders rows as CSV, with a header row at the top.
+    """
+
+    extension = "csv"
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self._header_written = False
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        if not self._header_written:
+            writer.writerow(self.columns)
+            self._header_written = True
+        writer.writerows(rows)
+        return buffer.getvalue().encode()
+
+    def finish(self) -> bytes:
+        return b""
+
+    def snapshot(self) -> Any:
+        return self._header_written
+
+    def restore(self, state: Any):
+        self._header_written = state
+
+
+class JsonLinesWriter:
+    """
+    JsonLinesWriter - Renders each row as a JSON object on its own line. Values JSON can't represent (like dates) are written as strings.
+    """
+
+    extension = "jsonl"
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self._encoder = json.JSONEncoder(default=str, ensure_ascii=False)
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return "".join(
+            self._encoder.encode(dict(zip(self.columns, row))) + "\n" for row in rows
+        ).encode()
+
+    def finish(self) -> bytes:
+        return b""
+
+    def snapshot(self) -> Any:
+        return None
+
+    def restore(self, state: Any):
+        pass
+
+
+class GzipWriter:
+    """
+    GzipWriter - Compresses the output of another writer as it's written. Each chunk is flushed so the compressor never holds on to much data, which keeps the final block small enough to always fit.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.extension = f"{writer.extension}.gz"
+        # wbits=31 writes a gzip header and trailer rather than a bare zlib stream
+        self._compressor = zlib.compressobj(wbits=31)
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        data = self._compressor.compress(self.writer.write_rows(rows))
+        return data + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        data = self._compressor.compress(self.writer.finish())
+        return data + self._compressor.flush()
+
+    def snapshot(self) -> Any:
+        # The compressor's state includes the CRC and length written in the trailer, so data which isn't kept has to be undone in it too
+        return self._compressor.copy(), self.writer.snapshot()
+
+    def restore(self, state: Any):
+        compressor, writer_state = state
+        # Copied again, so the snapshot can be restored more than once
+        self._compressor = compressor.copy()
+        self.writer.restore(writer_state)
+
+
+EXPORT_FORMATS: dict[str, Callable[[Sequence[str]], Any]] = {
+    "table": TableWriter,
+    "csv": CsvWriter,
+    "jsonl": JsonLinesWriter,
+    "csv.gz": lambda columns: GzipWriter(CsvWriter(columns)),
+    "jsonl.gz": lambda columns: GzipWriter(JsonLinesWriter(columns)),
+}
+
+
+@dataclass
+class QueryExport:
+    """
+    QueryExport - The result of ``export_query``
+    """
+
+    # The formatted rows, or None if the statement doesn't return rows
+    output: BytesIO | None
+    extension: str = "txt"
+    # The number of rows written to the output, or the number of rows affected for statements which don't return rows
+    row_count: int = 0
+    # Why the output was cut short, if it was ("row limit", "size limit" or "cancelled")
+    truncated: str | None = None
+    elapsed_time: float = 0.0
+    columns: list[str] = field(default_factory=list)
+
+
+def apply_statement_timeout(
+    session: sqlalchemy.orm.Session, query: str, timeout: float
+) -> str:
+    # MariaDB can enforce a timeout on a single statement, other databases (like SQLite) run it as is
+    if timeout and getattr(session.get_bind().dialect, "is_mariadb", False):
+        return f"SET STATEMENT max_statement_time={float(timeout)} FOR {query}"
+    return query
+
+
+def export_query(
+    session: sqlalchemy.orm.Session,
+    query: str,
+    *,
+    max_rows: int,
+    max_bytes: int,
+    chunk_size: int,
+    timeout: float = None,
+    cancel_event: threading.Event = None,
+    output_format: str = "table",
+) -> QueryExport:
+    """
+    export_query - Executes a query and streams its rows into a buffer in chunks using a server-side cursor, so large results never have to be held in memory at once. This blocks, so it should be called through ``DatabaseConnection.run``.
+
+    Args:
+        session (sqlalchemy.orm.Session): The session to execute the query in
+        query (str): The SQL query to execute
+        max_rows (int): The maximum number of rows to write
+        max_bytes (int): The maximum size of the output in bytes
+        chunk_size (int): The number of rows fetched from the cursor at a time
+        timeout (float, optional): The statement timeout in seconds, if the database supports it. Defaults to None.
+        cancel_event (threading.Event, optional): Stops fetching rows once set. This is checked between chunks, so a statement which is still executing runs until it finishes or times out. Defaults to None.
+        output_format (str, optional): The format to write the rows in, one of ``EXPORT_FORMATS``. Defaults to "table".
+
+    Returns:
+        QueryExport: The formatted output, along with how many rows were written and why it was cut short (if it was)
+    """
+    prev_time = time.perf_counter()
+    result = session.execute(
+        sqlalchemy.text(apply_statement_timeout(session, query, timeout)),
+        execution_options={"stream_results": True, "max_row_buffer": chunk_size},
+    )
+
+    if not result.returns_rows:
+        return QueryExport(
+            output=None,
+            row_count=result.rowcount,
+            elapsed_time=round(time.perf_counter() - prev_time, 3),
+        )
+
+    columns = list(result.keys())
+    writer = EXPORT_FORMATS[output_format](columns)
+    export = QueryExport(output=BytesIO(), extension=writer.extension, columns=columns)
+    try:
+        while rows := result.fetchmany(chunk_size):
+            if cancel_event and cancel_event.is_set():
+                export.truncated = "cancelled"
+                break
+
+            if export.row_count + len(rows) > max_rows:
+                rows = rows[: max_rows - export.row_count]
+                export.truncated = "row limit"
+
+            written_rows = write_rows_within_limit(
+                export.output, writer, rows, max_bytes
+            )
+            export.row_count += written_rows
+            if written_rows < len(rows):
+                export.truncated = "size limit"
+                break
+
+            if export.truncated:
+                break
+
+        # The end of a compressed stream has to be written for the file to be valid, so it's exempt from the limit (it's only a few bytes)
+        export.output.write(writer.finish())
+    finally:
+        result.close()
+
+    export.elapsed_time = round(time.perf_counter() - prev_time, 3)
+    return export
+
+
+def write_rows_within_limit(
+    output: BytesIO, writer: Any, rows: Sequence[Sequence[Any]], max_bytes: int
+) -> int:
+    """
+    write_rows_within_limit - Writes as many of the rows as fit in the output. If they don't all fit, the most that do are found with a binary search, rendering them again from the writer's state before the chunk, so a table is closed after the last row written and the state of a compressed stream only includes what was written.
+
+    Args:
+        output (BytesIO): The output to write to
+        writer (Any): The writer to render the rows with, from ``EXPORT_FORMATS``
+        rows (Sequence[Sequence[Any]]): The rows to write
+        max_bytes (int): The maximum size of the output in bytes
+
+    Returns:
+        int: The number of rows written
+    """
+    remaining = max_bytes - output.tell()
+    state = writer.snapshot()
+    data = writer.write_rows(rows)
+    if len(data) <= remaining:
+        output.write(data)
+        return len(rows)
+
+    written_rows = 0
+    low, high = 1, len(rows) - 1
+    while low <= high:
+        middle = (low + high) // 2
+        writer.restore(state)
+        if len(writer.write_rows(rows[:middle])) <= remaining:
+            written_rows = middle
+            low = middle + 1
+        else:
+            high = middle - 1
+
+    writer.restore(state)
+    if written_rows:
+        output.write(writer.write_rows(rows[:written_rows]))
+    return written_rows
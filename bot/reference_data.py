@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from database_obj import COMPLETE_STATUS_NAME
+
+
+@dataclass(frozen=True)
+class StatusInfo:
+    id: int
+    name: str
+    emoji: str | None
+
+
+@dataclass(frozen=True)
+class DepartmentInfo:
+    id: int
+    name: str
+
+
+class ReferenceData:
+    def __init__(
+        self,
+        statuses: Iterable[StatusInfo] = (),
+        departments: Iterable[DepartmentInfo] = (),
+    ):
+        """
+        ReferenceData - A read-only snapshot of the ``Status`` and ``Department`` tables. They only change through ``create_db`` or by hand, so they're loaded once at startup rather than queried by every command. Reloading replaces the whole snapshot, so a snapshot that's already been grabbed never changes underneath its user (including database threads).
+
+        Args:
+            statuses (Iterable[StatusInfo], optional): Every status. Defaults to none.
+            departments (Iterable[DepartmentInfo], optional): Every department. Defaults to none.
+        """
+        self.statuses: tuple[StatusInfo, ...] = tuple(
+            sorted(statuses, key=lambda status: status.id)
+        )
+        self.departments: tuple[DepartmentInfo, ...] = tuple(
+            sorted(departments, key=lambda department: department.id)
+        )
+
+        self.statuses_by_id: Mapping[int, StatusInfo] = MappingProxyType(
+            {status.id: status for status in self.statuses}
+        )
+        self.statuses_by_name: Mapping[str, StatusInfo] = MappingProxyType(
+            {status.name.casefold(): status for status in self.statuses}
+        )
+        self.departments_by_id: Mapping[int, DepartmentInfo] = MappingProxyType(
+            {department.id: department for department in self.departments}
+        )
+        self.departments_by_name: Mapping[str, DepartmentInfo] = MappingProxyType(
+            {department.name.casefold(): department for department in self.departments}
+        )
+
+    def get_status(self, name: str) -> StatusInfo | None:
+        # Names are matched case insensitively, since they can be typed into commands
+        return self.statuses_by_name.get(name.casefold())
+
+    def get_department(self, name: str) -> DepartmentInfo | None:
+        return self.departments_by_name.get(name.casefold())
+
+    @property
+    def complete_status_id(self) -> int | None:
+        status = self.get_status(COMPLETE_STATUS_NAME)
+        return status.id if status else None
@@ -0,0 +1,256 @@
+import asyncio
+import heapq
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import TYPE_CHECKING, Iterable
+
+import discord
+import sqlalchemy
+from const import (
+    DUE_DATE_REMINDER_DAYS_BEFORE,
+    DUE_DATE_REMINDER_HOUR,
+    DUE_DATE_REMINDER_RETRY_SECONDS,
+    DUE_DATE_REMINDER_WINDOW_DAYS,
+    GUILD_ID,
+)
+
+if TYPE_CHECKING:
+    from main import PrimaryBot
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class Reminder:
+    # Ordered by when they're sent, so the heap pops the next one first
+    send_at: datetime
+    task_id: int = field(compare=False)
+    due_date: date = field(compare=False)
+    days_before: int = field(compare=False)
+    # None for a task without assignees, which is only reminded of in its thread
+    employee_id: int | None = field(compare=False)
+    # The task's generation when this was scheduled. Rescheduling the task makes this reminder stale.
+    generation: int = field(compare=False)
+
+
+def reminder_times(
+    due_date: date, utc_offset: int | None
+) -> Iterable[tuple[int, datetime]]:
+    """
+    reminder_times - Works out when someone should be reminded of a due date, which is at ``DUE_DATE_REMINDER_HOUR`` in their local time on each of the ``DUE_DATE_REMINDER_DAYS_BEFORE`` days.
+
+    Args:
+        due_date (date): The due date
+        utc_offset (int | None): Their UTC offset in hours, or None to use UTC
+
+    Returns:
+        Iterable[tuple[int, datetime]]: (days before the due date, UTC time to send at) pairs
+    """
+    local_time = time(
+        DUE_DATE_REMINDER_HOUR, tzinfo=timezone(timedelta(hours=utc_offset or 0))
+    )
+    for days_before in DUE_DATE_REMINDER_DAYS_BEFORE:
+        send_at = datetime.combine(due_date - timedelta(days=days_before), local_time)
+        yield days_before, send_at.astimezone(timezone.utc)
+
+
+def describe_due(days_before: int) -> str:
+    if days_before == 0:
+        return "today"
+    if days_before == 1:
+        return "tomorrow"
+    return f"in {days_before} days"
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        bot: "PrimaryBot",
+        *,
+        window: timedelta = timedelta(days=DUE_DATE_REMINDER_WINDOW_DAYS),
+    ):
+        """
+        ReminderScheduler - Reminds the assignees of a task of its due date, by DM and in the task's thread, at the right local time for each of them. Only reminders due within ``window`` are kept in memory, in a heap ordered by send time. The next window is loaded with a range query on the due date index once the current one runs out (and at startup, so reminders which were due while the bot was offline are skipped).
+
+        Args:
+            bot (PrimaryBot): The discord bot instance
+            window (timedelta, optional): How far ahead reminders are loaded. Defaults to DUE_DATE_REMINDER_WINDOW_DAYS days.
+        """
+        self.bot = bot
+        self.window = window
+
+        self.reminders: list[Reminder] = []
+        # task_id: its current generation. Rescheduling a task bumps this rather than removing its old reminders, which are skipped when they're popped instead (removing them from the middle of the heap would mean rebuilding it).
+        self.generations: dict[int, int] = {}
+        # Reminders are loaded up to (but not including) this time
+        self.window_end = datetime.now(timezone.utc)
+        # Rescheduling while the window is being reloaded could otherwise lose or duplicate the rescheduled reminders
+        self.lock = asyncio.Lock()
+        # Set whenever reminders are added, since one of them may be due before the reminder being waited on
+        self.wake_up = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+        self.sent_count = 0
+
+    async def start(self):
+        await self.reload()
+        self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+    async def reload(self, start: datetime = None):
+        """
+        reload - Replaces every reminder with those due from ``start`` until the end of the window. Call this after a change affecting many reminders, like an employee's UTC offset.
+
+        Args:
+            start (datetime, optional): The start of the window. Defaults to now.
+        """
+        async with self.lock:
+            start = start or datetime.now(timezone.utc)
+            end = start + self.window
+            targets = await self.bot.db.get_reminder_targets(
+                *self.due_date_range(start, end)
+            )
+            self.reminders = []
+            self.generations.clear()
+            self.window_end = end
+            self.add_reminders(targets, start)
+        self.wake_up.set()
+
+    async def reschedule_tasks(self, task_ids: Iterable[int]):
+        """
+        reschedule_tasks - Replaces the reminders of tasks which were just created, or whose due date or assignees changed.
+
+        Args:
+            task_ids (Iterable[int]): The IDs of the tasks
+        """
+        if not (task_ids := set(task_ids)):
+            return
+
+        async with self.lock:
+            targets = await self.bot.db.get_reminder_targets(task_ids=task_ids)
+            for task_id in task_ids:
+                self.unschedule_task(task_id)
+            self.add_reminders(targets, datetime.now(timezone.utc))
+        self.wake_up.set()
+
+    def unschedule_task(self, task_id: int):
+        self.generations[task_id] = self.generations.get(task_id, 0) + 1
+
+    @staticmethod
+    def due_date_range(start: datetime, end: datetime) -> tuple[date, date]:
+        # Padded by a day on both sides, since UTC offsets can move a reminder into a different day
+        return (
+            start.date() + timedelta(days=min(DUE_DATE_REMINDER_DAYS_BEFORE) - 1),
+            end.date() + timedelta(days=max(DUE_DATE_REMINDER_DAYS_BEFORE) + 1),
+        )
+
+    def add_reminders(self, targets: list[sqlalchemy.engine.Row], start: datetime):
+        # Only reminders within the window are kept, the rest are loaded with a later window
+        for target in targets:
+            try:
+                times = list(reminder_times(target.due_date, target.utc_offset))
+            except ValueError:
+                # An offset saved before offsets were checked, which one bad employee shouldn't stop everyone else's reminders over
+                log.warning(
+                    "Skipping reminders of task %d for employee %s, whose UTC offset of %r is invalid",
+                    target.task_id,
+                    target.employee_id,
+                    target.utc_offset,
+                )
+                continue
+            for days_before, send_at in times:
+                if start <= send_at < self.window_end:
+                    heapq.heappush(
+                        self.reminders,
+                        Reminder(
+                            send_at,
+                            target.task_id,
+                            target.due_date,
+                            days_before,
+                            target.employee_id,
+                            self.generations.get(target.task_id, 0),
+                        ),
+                    )
+
+    async def run(self):
+        while True:
+            now = datetime.now(timezone.utc)
+            due: list[Reminder] = []
+            while self.reminders and self.reminders[0].send_at <= now:
+                reminder = heapq.heappop(self.reminders)
+                if reminder.generation == self.generations.get(reminder.task_id, 0):
+                    due.append(reminder)
+            if due:
+                try:
+                    await self.send_reminders(due)
+                except Exception:
+                    log.exception("Failed to send %d due date reminders", len(due))
+
+            if now >= self.window_end:
+                # Continues from the end of the last window, so reminders due right at the boundary aren't missed
+                try:
+                    await self.reload(self.window_end)
+                except Exception:
+                    log.exception("Failed to load the next window of due date reminders")
+                    await asyncio.sleep(DUE_DATE_REMINDER_RETRY_SECONDS)
+                continue
+
+            next_time = self.window_end
+            if self.reminders:
+                next_time = min(next_time, self.reminders[0].send_at)
+            self.wake_up.clear()
+            try:
+                await asyncio.wait_for(
+                    self.wake_up.wait(), (next_time - now).total_seconds()
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def send_reminders(self, reminders: list[Reminder]):
+        # The tasks are read again, since they may have been completed or deleted since the reminders were scheduled
+        targets = {
+            (target.task_id, target.employee_id): target
+            for target in await self.bot.db.get_reminder_targets(
+                task_ids={reminder.task_id for reminder in reminders}
+            )
+        }
+        for reminder in reminders:
+            target = targets.get((reminder.task_id, reminder.employee_id))
+            if target and target.due_date == reminder.due_date:
+                await self.send_reminder(target, reminder.days_before)
+
+    async def send_reminder(self, target: sqlalchemy.engine.Row, days_before: int):
+        message = f":alarm_clock: **{target.task_name}** is due {describe_due(days_before)} ({target.due_date:%Y-%m-%d})."
+
+        # Imported tasks don't have a thread until the import finishes
+        if target.thread_id:
+            try:
+                thread = await self.bot.get_or_fetch_channel(target.thread_id)
+                if thread:
+                    await thread.send(
+                        f"<@{target.discord_id}> {message}"
+                        if target.discord_id
+                        else message
+                    )
+            except discord.HTTPException:
+                log.exception("Failed to send a reminder in thread %d", target.thread_id)
+
+        if target.discord_id:
+            try:
+                user = self.bot.get_guild(GUILD_ID).get_member(
+                    target.discord_id
+                ) or await self.bot.fetch_user(target.discord_id)
+                await user.send(
+                    f"{message} <#{target.thread_id}>" if target.thread_id else message
+                )
+            except discord.Forbidden:
+                # They don't accept DMs from the server, but were still mentioned in the thread
+                pass
+            except discord.HTTPException:
+                log.exception("Failed to DM a reminder to %d", target.discord_id)
+
+        self.sent_count += 1
@@ -0,0 +1,189 @@
+from collections import defaultdict, deque
+from datetime import date
+from typing import Iterable
+
+
+class CycleError(ValueError):
+    pass
+
+
+class TaskGraph:
+    def __init__(self):
+        """
+        TaskGraph - An in-memory copy of the ``TaskDependency`` table, kept as a directed acyclic graph. An edge from a prerequisite to a task means the task is blocked until the prerequisite is done.
+
+        It's loaded once at startup, and must be kept up to date whenever dependencies are added or removed, tasks are deleted, or due dates change. Everything here is iterative, so long chains don't hit the recursion limit.
+        """
+        # prerequisite_id: {ids of the tasks it blocks}
+        self.dependents: defaultdict[int, set[int]] = defaultdict(set)
+        # task_id: {ids of its prerequisites}
+        self.prerequisites: defaultdict[int, set[int]] = defaultdict(set)
+        self.due_dates: dict[int, date] = {}
+
+    def __len__(self) -> int:
+        return sum(len(dependents) for dependents in self.dependents.values())
+
+    def load(
+        self, edges: Iterable[tuple[int, int]], due_dates: Iterable[tuple[int, date]]
+    ):
+        """
+        load - Replaces the graph. The edges are assumed to be acyclic, since they were checked when they were added.
+
+        Args:
+            edges (Iterable[tuple[int, int]]): (prerequisite_id, task_id) pairs
+            due_dates (Iterable[tuple[int, date]]): (task_id, due_date) pairs
+        """
+        self.dependents.clear()
+        self.prerequisites.clear()
+        for prerequisite_id, task_id in edges:
+            self.dependents[prerequisite_id].add(task_id)
+            self.prerequisites[task_id].add(prerequisite_id)
+        self.due_dates = dict(due_dates)
+
+    def has_path(self, source_id: int, target_id: int) -> bool:
+        # Depth first search along dependents
+        stack = [source_id]
+        seen = {source_id}
+        while stack:
+            task_id = stack.pop()
+            if task_id == target_id:
+                return True
+            for dependent_id in self.dependents.get(task_id, ()):
+                if dependent_id not in seen:
+                    seen.add(dependent_id)
+                    stack.append(dependent_id)
+        return False
+
+    def add_dependency(self, prerequisite_id: int, task_id: int):
+        """
+        add_dependency - Adds an edge, making ``task_id`` blocked by ``prerequisite_id``.
+
+        Raises:
+            CycleError: The edge would create a cycle (including a task depending on itself)
+        """
+        if prerequisite_id == task_id or self.has_path(task_id, prerequisite_id):
+            raise CycleError("Dependency would create a cycle")
+        self.dependents[prerequisite_id].add(task_id)
+        self.prerequisites[task_id].add(prerequisite_id)
+
+    def remove_dependency(self, prerequisite_id: int, task_id: int):
+        self.dependents.get(prerequisite_id, set()).discard(task_id)
+        self.prerequisites.get(task_id, set()).discard(prerequisite_id)
+
+    def remove_task(self, task_id: int):
+        for dependent_id in self.dependents.pop(task_id, ()):
+            self.prerequisites[dependent_id].discard(task_id)
+        for prerequisite_id in self.prerequisites.pop(task_id, ()):
+            self.dependents[prerequisite_id].discard(task_id)
+        self.due_dates.pop(task_id, None)
+
+    def set_due_date(self, task_id: int, due_date: date | None):
+        if due_date:
+            self.due_dates[task_id] = due_date
+        else:
+            self.due_dates.pop(task_id, None)
+
+    def _reachable(self, task_id: int, edges: dict[int, set[int]]) -> set[int]:
+        reached: set[int] = set()
+        stack = [task_id]
+        while stack:
+            for next_id in edges.get(stack.pop(), ()):
+                if next_id not in reached:
+                    reached.add(next_id)
+                    stack.append(next_id)
+        return reached
+
+    def blocked_by(self, task_id: int) -> set[int]:
+        """
+        blocked_by - Gets every task which has to be done before a task, directly or transitively.
+        """
+        return self._reachable(task_id, self.prerequisites)
+
+    def blocking(self, task_id: int) -> set[int]:
+        """
+        blocking - Gets every task which is blocked by a task, directly or transitively.
+        """
+        return self._reachable(task_id, self.dependents)
+
+    def topological_order(self, task_ids: Iterable[int]) -> list[int]:
+        """
+        topological_order - Orders tasks so every task comes after its prerequisites (Kahn's algorithm). Only edges between the given tasks are considered. Ties are broken by due date, then ID.
+
+        Args:
+            task_ids (Iterable[int]): The tasks to order
+
+        Returns:
+            list[int]: The ordered task IDs
+        """
+        task_ids = set(task_ids)
+        remaining_prerequisites = {
+            task_id: len(self.prerequisites.get(task_id, set()) & task_ids)
+            for task_id in task_ids
+        }
+        ready = deque(
+            sorted(
+                (
+                    task_id
+                    for task_id, count in remaining_prerequisites.items()
+                    if not count
+                ),
+                key=self._sort_key,
+            )
+        )
+
+        order = []
+        while ready:
+            task_id = ready.popleft()
+            order.append(task_id)
+            newly_ready = []
+            for dependent_id in self.dependents.get(task_id, ()):
+                if dependent_id in remaining_prerequisites:
+                    remaining_prerequisites[dependent_id] -= 1
+                    if not remaining_prerequisites[dependent_id]:
+                        newly_ready.append(dependent_id)
+            ready.extend(sorted(newly_ready, key=self._sort_key))
+        return order
+
+    def _sort_key(self, task_id: int) -> tuple[date, int]:
+        return (self.due_dates.get(task_id, date.max), task_id)
+
+    def critical_path(self, task_id: int) -> list[int]:
+        """
+        critical_path - Gets the chain of prerequisites which decides how soon a task can be finished. Each task is assumed to finish by the later of its own due date and the finish of its latest prerequisite, and the path follows the latest prerequisite at every step (the longest chain, if none of them have due dates).
+
+        Args:
+            task_id (int): The ID of the task
+
+        Returns:
+            list[int]: The task IDs on the path, starting from the first task to be done and ending with ``task_id``
+        """
+        ancestors = self.blocked_by(task_id)
+        order = self.topological_order(ancestors | {task_id})
+
+        # task_id: (finish date, chain length), and the prerequisite it came from
+        finish: dict[int, tuple[date, int]] = {}
+        previous: dict[int, int | None] = {}
+        for current_id in order:
+            latest_prerequisite = max(
+                (
+                    prerequisite_id
+                    for prerequisite_id in self.prerequisites.get(current_id, ())
+                    if prerequisite_id in finish
+                ),
+                key=finish.__getitem__,
+                default=None,
+            )
+            own_due_date = self.due_dates.get(current_id, date.min)
+            if latest_prerequisite is None:
+                finish[current_id] = (own_due_date, 1)
+            else:
+                inherited_date, length = finish[latest_prerequisite]
+                finish[current_id] = (max(own_due_date, inherited_date), length + 1)
+            previous[current_id] = latest_prerequisite
+
+        path = []
+        current_id = task_id
+        while current_id is not None:
+            path.append(current_id)
+            current_id = previous[current_id]
+        return path[::-1]
@@ -0,0 +1,202 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from io import StringIO
+from typing import Any
+
+from reference_data import DepartmentInfo, ReferenceData, StatusInfo
+from task_graph import CycleError, TaskGraph
+
+# The column lengths of Task
+MAX_NAME_LENGTH = 150
+MAX_DESCRIPTION_LENGTH = 2000
+
+
+class TaskImportError(ValueError):
+    def __init__(self, errors: list[str]):
+        """
+        TaskImportError - Raised when a task file is invalid. Every problem found is reported at once, so the file can be fixed in one go.
+
+        Args:
+            errors (list[str]): A description of each problem, prefixed with the row it's on
+        """
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+@dataclass
+class ImportedTask:
+    """
+    ImportedTask - A validated row of a task file. ``key`` identifies the task within the file, so other rows can refer to it as their parent or as a dependency.
+    """
+
+    row: int
+    key: str
+    name: str
+    description: str | None = None
+    department: DepartmentInfo | None = None
+    status: StatusInfo | None = None
+    due_date: date | None = None
+    parent_key: str | None = None
+    # Discord usernames or IDs of the employees assigned to the task
+    assignees: list[str] = field(default_factory=list)
+    depends_on: list[str] = field(default_factory=list)
+
+
+def read_rows(filename: str, data: bytes) -> list[dict[str, Any]]:
+    """
+    read_rows - Reads the rows of a CSV file (with a header row), or a JSON file containing a list of objects.
+
+    Args:
+        filename (str): The name of the file, used to tell which format it's in
+        data (bytes): The contents of the file
+
+    Raises:
+        TaskImportError: The file couldn't be read
+
+    Returns:
+        list[dict[str, Any]]: Each row, keyed by lowercase column names
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise TaskImportError(["The file must be UTF-8 encoded."])
+
+    if filename.lower().endswith(".csv"):
+        rows = list(csv.DictReader(StringIO(text)))
+    elif filename.lower().endswith(".json"):
+        try:
+            rows = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise TaskImportError([f"The file isn't valid JSON: {e}"])
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise TaskImportError(["The file must contain a list of objects."])
+    else:
+        raise TaskImportError(["The file must be a .csv or .json file."])
+
+    return [
+        {str(column).strip().lower(): value for column, value in row.items()}
+        for row in rows
+    ]
+
+
+def split_list(value: Any) -> list[str]:
+    # CSV cells hold lists separated by semicolons, JSON can use either that or a real list
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(";") if item.strip()]
+
+
+def clean(value: Any) -> str | None:
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def parse_tasks(
+    rows: list[dict[str, Any]], reference_data: ReferenceData, max_rows: int
+) -> list[ImportedTask]:
+    """
+    parse_tasks - Validates the rows of a task file. Each row may have the columns ``key``, ``name`` (required), ``description``, ``department``, ``status``, ``due_date`` (YYYY-MM-DD), ``parent`` (a key), ``assignees`` and ``depends_on`` (keys). Rows without a key can be referred to by their row number.
+
+    Args:
+        rows (list[dict[str, Any]]): The rows, as returned by ``read_rows``
+        reference_data (ReferenceData): The statuses and departments to check against
+        max_rows (int): The maximum number of rows allowed
+
+    Raises:
+        TaskImportError: Any row is invalid
+
+    Returns:
+        list[ImportedTask]: The tasks, in the order they appear in the file
+    """
+    if not rows:
+        raise TaskImportError(["The file doesn't contain any tasks."])
+    if len(rows) > max_rows:
+        raise TaskImportError([f"The file can't contain more than {max_rows} tasks."])
+
+    errors = []
+    tasks: dict[str, ImportedTask] = {}
+    for row_number, row in enumerate(rows, start=1):
+        prefix = f"Row {row_number}:"
+
+        key = clean(row.get("key")) or str(row_number)
+        if key in tasks:
+            errors.append(f"{prefix} The key {key} is used by row {tasks[key].row}.")
+
+        name = clean(row.get("name"))
+        if not name:
+            errors.append(f"{prefix} A name is required.")
+        elif len(name) > MAX_NAME_LENGTH:
+            errors.append(f"{prefix} The name is over {MAX_NAME_LENGTH} characters.")
+
+        description = clean(row.get("description"))
+        if description and len(description) > MAX_DESCRIPTION_LENGTH:
+            errors.append(
+                f"{prefix} The description is over {MAX_DESCRIPTION_LENGTH} characters."
+            )
+
+        department = None
+        if department_name := clean(row.get("department")):
+            if not (department := reference_data.get_department(department_name)):
+                errors.append(f"{prefix} {department_name} is not a valid department.")
+
+        status = None
+        if status_name := clean(row.get("status")):
+            if not (status := reference_data.get_status(status_name)):
+                errors.append(f"{prefix} {status_name} is not a valid status.")
+
+        due_date = None
+        if due_date_text := clean(row.get("due_date")):
+            try:
+                due_date = date.fromisoformat(due_date_text)
+            except ValueError:
+                errors.append(f"{prefix} {due_date_text} is not a YYYY-MM-DD date.")
+
+        tasks.setdefault(
+            key,
+            ImportedTask(
+                row=row_number,
+                key=key,
+                name=name,
+                description=description,
+                department=department,
+                status=status,
+                due_date=due_date,
+                parent_key=clean(row.get("parent")),
+                assignees=split_list(row.get("assignees")),
+                depends_on=split_list(row.get("depends_on")),
+            ),
+        )
+
+    # References can point at later rows, so they're checked once every key is known
+    parents = TaskGraph()
+    dependencies = TaskGraph()
+    for task in tasks.values():
+        prefix = f"Row {task.row}:"
+        if task.parent_key:
+            if task.parent_key not in tasks:
+                errors.append(f"{prefix} There's no task with the key {task.parent_key}.")
+            else:
+                try:
+                    parents.add_dependency(task.parent_key, task.key)
+                except CycleError:
+                    errors.append(f"{prefix} The task can't be its own (grand)parent.")
+
+        for dependency_key in task.depends_on:
+            if dependency_key not in tasks:
+                errors.append(f"{prefix} There's no task with the key {dependency_key}.")
+                continue
+            try:
+                dependencies.add_dependency(dependency_key, task.key)
+            except CycleError:
+                errors.append(
+                    f"{prefix} Depending on {dependency_key} would create a cycle."
+                )
+
+    if errors:
+        raise TaskImportError(errors)
+    return list(tasks.values())
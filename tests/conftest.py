@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The bot's modules import each other as top-level modules, the same as when it's run from its directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "bot"))
@@ -0,0 +1,101 @@
+import caches
+from caches import AccessLevelCache, PrefixIndex
+
+
+def test_access_level_expires_after_ttl(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(caches.time, "monotonic", lambda: now)
+    cache = AccessLevelCache(ttl=300)
+    cache.set(1, 3)
+
+    now += 299
+    assert cache.get(1) == 3
+    now += 2
+    assert cache.get(1) is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_access_level_is_evicted():
+    cache = AccessLevelCache(max_size=2)
+    cache.set(1, 1)
+    cache.set(2, 2)
+    # Looking 1 up makes 2 the least recently used
+    assert cache.get(1) == 1
+    cache.set(3, 3)
+
+    assert cache.get(2) is None
+    assert cache.get(1) == 1
+    assert cache.get(3) == 3
+
+
+def test_read_overtaken_by_a_change_isnt_cached():
+    cache = AccessLevelCache()
+    generation = cache.generation
+    # Promoted while the old level was being read
+    cache.set(1, 3)
+    cache.fill(1, 1, generation)
+    assert cache.get(1) == 3
+
+    generation = cache.generation
+    cache.invalidate(2)
+    cache.fill(2, 1, generation)
+    assert cache.get(2) is None
+
+    generation = cache.generation
+    cache.clear()
+    cache.fill(3, 1, generation)
+    assert cache.get(3) is None
+
+
+def test_read_of_another_employee_is_still_cached():
+    cache = AccessLevelCache()
+    generation = cache.generation
+    cache.set(1, 3)
+    cache.fill(2, 2, generation)
+    assert cache.get(2) == 2
+
+
+def test_names_starting_with_the_prefix_come_before_later_words():
+    index = PrefixIndex()
+    index.load(
+        [(1, "Design Logo"), (2, "Logo Review"), (3, "Update the logo"), (4, "Budget")]
+    )
+
+    assert index.search("logo", 10) == [
+        (2, "Logo Review"),
+        (1, "Design Logo"),
+        (3, "Update the logo"),
+    ]
+    assert index.search("  THE   LO", 10) == [(3, "Update the logo")]
+    assert index.search("", 2) == [(4, "Budget"), (1, "Design Logo")]
+
+
+def test_name_with_several_matching_words_is_returned_once():
+    index = PrefixIndex()
+    index.load([(1, "Test the test suite")])
+
+    assert index.search("t", 10) == [(1, "Test the test suite")]
+
+
+def test_renamed_and_removed_names_are_no_longer_found():
+    index = PrefixIndex()
+    index.load([(1, "Old Name"), (2, "Other Name")])
+    index.rename(1, "New Title")
+    index.remove(2)
+    # Rows which weren't indexed aren't added by a rename
+    index.rename(3, "Name")
+
+    assert index.search("name", 10) == []
+    assert index.search("title", 10) == [(1, "New Title")]
+
+
+def test_excluded_names_dont_count_towards_the_limit():
+    index = PrefixIndex()
+    index.load([(i, f"Task {i:02}") for i in range(10)])
+
+    assert index.search("task", 3, include=lambda row_id: row_id % 2) == [
+        (1, "Task 01"),
+        (3, "Task 03"),
+        (5, "Task 05"),
+    ]
@@ -0,0 +1,96 @@
+import asyncio
+
+import discord
+from embed_scheduler import EmbedEditScheduler
+
+
+class FakeMessage:
+    def __init__(self, edits: list, channel_id: int, message_id: int):
+        self.edits = edits
+        self.key = (channel_id, message_id)
+
+    async def edit(self, *, embed: discord.Embed):
+        self.edits.append((self.key, embed.title))
+
+
+class FakeChannel:
+    def __init__(self, edits: list, channel_id: int):
+        self.edits = edits
+        self.id = channel_id
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return FakeMessage(self.edits, self.id, message_id)
+
+
+class FakeBot:
+    def __init__(self):
+        # ((channel_id, message_id), embed title) for each edit sent
+        self.edits = []
+
+    async def get_or_fetch_channel(self, channel_id: int) -> FakeChannel:
+        return FakeChannel(self.edits, channel_id)
+
+
+def test_edits_to_a_message_are_coalesced():
+    async def run() -> FakeBot:
+        bot = FakeBot()
+        scheduler = EmbedEditScheduler(bot, coalesce_delay=0.05, channel_interval=0)
+        for title in ("first", "second", "third"):
+            scheduler.schedule(1, 10, discord.Embed(title=title))
+        scheduler.schedule(1, 11, discord.Embed(title="other message"))
+        await asyncio.sleep(0.2)
+        await scheduler.close()
+        assert (scheduler.scheduled_count, scheduler.sent_count) == (4, 2)
+        return bot
+
+    assert sorted(asyncio.run(run()).edits) == [
+        ((1, 10), "third"),
+        ((1, 11), "other message"),
+    ]
+
+
+def test_embed_builders_are_called_when_the_edit_is_sent():
+    async def run() -> list:
+        bot = FakeBot()
+        scheduler = EmbedEditScheduler(bot, coalesce_delay=0.05, channel_interval=0)
+        state = {"title": "before"}
+
+        async def build_embed() -> discord.Embed:
+            return discord.Embed(title=state["title"])
+
+        scheduler.schedule(1, 10, build_embed)
+        state["title"] = "after"
+        await asyncio.sleep(0.2)
+        await scheduler.close()
+        return bot.edits
+
+    assert asyncio.run(run()) == [((1, 10), "after")]
+
+
+def test_pending_edits_are_sent_on_close():
+    async def run() -> tuple[list, EmbedEditScheduler]:
+        bot = FakeBot()
+        # Long enough that nothing would be sent before closing
+        scheduler = EmbedEditScheduler(bot, coalesce_delay=60, channel_interval=60)
+        scheduler.schedule(1, 10, discord.Embed(title="a"))
+        scheduler.schedule(1, 11, discord.Embed(title="b"))
+        scheduler.schedule(2, 20, discord.Embed(title="c"))
+        await scheduler.close(timeout=1)
+        return bot.edits, scheduler
+
+    edits, scheduler = asyncio.run(run())
+    assert sorted(edits) == [((1, 10), "a"), ((1, 11), "b"), ((2, 20), "c")]
+    assert not scheduler.pending
+
+
+def test_channels_are_forgotten_once_their_slot_passes():
+    async def run() -> EmbedEditScheduler:
+        scheduler = EmbedEditScheduler(
+            FakeBot(), coalesce_delay=0.01, channel_interval=0.01
+        )
+        scheduler.schedule(1, 10, discord.Embed(title="a"))
+        await asyncio.sleep(0.1)
+        await scheduler.close()
+        return scheduler
+
+    assert not asyncio.run(run())._next_edit_times
@@ -0,0 +1,75 @@
+import gzip
+import json
+import os
+
+import pytest
+import sqlalchemy
+import sqlalchemy.orm
+from const import EXEC_QUERY_CHUNK_SIZE, EXEC_QUERY_MAX_BYTES
+from query_export import export_query
+
+
+@pytest.fixture
+def session():
+    engine = sqlalchemy.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text("CREATE TABLE t (id INTEGER, value TEXT)"))
+        # Random values barely compress, so the compressed output reaches the size limit
+        connection.execute(
+            sqlalchemy.text("INSERT INTO t VALUES (:id, :value)"),
+            [{"id": i, "value": os.urandom(256).hex()} for i in range(40_000)],
+        )
+    with sqlalchemy.orm.Session(engine) as session:
+        yield session
+
+
+@pytest.mark.parametrize("output_format", ["csv.gz", "jsonl.gz"])
+def test_gzip_export_past_size_limit_is_valid(session, output_format):
+    export = export_query(
+        session,
+        "SELECT * FROM t",
+        max_rows=100_000,
+        max_bytes=EXEC_QUERY_MAX_BYTES,
+        chunk_size=EXEC_QUERY_CHUNK_SIZE,
+        output_format=output_format,
+    )
+
+    assert export.truncated == "size limit"
+    output = export.output.getvalue()
+    assert len(output) <= EXEC_QUERY_MAX_BYTES + 64
+    # Raises BadGzipFile if the trailer counts data which was left out
+    lines = gzip.decompress(output).decode().splitlines()
+    if output_format == "csv.gz":
+        assert lines[0] == "id,value"
+        lines = lines[1:]
+    else:
+        json.loads(lines[-1])
+    assert len(lines) == export.row_count
+
+
+@pytest.mark.parametrize("output_format", ["csv", "jsonl", "table"])
+def test_row_count_includes_rows_of_partly_written_chunk(session, output_format):
+    export = export_query(
+        session,
+        "SELECT * FROM t",
+        max_rows=100_000,
+        max_bytes=150_000,
+        chunk_size=100,
+        output_format=output_format,
+    )
+
+    assert export.truncated == "size limit"
+    lines = export.output.getvalue().decode().splitlines()
+    if output_format == "csv":
+        assert len(lines) - 1 == export.row_count
+    elif output_format == "jsonl":
+        assert len(lines) == export.row_count
+    else:
+        # Each chunk is its own table, and the last one is closed after its last row
+        assert lines[-1].startswith("+-")
+        row_lines = [
+            line
+            for line in lines
+            if line.startswith("| ") and not line.startswith("|   id |")
+        ]
+        assert len(row_lines) == export.row_count
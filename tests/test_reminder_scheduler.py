@@ -0,0 +1,54 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from const import DUE_DATE_REMINDER_DAYS_BEFORE, DUE_DATE_REMINDER_HOUR
+from reminder_scheduler import ReminderScheduler, reminder_times
+
+DUE_DATE = date(2026, 3, 10)
+
+
+def utc(day: int, hour: int) -> datetime:
+    return datetime(2026, 3, day, hour, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "utc_offset, send_hour",
+    [
+        (None, DUE_DATE_REMINDER_HOUR),
+        (0, DUE_DATE_REMINDER_HOUR),
+        (-5, DUE_DATE_REMINDER_HOUR + 5),
+    ],
+)
+def test_reminders_are_sent_at_the_local_hour(utc_offset, send_hour):
+    assert list(reminder_times(DUE_DATE, utc_offset)) == [
+        (days_before, utc(10 - days_before, send_hour))
+        for days_before in DUE_DATE_REMINDER_DAYS_BEFORE
+    ]
+
+
+def test_offset_can_move_a_reminder_into_the_previous_utc_day():
+    # 9:00 at UTC+14 is 19:00 UTC the day before
+    times = dict(reminder_times(DUE_DATE, 14))
+    assert times[0] == utc(9, DUE_DATE_REMINDER_HOUR + 24 - 14)
+
+
+def test_impossible_offset_raises():
+    with pytest.raises(ValueError):
+        list(reminder_times(DUE_DATE, 30))
+
+
+def test_targets_with_impossible_offsets_are_skipped():
+    scheduler = ReminderScheduler(None, window=timedelta(days=30))
+    start = utc(1, 0)
+    scheduler.window_end = start + scheduler.window
+    scheduler.add_reminders(
+        [
+            SimpleNamespace(task_id=1, due_date=DUE_DATE, employee_id=1, utc_offset=30),
+            SimpleNamespace(task_id=1, due_date=DUE_DATE, employee_id=2, utc_offset=2),
+        ],
+        start,
+    )
+
+    assert {reminder.employee_id for reminder in scheduler.reminders} == {2}
+    assert len(scheduler.reminders) == len(DUE_DATE_REMINDER_DAYS_BEFORE)
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+from task_graph import CycleError, TaskGraph
+
+
+def test_dependency_closing_a_cycle_is_rejected():
+    graph = TaskGraph()
+    graph.add_dependency(1, 2)
+    graph.add_dependency(2, 3)
+
+    with pytest.raises(CycleError):
+        graph.add_dependency(3, 1)
+    with pytest.raises(CycleError):
+        graph.add_dependency(2, 2)
+    # Rejected edges aren't added
+    assert len(graph) == 2
+    assert graph.blocking(3) == set()
+
+
+def test_dependency_across_branches_is_allowed():
+    graph = TaskGraph()
+    graph.add_dependency(1, 2)
+    graph.add_dependency(1, 3)
+    graph.add_dependency(2, 3)
+
+    assert graph.blocked_by(3) == {1, 2}
+    assert graph.blocking(1) == {2, 3}
+
+
+def test_removed_task_no_longer_blocks_a_cycle():
+    graph = TaskGraph()
+    graph.add_dependency(1, 2)
+    graph.add_dependency(2, 3)
+    graph.remove_task(2)
+
+    graph.add_dependency(3, 1)
+    assert graph.blocked_by(1) == {3}
+
+
+def test_topological_order_breaks_ties_by_due_date():
+    graph = TaskGraph()
+    graph.load([(1, 3), (2, 3)], [(1, date(2026, 5, 1)), (2, date(2026, 4, 1))])
+
+    assert graph.topological_order([1, 2, 3]) == [2, 1, 3]
+
+
+def test_critical_path_follows_the_latest_prerequisite():
+    graph = TaskGraph()
+    graph.load(
+        [(1, 3), (2, 3), (3, 4)],
+        [(1, date(2026, 4, 1)), (2, date(2026, 6, 1)), (4, date(2026, 5, 1))],
+    )
+
+    assert graph.critical_path(4) == [2, 3, 4]
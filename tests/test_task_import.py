@@ -0,0 +1,108 @@
+from datetime import date
+
+import pytest
+from reference_data import DepartmentInfo, ReferenceData, StatusInfo
+from task_import import TaskImportError, parse_tasks, read_rows
+
+REFERENCE_DATA = ReferenceData(
+    [StatusInfo(1, "Not Started", None), StatusInfo(2, "Complete", None)],
+    [DepartmentInfo(1, "HR")],
+)
+
+
+def parse_errors(rows: list[dict]) -> list[str]:
+    with pytest.raises(TaskImportError) as error:
+        parse_tasks(rows, REFERENCE_DATA, max_rows=10)
+    return error.value.errors
+
+
+def test_csv_rows_are_parsed():
+    rows = read_rows(
+        "tasks.csv",
+        b"\xef\xbb\xbfKey,Name,Department,Status,Due_Date,Parent,Assignees,Depends_On\n"
+        b"a,Alpha,hr,complete,2026-03-01,,alice; bob,\n"
+        b"b,Beta,,,,a,,a\n",
+    )
+    alpha, beta = parse_tasks(rows, REFERENCE_DATA, max_rows=10)
+
+    assert (alpha.key, alpha.name, alpha.department.id, alpha.status.id) == (
+        "a",
+        "Alpha",
+        1,
+        2,
+    )
+    assert alpha.due_date == date(2026, 3, 1)
+    assert alpha.assignees == ["alice", "bob"]
+    assert (beta.parent_key, beta.depends_on, beta.status) == ("a", ["a"], None)
+
+
+def test_rows_without_a_key_are_keyed_by_row_number():
+    rows = read_rows(
+        "tasks.json", b'[{"name": "Alpha"}, {"name": "Beta", "depends_on": ["1"]}]'
+    )
+    tasks = parse_tasks(rows, REFERENCE_DATA, max_rows=10)
+
+    assert [task.key for task in tasks] == ["1", "2"]
+    assert tasks[1].depends_on == ["1"]
+
+
+def test_every_invalid_row_is_reported():
+    errors = parse_errors(
+        [
+            {"key": "a", "name": ""},
+            {"key": "a", "name": "Duplicate"},
+            {"name": "x" * 151},
+            {"name": "Bad references", "department": "Sales", "status": "Done"},
+            {"name": "Bad date", "due_date": "01/03/2026"},
+            {"name": "Missing parent", "parent": "z", "depends_on": "y"},
+        ]
+    )
+
+    assert errors == [
+        "Row 1: A name is required.",
+        "Row 2: The key a is used by row 1.",
+        "Row 3: The name is over 150 characters.",
+        "Row 4: Sales is not a valid department.",
+        "Row 4: Done is not a valid status.",
+        "Row 5: 01/03/2026 is not a YYYY-MM-DD date.",
+        "Row 6: There's no task with the key z.",
+        "Row 6: There's no task with the key y.",
+    ]
+
+
+def test_cycles_are_rejected():
+    errors = parse_errors(
+        [
+            {"key": "a", "name": "Alpha", "parent": "b", "depends_on": "b"},
+            {"key": "b", "name": "Beta", "parent": "a", "depends_on": "a"},
+        ]
+    )
+
+    assert errors == [
+        "Row 2: The task can't be its own (grand)parent.",
+        "Row 2: Depending on a would create a cycle.",
+    ]
+
+
+def test_too_many_rows_are_rejected():
+    assert parse_errors([{"name": str(i)} for i in range(11)]) == [
+        "The file can't contain more than 10 tasks."
+    ]
+
+
+@pytest.mark.parametrize(
+    "filename, data, error",
+    [
+        ("tasks.txt", b"name\nAlpha\n", "The file must be a .csv or .json file."),
+        ("tasks.csv", b"\xff\xfe", "The file must be UTF-8 encoded."),
+        (
+            "tasks.json",
+            b'{"name": "Alpha"}',
+            "The file must contain a list of objects.",
+        ),
+    ],
+)
+def test_unreadable_files_are_rejected(filename, data, error):
+    with pytest.raises(TaskImportError) as raised:
+        read_rows(filename, data)
+    assert raised.value.errors == [error]